@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark da busca de URLs .mp4 no HTML do player
+
+Compara, por página, o tempo de CPU da busca antiga (seis re.findall sobre o
+HTML inteiro + busca agressiva) com scan_mp4_url() (um search por padrão,
+a partir do trecho do primeiro ".mp4"). As páginas são variações da fixture
+do player:
+
+  player      página real (URL server-amz...mp4, prioridade 0)
+  file-only   só "file": "...mp4" de outro host (prioridade 3)
+  src-attr    <video src="...mp4"> de outro host (prioridade 2)
+  no-mp4      player sem nenhum .mp4 (HLS)
+  big-no-mp4  home inteira (nenhum .mp4)
+  late        home + player (URL no fim de um HTML grande)
+  late-file   home + player só com "file" (todos os padrões até o último)
+
+Uso:
+    python bench_extract.py [--rounds 500]
+"""
+import argparse
+import os
+import re
+import time
+
+import cnvsweb_scraper as cs
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PLAYER_MP4 = 'https://server-amz.playmycnvs.com/f/velozes-e-furiosos/1080p.mp4'
+
+# Cópia da busca anterior (MÉTODO 2 + MÉTODO 4), como referência
+LEGACY_PATTERNS = [
+    r'https?://server[^"\s]*?\.mp4[^"\s]*',
+    r'https?://[^"\s]*playmycnvs[^"\s]*?\.mp4[^"\s]*',
+    r'src["\s]*[:=]["\s]*([^"\s]+\.mp4[^"\s]*)',
+    r'"file"["\s]*:["\s]*"([^"]+\.mp4[^"]*)"',
+    r'"src"["\s]*:["\s]*"([^"]+\.mp4[^"]*)"',
+    r'https?://[^"\s<>]+\.mp4[^\s<>"\']*',
+]
+
+
+def legacy_scan(html):
+    for idx, pattern in enumerate(LEGACY_PATTERNS):
+        matches = re.findall(pattern, html, re.IGNORECASE)
+        if matches:
+            video_url = matches[0]
+            if isinstance(video_url, tuple):
+                video_url = video_url[0]
+            video_url = video_url.strip('"\'\\').strip()
+            if video_url.startswith('http') and '.mp4' in video_url:
+                return video_url, idx
+
+    for url in re.findall(r'https?://[^\s<>"\']+', html):
+        url = url.strip('"\'\\,;')
+        if '.mp4' in url and ('server' in url.lower() or 'play' in url.lower() or 'cnvs' in url.lower()):
+            return url, None
+    return None, None
+
+
+def current_scan(html):
+    video_url, priority = cs.scan_mp4_url(html)
+    if video_url or '.mp4' not in html:
+        return video_url, priority
+
+    for url in cs._ANY_URL_RE.findall(html):
+        url = url.strip('"\'\\,;')
+        if '.mp4' in url and ('server' in url.lower() or 'play' in url.lower() or 'cnvs' in url.lower()):
+            return url, None
+    return None, None
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read().replace('{{BASE}}', 'http://127.0.0.1')
+
+
+def build_pages():
+    player = load_fixture('player.html')
+    home = load_fixture('home.html')
+    file_only = player.replace(PLAYER_MP4, 'https://cdn.example.com/a.mp4')
+    return {
+        'player': player,
+        'file-only': file_only,
+        'src-attr': '<video src="https://cdn.example.com/b.mp4"></video>' + player.replace('.mp4', '.m3u8'),
+        'no-mp4': player.replace('.mp4', '.m3u8'),
+        'big-no-mp4': home,
+        'late': home + player,
+        'late-file': home + file_only,
+    }
+
+
+def cpu_time(fn, html, rounds):
+    """Tempo de CPU médio por página (µs)"""
+    start = time.process_time()
+    for _ in range(rounds):
+        fn(html)
+    return (time.process_time() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=500, help='Repetições por página')
+    args = parser.parse_args()
+
+    header = f"{'página':<11} {'KiB':>6} {'antes µs':>10} {'depois µs':>10} {'ganho':>8}  resultado"
+    print(header)
+    print('-' * len(header))
+
+    mismatches = 0
+    for name, html in build_pages().items():
+        before_url, _ = legacy_scan(html)
+        after_url, priority = current_scan(html)
+        if before_url != after_url:
+            mismatches += 1
+
+        before = cpu_time(legacy_scan, html, args.rounds)
+        after = cpu_time(current_scan, html, args.rounds)
+        found = f"#{priority + 1} {after_url[:40]}" if priority is not None else (after_url or '-')[:43]
+        flag = '' if before_url == after_url else '  ⚠ difere da busca antiga'
+        print(f"{name:<11} {len(html) / 1024:>6.1f} {before:>10.1f} {after:>10.1f} {before / after:>7.1f}x  {found}{flag}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark da serialização das respostas grandes da API
+
+Monta um corpo no formato de /api/most-watched (filmes e séries com
+episódios, textos em português) e compara, por resposta, o tempo de encode
+e o tamanho em bytes de:
+
+  stdlib ascii    json da stdlib com ensure_ascii=True (provider padrão do Flask)
+  stdlib utf-8    json da stdlib com ensure_ascii=False
+  orjson          FastJSONProvider (UTF-8; só se o orjson estiver instalado)
+  pré-serializado bytes guardados do snapshot + campo "age" (most_watched_from_snapshot)
+
+Todas as variantes usam sort_keys e separadores compactos, como o Flask.
+
+Uso:
+    python bench_json.py [--series 40] [--episodes 20] [--rounds 200]
+"""
+import argparse
+import json
+import time
+
+from flask import Flask
+
+from cnvsweb_json import FastJSONProvider, orjson
+
+
+def build_body(series_count, episodes_per_series):
+    movies = [{
+        'title': f'Ação e Coração: Crônicas do Sertão {n}',
+        'type': 'movie',
+        'watch_link': f'/assistir/acao-e-coracao-{n}',
+        'duration_or_seasons': '2h 14min',
+        'year': '2023',
+        'imdb': '7.4',
+        'image_url': f'https://image.tmdb.org/t/p/w342/acao-e-coracao-{n}.jpg',
+        'player_url': f'https://cnvsweb.stream/player/{n}',
+        'video_url': f'https://server-amz.playmycnvs.com/f/acao-e-coracao-{n}/1080p.mp4?token=abc{n}',
+        'is_series': False,
+        'episodes': []
+    } for n in range(series_count)]
+    series = [{
+        'title': f'Mistérios da Ilha: Temporada Perdida {n}',
+        'type': 'series',
+        'watch_link': f'/assistir/misterios-da-ilha-{n}',
+        'duration_or_seasons': '3 Temporadas',
+        'year': '2021',
+        'imdb': '8.1',
+        'image_url': f'https://image.tmdb.org/t/p/w342/misterios-da-ilha-{n}.jpg',
+        'player_url': None,
+        'video_url': None,
+        'is_series': True,
+        'episodes': [{
+            'episode_id': f'ep-{n}-{e}',
+            'season': f'{e // 10 + 1}ª Temporada',
+            'season_id': str(e // 10 + 1),
+            'title': f'Episódio {e + 1}: A Invasão do Tubarão',
+            'duration': '45min',
+            'published_date': '12 de março de 2021',
+            'player_url': f'https://cnvsweb.stream/player/ep/{n}-{e}',
+            'video_url': f'https://server-amz.playmycnvs.com/f/ep-{n}-{e}/720p.mp4?token=xyz'
+        } for e in range(episodes_per_series)]
+    } for n in range(series_count)]
+    return {
+        'success': True,
+        'summary': {'total': len(movies) + len(series), 'movies': len(movies), 'series': len(series)},
+        'movies': movies,
+        'series': series,
+        'updated_at': time.time()
+    }
+
+
+def measure(fn, rounds):
+    """Tempo médio por chamada (µs) e o último resultado"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    return (time.perf_counter() - start) / rounds * 1e6, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--series', type=int, default=40, help='Séries (e filmes) no corpo')
+    parser.add_argument('--episodes', type=int, default=20, help='Episódios por série')
+    parser.add_argument('--rounds', type=int, default=200, help='Repetições por variante')
+    args = parser.parse_args()
+
+    body = build_body(args.series, args.episodes)
+    provider = FastJSONProvider(Flask(__name__))
+    cached = provider.dumps_bytes(body)
+
+    variants = {
+        'stdlib ascii': lambda: json.dumps(body, ensure_ascii=True, sort_keys=True, separators=(',', ':')).encode(),
+        'stdlib utf-8': lambda: json.dumps(body, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode(),
+    }
+    if orjson is not None:
+        variants['orjson'] = lambda: provider.dumps_bytes(body)
+    variants['pré-serializado'] = lambda: b'{"age":%d,%s' % (12, cached[1:])
+
+    header = f"{'variante':<16} {'µs':>9} {'KiB':>8} {'vs ascii':>9}"
+    print(header)
+    print('-' * len(header))
+
+    base_us = base_size = None
+    for name, fn in variants.items():
+        us, data = measure(fn, args.rounds)
+        base_us = base_us or us
+        base_size = base_size or len(data)
+        assert json.loads(data)['summary'] == body['summary']
+        print(f"{name:<16} {us:>9.1f} {len(data) / 1024:>8.1f} {base_us / us:>8.1f}x  ({len(data) / base_size:.0%} do tamanho)")
+
+    if orjson is None:
+        print("\norjson não instalado: o provider usa o json da stdlib (utf-8)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
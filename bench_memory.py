@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memória dos títulos e episódios guardados em cache
+
+Mede (tracemalloc) os bytes por registro de N títulos e N episódios
+guardados como dict (formato do scraper, antes) e como Title/Episode
+(__slots__, depois). As strings são as mesmas nos dois casos, então a
+diferença é só o custo do contêiner. Também mede o TitleIndex inteiro
+(bytes por título indexado) e o tempo de to_dict(), pago a cada resposta.
+
+Uso:
+    python bench_memory.py [--titles 20000]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from cnvsweb_catalog import TitleIndex
+from cnvsweb_records import Episode, Title
+
+
+def build_dicts(count, seed=42):
+    rng = random.Random(seed)
+    titles, episodes = [], []
+    for n in range(count):
+        is_series = rng.random() < 0.4
+        titles.append({
+            'title': f'Título {n}',
+            'type': 'series' if is_series else 'movie',
+            'watch_link': f'/assistir/titulo-{n}',
+            'duration_or_seasons': f'{rng.randint(1, 9)} Temporadas' if is_series else f'{rng.randint(80, 180)} min',
+            'year': str(rng.randint(1970, 2025)),
+            'imdb': f'{rng.uniform(3, 9.5):.1f}',
+            'image_url': f'https://image.tmdb.org/t/p/w342/titulo-{n}.jpg',
+            'player_url': None,
+            'video_url': None,
+            'is_series': is_series,
+            'episodes': []
+        })
+        episodes.append({
+            'episode_id': str(n),
+            'season': f'Temporada {n % 5 + 1}',
+            'season_id': str(n % 5 + 1),
+            'title': f'Episódio {n}',
+            'duration': '45 min',
+            'published_date': '2024-01-01',
+            'player_url': f'https://player.example.com/e/{n}',
+            'video_url': None
+        })
+    return titles, episodes
+
+
+def build_index(titles):
+    index = TitleIndex()
+    index.add(titles)
+    return index
+
+
+def allocated(build):
+    """(objeto construído, bytes alocados durante a construção)"""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    obj = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titles', type=int, default=20000, help='Títulos (e episódios) medidos')
+    args = parser.parse_args()
+
+    titles, episodes = build_dicts(args.titles)
+    n = len(titles)
+
+    header = f"{'registro':<9} {'dict B':>8} {'slots B':>8} {'economia':>9}"
+    print(header)
+    print('-' * len(header))
+
+    rows = [
+        ('título', lambda: [dict(t) for t in titles], lambda: [Title.from_dict(t) for t in titles]),
+        ('episódio', lambda: [dict(e) for e in episodes], lambda: [Episode.from_dict(e) for e in episodes]),
+    ]
+    for name, as_dicts, as_records in rows:
+        _, dict_bytes = allocated(as_dicts)
+        records, slot_bytes = allocated(as_records)
+        print(f"{name:<9} {dict_bytes / n:>8.0f} {slot_bytes / n:>8.0f} {1 - slot_bytes / dict_bytes:>8.0%}")
+
+    index, index_bytes = allocated(lambda: build_index(titles))
+    print(f"\nTitleIndex: {index_bytes / n:.0f} B por título indexado ({index_bytes / 1024 / 1024:.1f} MiB para {len(index)})")
+
+    start = time.perf_counter()
+    for record in records:
+        record.to_dict()
+    print(f"to_dict(): {(time.perf_counter() - start) / n * 1e9:.0f} ns por episódio")
+
+    assert [Title.from_dict(t).to_dict() for t in titles[:100]] == titles[:100]
+    assert [Episode.from_dict(e).to_dict() for e in episodes[:100]] == episodes[:100]
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark de parsing - html.parser completo vs backend configurado + SoupStrainer
+
+Mede, para cada tipo de página das fixtures (fixtures/*.html), o tempo de
+parse (mediana) e o pico de memória (tracemalloc) de:
+  - baseline: BeautifulSoup(html, 'html.parser') da página inteira
+  - strainer: make_soup() com o SoupStrainer do extrator, em cada backend
+
+Uso:
+    python bench_parse.py [--rounds 20]
+"""
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+import cnvsweb_scraper as cs
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Tipo de página -> (fixture, strainer usado pelo extrator)
+PAGES = {
+    'home': ('home.html', cs.HOME_STRAINER),
+    'search': ('search.html', cs.SEARCH_STRAINER),
+    'watch': ('watch_movie.html', cs.WATCH_PAGE_STRAINER),
+    'details': ('watch_movie.html', cs.DETAILS_PAGE_STRAINER),
+    'series': ('series.html', cs.SERIES_STRAINER),
+    'player': ('player.html', cs.PLAYER_PAGE_STRAINER),
+}
+
+
+def load_page(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def available_parsers():
+    parsers = ['html.parser']
+    try:
+        import lxml  # noqa: F401
+        parsers.append('lxml')
+    except ImportError:
+        pass
+    return parsers
+
+
+def measure(fn, rounds):
+    """Retorna (mediana em ms, pico de memória em KiB)"""
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak / 1024
+
+
+def run(rounds):
+    parsers = available_parsers()
+    header = f"{'página':<9} {'KiB':>6} {'variante':<22} {'ms':>8} {'pico KiB':>9} {'tempo':>7} {'memória':>8}"
+    print(header)
+    print('-' * len(header))
+
+    for name, (fixture, strainer) in PAGES.items():
+        html = load_page(fixture)
+        base_ms, base_kib = measure(lambda: BeautifulSoup(html, 'html.parser'), rounds)
+        print(f"{name:<9} {len(html) / 1024:>6.1f} {'html.parser (completo)':<22} {base_ms:>8.2f} {base_kib:>9.0f} {'1.00x':>7} {'1.00x':>8}")
+
+        for parser in parsers:
+            ms, kib = measure(lambda: cs.make_soup(html, strainer, parser=parser), rounds)
+            print(f"{'':<9} {'':>6} {parser + ' + strainer':<22} {ms:>8.2f} {kib:>9.0f} "
+                  f"{base_ms / ms:>6.2f}x {base_kib / kib:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=20, help='Repetições por medição')
+    args = parser.parse_args()
+
+    print(f"Backend padrão: {cs.HTML_PARSER}\n")
+    run(args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark do pipeline de cards (página principal e busca)
+
+Mede o tempo de CPU de cada etapa do pipeline compartilhado por
+get_most_watched_today e search_movies, sem rede e sem enriquecimento:
+
+  parse      make_soup + _iter_cards (um registro por card)
+  organize   separação em filmes/séries: organize_items (uma passada)
+             contra a versão anterior (quatro list comprehensions)
+  total      parse + organize, o custo de CPU de uma requisição
+
+A separação também é medida em uma lista grande (--items cards), onde a
+diferença entre uma e quatro passadas aparece.
+
+Uso:
+    python bench_pipeline.py [--rounds 200] [--items 10000]
+"""
+import argparse
+import os
+import time
+
+import cnvsweb_scraper as cs
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+# Cópia da separação anterior, como referência
+def legacy_organize(movies):
+    return {
+        'movies': [m for m in movies if m['type'] == 'movie'],
+        'series': [m for m in movies if m['type'] == 'series'],
+        'summary': {
+            'total': len(movies),
+            'movies': len([m for m in movies if m['type'] == 'movie']),
+            'series': len([m for m in movies if m['type'] == 'series'])
+        }
+    }
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read().replace('{{BASE}}', 'http://127.0.0.1').encode('utf-8')
+
+
+def cpu_time(fn, rounds):
+    """Tempo de CPU médio por chamada (µs)"""
+    start = time.process_time()
+    for _ in range(rounds):
+        fn()
+    return (time.process_time() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=200, help='Repetições por medição')
+    parser.add_argument('--items', type=int, default=10000, help='Cards na lista grande')
+    args = parser.parse_args()
+
+    scraper = cs.CNVSWebScraper('bench', base_url='http://127.0.0.1')
+    pages = {
+        'home': (load_fixture('home.html'), scraper._parse_most_watched_items),
+        'search': (load_fixture('search.html'), scraper._parse_search_items),
+    }
+
+    header = f"{'página':<8} {'cards':>6} {'parse µs':>9} {'antes µs':>9} {'organize µs':>12} {'total µs':>9}"
+    print(header)
+    print('-' * len(header))
+
+    mismatches = 0
+    for name, (markup, parse) in pages.items():
+        movies = parse(markup)
+        if legacy_organize(movies) != cs.organize_items(movies):
+            mismatches += 1
+
+        parse_us = cpu_time(lambda: parse(markup), args.rounds)
+        before_us = cpu_time(lambda: legacy_organize(movies), args.rounds * 10)
+        after_us = cpu_time(lambda: cs.organize_items(movies), args.rounds * 10)
+        total_us = cpu_time(lambda: cs.organize_items(parse(markup)), args.rounds)
+        print(f"{name:<8} {len(movies):>6} {parse_us:>9.1f} {before_us:>9.2f} {after_us:>12.2f} {total_us:>9.1f}")
+
+    home_cards = pages['home'][1](pages['home'][0])
+    big = [dict(home_cards[n % len(home_cards)]) for n in range(args.items)]
+    before_us = cpu_time(lambda: legacy_organize(big), max(1, args.rounds // 10))
+    after_us = cpu_time(lambda: cs.organize_items(big), max(1, args.rounds // 10))
+    print(f"\norganize com {len(big)} cards: antes {before_us:.0f} µs, depois {after_us:.0f} µs "
+          f"({before_us / after_us:.1f}x)")
+
+    if mismatches:
+        print(f"\n⚠ {mismatches} página(s) com resultado diferente da separação anterior")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Benchmark offline dos extratores contra um servidor local com as fixtures
+
+Sobe um servidor HTTP local que responde com o HTML gravado em fixtures/
+(ver fixtures/routes.json) e roda cada etapa do scraper N vezes, com o
+cache de URLs limpo a cada rodada (latência "fria"):
+
+  most_watched   get_most_watched_today (com URLs de vídeo)
+  search         search_movies (com URLs de vídeo)
+  movie_details  get_movie_details
+  series         get_series_episodes
+  player_url     get_player_url
+  video_mp4_url  get_video_mp4_url
+
+Relata p50/p90/p99 (ms), pico de memória e número de blocos alocados
+(tracemalloc) e compara com o baseline salvo em bench_baseline.json.
+
+As latências do baseline são ajustadas à máquina atual: antes das etapas
+e depois delas o benchmark mede uma carga de referência fixa (parse da
+home.html com o html.parser, que não depende do código do scraper) e
+escala os tempos do baseline pela razão entre a melhor dessas medições e
+a gravada junto com ele. Uma etapa que ainda passe da tolerância é medida
+de novo (--recheck) e só conta como regressão se o melhor p50 continuar
+acima.
+
+Uso:
+    python bench_scraper.py                  # roda e compara com o baseline
+    python bench_scraper.py --save-baseline  # grava o baseline atual
+    python bench_scraper.py --latency 20     # simula 20ms de latência da origem
+    python bench_scraper.py --engine async   # motor asyncio/httpx (BlockingScraper)
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+from cnvsweb_scraper import BlockingScraper, CNVSWebScraper, URLCache
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(ROOT, 'fixtures')
+BASELINE_FILE = os.path.join(ROOT, 'bench_baseline.json')
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+class _FixtureHTTPServer(ThreadingHTTPServer):
+    # O backlog padrão (5) derruba conexões quando o motor async abre dezenas
+    # de uma vez (o cliente só tenta de novo ~1s depois)
+    request_queue_size = 128
+
+
+class FixtureServer:
+    """Servidor HTTP local que imita o cnvsweb.stream usando as fixtures"""
+
+    def __init__(self, latency=0.0):
+        with open(os.path.join(FIXTURES_DIR, 'routes.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        self.latency = latency
+        self.routes = manifest['routes']
+        self.series = set(manifest['series'])
+        self.series_page = manifest['series_page']
+        self.requests = 0
+        self._pages = {}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                body = server.render(urlparse(self.path).path)
+                if body is None:
+                    self.send_error(404)
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = _FixtureHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def page(self, name):
+        if name not in self._pages:
+            self._pages[name] = load_fixture(name).replace('{{BASE}}', self.base_url).encode('utf-8')
+        return self._pages[name]
+
+    def route(self, path):
+        """Nome da fixture que responde pelo path (None = 404)"""
+        if path in self.series:
+            return self.series_page
+        for prefix, name in self.routes:
+            if path == prefix or (prefix != '/' and path.startswith(prefix)):
+                return name
+        return None
+
+    def render(self, path):
+        name = self.route(path)
+        return self.page(name) if name else None
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def build_stages(scraper, base_url):
+    """Etapas medidas: nome -> função sem argumentos"""
+    return {
+        'most_watched': lambda: scraper.get_most_watched_today(get_video_urls=True, max_episodes_per_series=5),
+        'search': lambda: scraper.search_movies('batman', get_video_urls=True, max_episodes_per_series=5),
+        'movie_details': lambda: scraper.get_movie_details('/watch/velozes-e-furiosos'),
+        'series': lambda: scraper.get_series_episodes('/watch/the-last-of-us'),
+        'player_url': lambda: scraper.get_player_url('/watch/velozes-e-furiosos'),
+        'video_mp4_url': lambda: scraper.get_video_mp4_url(f'{base_url}/player/velozes-e-furiosos?token=f1c2'),
+    }
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def run_stage(fn, cache, rounds, warmup):
+    """Mede uma etapa; o stdout do scraper é descartado durante a medição"""
+    sink = io.StringIO()
+    timings = []
+
+    with contextlib.redirect_stdout(sink):
+        for i in range(warmup + rounds):
+            cache.clear()
+            start = time.perf_counter()
+            result = fn()
+            elapsed = (time.perf_counter() - start) * 1000
+            if i >= warmup:
+                timings.append(elapsed)
+            sink.seek(0)
+            sink.truncate()
+
+        cache.clear()
+        # Sem o lixo das rodadas anteriores, o pico medido é só o desta chamada
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+        tracemalloc.stop()
+
+    return {
+        'p50': round(percentile(timings, 50), 3),
+        'p90': round(percentile(timings, 90), 3),
+        'p99': round(percentile(timings, 99), 3),
+        'peak_kib': round(peak / 1024, 1),
+        'blocks': blocks,
+        'ok': bool(result),
+    }
+
+
+def calibrate(rounds=15):
+    """
+    Melhor tempo (ms) da carga de referência: mede a velocidade da máquina,
+    não a do scraper (o mínimo varia bem menos que a mediana entre rodadas)
+    """
+    markup = load_fixture('home.html')
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        BeautifulSoup(markup, 'html.parser').find_all('a')
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(min(timings), 3)
+
+
+# Diferença absoluta mínima para contar como regressão (evita ruído em etapas de poucos ms)
+MIN_DELTA = {'p50': 5.0, 'peak_kib': 64.0}
+
+
+def compare(results, baseline, tolerance, speed=1.0):
+    """
+    Regressões (p50 ou pico de memória acima da tolerância), como
+    (etapa, métrica, esperado, atual)
+
+    `speed` é a razão calibração atual / calibração do baseline: o p50 do
+    baseline é multiplicado por ela antes da comparação (a memória não).
+    """
+    regressions = []
+    for stage, current in results.items():
+        previous = baseline.get('stages', {}).get(stage)
+        if not previous:
+            continue
+        for metric in ('p50', 'peak_kib'):
+            expected = previous[metric] * speed if metric == 'p50' else previous[metric]
+            if (expected
+                    and current[metric] > expected * (1 + tolerance)
+                    and current[metric] - expected > MIN_DELTA[metric]):
+                regressions.append((stage, metric, expected, current[metric]))
+    return regressions
+
+
+def print_stage(name, stats, note=''):
+    flag = '' if stats['ok'] else '  ⚠ resultado vazio'
+    print(f"{name:<15} {stats['p50']:>9.2f} {stats['p90']:>9.2f} {stats['p99']:>9.2f} "
+          f"{stats['peak_kib']:>9.1f} {stats['blocks']:>8}{flag}{note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=20, help='Rodadas medidas por etapa')
+    parser.add_argument('--warmup', type=int, default=2, help='Rodadas de aquecimento (descartadas)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Latência simulada da origem (ms)')
+    parser.add_argument('--workers', type=int, default=4, help='max_workers do scraper')
+    parser.add_argument('--engine', choices=('sync', 'async'), default='sync', help='Motor de I/O do scraper')
+    parser.add_argument('--stages', default='', help='Etapas separadas por vírgula (padrão: todas)')
+    parser.add_argument('--tolerance', type=float, default=0.20, help='Tolerância de regressão (0.20 = 20%%)')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='Arquivo de baseline')
+    parser.add_argument('--save-baseline', action='store_true', help='Grava o resultado como novo baseline')
+    parser.add_argument('--recheck', type=int, default=2,
+                        help='Vezes que uma etapa acima da tolerância é medida de novo (vale o melhor p50)')
+    args = parser.parse_args()
+
+    with FixtureServer(latency=args.latency / 1000.0) as server:
+        cache = URLCache()
+        if args.engine == 'async':
+            scraper = BlockingScraper('bench', rate_limit=0, cache=cache, base_url=server.base_url)
+        else:
+            scraper = CNVSWebScraper('bench', max_workers=args.workers, rate_limit=0, cache=cache, base_url=server.base_url)
+        stages = build_stages(scraper, server.base_url)
+        selected = [s for s in args.stages.split(',') if s] or list(stages)
+
+        calibration = calibrate()
+        print(f"Servidor local: {server.base_url} | latência simulada: {args.latency:.0f}ms | "
+              f"motor: {args.engine} | workers: {args.workers} | calibração: {calibration:.2f}ms\n")
+        header = f"{'etapa':<15} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'pico KiB':>9} {'blocos':>8}"
+        print(header)
+        print('-' * len(header))
+
+        results = {}
+        for name in selected:
+            results[name] = run_stage(stages[name], cache, args.rounds, args.warmup)
+            print_stage(name, results[name])
+
+        # A velocidade da máquina varia durante a rodada: vale a melhor de antes e depois
+        calibration = min(calibration, calibrate())
+
+        report = {
+            'python': sys.version.split()[0],
+            'latency_ms': args.latency,
+            'engine': args.engine,
+            'workers': args.workers,
+            'calibration_ms': calibration,
+            'stages': results,
+        }
+
+        if args.save_baseline:
+            with open(args.baseline, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+                f.write('\n')
+            print(f"\n✓ Baseline salvo em {args.baseline}")
+            return 0
+
+        if not os.path.exists(args.baseline):
+            print("\n⚠ Nenhum baseline encontrado (use --save-baseline)")
+            return 0
+
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+        # Baselines antigos não têm calibração: comparação absoluta
+        speed = calibration / baseline['calibration_ms'] if baseline.get('calibration_ms') else 1.0
+        if speed != 1.0:
+            print(f"\nMáquina {speed:.2f}x o tempo da que gravou o baseline (latências do baseline escaladas)")
+
+        # Uma máquina compartilhada tem picos de lentidão: só conta o que se repete
+        regressions = compare(results, baseline, args.tolerance, speed)
+        for _ in range(args.recheck):
+            slow = {stage for stage, metric, _, _ in regressions if metric == 'p50'}
+            if not slow:
+                break
+            for name in sorted(slow):
+                stats = run_stage(stages[name], cache, args.rounds, args.warmup)
+                if stats['p50'] < results[name]['p50']:
+                    results[name] = dict(results[name], p50=stats['p50'], p90=stats['p90'], p99=stats['p99'])
+                print_stage(name, stats, '  (medida de novo)')
+            regressions = compare(results, baseline, args.tolerance, speed)
+
+    if regressions:
+        print(f"\n✗ Regressões acima de {args.tolerance * 100:.0f}%:")
+        for stage, metric, expected, current in regressions:
+            print(f"   {stage}.{metric}: {expected:.1f} -> {current} (+{(current / expected - 1) * 100:.0f}%)")
+        return 1
+
+    print(f"\n✓ Sem regressões em relação ao baseline (tolerância {args.tolerance * 100:.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark da busca local de títulos
+
+Monta um catálogo sintético (títulos em português, com acentos e
+pontuação) e compara, por busca, o tempo do SQLite (Catalog.search, usado
+por /api/search-fast?source=catalog) com o índice em memória
+(TitleIndex.search, usado por source=local):
+
+  exata       título completo
+  prefixo     começo do título
+  palavras    duas palavras fora de ordem
+  acentos     sem acentos/maiúsculas ("coracao" -> "Coração")
+  erro        erro de digitação (só o índice encontra, via trigramas)
+  ausente     nada casa (caminho que cai para o site)
+
+Uso:
+    python bench_search.py [--titles 5000] [--rounds 2000]
+"""
+import argparse
+import random
+import time
+
+from cnvsweb_catalog import Catalog
+
+
+WORDS = [
+    'Homem', 'Aranha', 'Coração', 'Cavaleiro', 'Poderoso', 'Chefão', 'Cidade', 'Deus', 'Tropa', 'Elite',
+    'Noite', 'Estrelas', 'Vingança', 'Último', 'Mistério', 'Lenda', 'Guardiões', 'Galáxia', 'Sombra',
+    'Ação', 'Perdição', 'Família', 'Irmãos', 'Caçadores', 'Ilha', 'Sertão', 'Coisa', 'Invasão', 'Tubarão',
+]
+CONNECTORS = [' de', ' da', ' do', ' e', ' a', ' o', ' na', ':', ' -']
+
+
+def build_catalog(titles, seed=42):
+    rng = random.Random(seed)
+    items = [{
+        'title': 'O Poderoso Chefão: Parte II', 'type': 'movie', 'watch_link': '/assistir/chefao-2',
+        'year': '1974', 'imdb': '9.0'
+    }]
+    for n in range(titles):
+        first, *rest = rng.sample(WORDS, rng.randint(2, 4))
+        title = first + ''.join(f"{rng.choice(CONNECTORS)} {word}" for word in rest)
+        if rng.random() < 0.2:
+            title += f' {rng.randint(2, 5)}'
+        items.append({
+            'title': title, 'type': rng.choice(['movie', 'series']), 'watch_link': f'/assistir/titulo-{n}',
+            'year': str(rng.randint(1970, 2025)), 'imdb': f'{rng.uniform(3, 9.5):.1f}'
+        })
+    catalog = Catalog(':memory:')
+    catalog.add_titles(items)
+    return catalog
+
+
+QUERIES = {
+    'exata': 'O Poderoso Chefão: Parte II',
+    'prefixo': 'O Poderoso Ch',
+    'palavras': 'parte chefão',
+    'acentos': 'CORACAO CAVALEIRO',
+    'erro': 'poderozo chefao parte',
+    'ausente': 'xyzzy',
+}
+
+
+def timed(fn, query, rounds):
+    """Tempo médio por busca (µs) e quantidade de resultados"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        found = fn(query)
+    return (time.perf_counter() - start) / rounds * 1e6, len(found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titles', type=int, default=5000, help='Títulos no catálogo sintético')
+    parser.add_argument('--rounds', type=int, default=2000, help='Repetições por busca')
+    args = parser.parse_args()
+
+    catalog = build_catalog(args.titles)
+    print(f"{len(catalog.index)} títulos indexados\n")
+
+    header = f"{'busca':<9} {'sqlite µs':>10} {'achados':>8} {'índice µs':>10} {'achados':>8}  melhor (índice)"
+    print(header)
+    print('-' * len(header))
+
+    slowest = 0.0
+    for name, query in QUERIES.items():
+        sql_us, sql_found = timed(catalog.search, query, args.rounds)
+        index_us, index_found = timed(catalog.index.search, query, args.rounds)
+        slowest = max(slowest, index_us)
+        best = catalog.index.search(query, limit=1)
+        print(f"{name:<9} {sql_us:>10.1f} {sql_found:>8} {index_us:>10.1f} {index_found:>8}  {best[0]['title'] if best else '-'}")
+
+    print(f"\nmais lenta no índice: {slowest / 1000:.3f} ms")
+    return 0 if slowest < 1000 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,485 @@
+import bisect
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import Counter
+from urllib.parse import urlparse
+
+from cnvsweb_records import Episode, Title
+
+
+# Campos de get_movie_details guardados junto do título (coluna details, JSON)
+DETAIL_FIELDS = (
+    'original_title', 'duration', 'genres', 'imdb_rating', 'synopsis',
+    'director', 'cast', 'trailer_url', 'backdrop_url'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS titles (
+    watch_link TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    norm_title TEXT NOT NULL,
+    type TEXT NOT NULL,
+    duration_or_seasons TEXT NOT NULL DEFAULT '',
+    year TEXT NOT NULL DEFAULT '',
+    imdb TEXT NOT NULL DEFAULT '',
+    image_url TEXT NOT NULL DEFAULT '',
+    details TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS titles_norm_title ON titles (norm_title);
+
+CREATE TABLE IF NOT EXISTS episodes (
+    watch_link TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    season_id TEXT NOT NULL,
+    season TEXT NOT NULL,
+    episode_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    duration TEXT NOT NULL,
+    published_date TEXT NOT NULL,
+    player_url TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (watch_link, position)
+);
+
+CREATE TABLE IF NOT EXISTS urls (
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (kind, url)
+);
+"""
+
+
+def normalize_title(text):
+    """Minúsculas, sem acentos e com espaços simples ("Coração  Valente" -> "coracao valente")"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.casefold().split())
+
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def title_tokens(text):
+    """Palavras do título normalizado, sem pontuação ("Homem-Aranha: Sem Volta" -> homem, aranha, sem, volta)"""
+    return _TOKEN_RE.findall(normalize_title(text))
+
+
+def trigrams(tokens):
+    """Trigramas de cada palavra, com bordas ("  h", " ho", "hom", ...) para valorizar o início"""
+    grams = set()
+    for token in tokens:
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _number(text, cast):
+    try:
+        return cast(text)
+    except (TypeError, ValueError):
+        return 0
+
+
+def link_key(watch_link):
+    """Chave do título: o path do watch_link (os cards trazem URLs relativas, a série absolutas)"""
+    return urlparse(watch_link).path or watch_link
+
+
+class TitleIndex:
+    """
+    Índice invertido em memória dos títulos do catálogo
+
+    Cada palavra da busca casa com o início de uma palavra do título (sem
+    acentos e sem diferença de maiúsculas); palavras que não casam com nada
+    são corrigidas pelas palavras do vocabulário com trigramas parecidos
+    (erros de digitação). Resultados ordenados pela qualidade do casamento e
+    depois por IMDb e ano.
+
+    Os títulos ficam guardados como Title (__slots__); a busca devolve dicts
+    novos no formato dos cards do scraper.
+    """
+
+    def __init__(self, min_similarity=0.4):
+        self.min_similarity = min_similarity
+        self._lock = threading.Lock()
+        self._items = {}         # watch_link -> Title
+        self._entries = {}       # watch_link -> (título normalizado, palavras, rank)
+        self._postings = {}      # palavra -> {watch_link}
+        self._vocabulary = []    # palavras ordenadas (busca por prefixo)
+        self._trigrams = {}      # trigrama -> {palavra}
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, watch_link):
+        return watch_link in self._items
+
+    def add(self, items):
+        """Indexa/atualiza os cards (watch_link já normalizado com link_key)"""
+        with self._lock:
+            for item in items:
+                if item.get('watch_link') and item.get('title'):
+                    self._remove(item['watch_link'])
+                    self._add(Title.from_dict(item))
+
+    def _add(self, item):
+        key = item.watch_link
+        tokens = title_tokens(item.title)
+        rank = (-_number(item.imdb, float), -_number(item.year, int))
+
+        self._items[key] = item
+        self._entries[key] = (' '.join(tokens), tokens, rank)
+        for token in set(tokens):
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                bisect.insort(self._vocabulary, token)
+                for gram in trigrams([token]):
+                    self._trigrams.setdefault(gram, set()).add(token)
+            postings.add(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        del self._items[key]
+        for token in set(entry[1]):
+            postings = self._postings[token]
+            postings.discard(key)
+            if postings:
+                continue
+            del self._postings[token]
+            del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+            for gram in trigrams([token]):
+                words = self._trigrams[gram]
+                words.discard(token)
+                if not words:
+                    del self._trigrams[gram]
+
+    def _prefix_matches(self, token):
+        """watch_links com alguma palavra que começa com `token`"""
+        matches = set()
+        i = bisect.bisect_left(self._vocabulary, token)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(token):
+            matches |= self._postings[self._vocabulary[i]]
+            i += 1
+        return matches
+
+    def _similar_matches(self, token):
+        """watch_links -> similaridade, pelas palavras do vocabulário parecidas com `token` (Jaccard de trigramas)"""
+        grams = trigrams([token])
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigrams.get(gram, ()))
+
+        matches = {}
+        for word, count in shared.items():
+            similarity = count / (len(grams) + len(word) + 2 - count)    # len(word) + 2 = trigramas da palavra
+            if similarity < self.min_similarity:
+                continue
+            for key in self._postings[word]:
+                if similarity > matches.get(key, 0):
+                    matches[key] = similarity
+        return matches
+
+    def search(self, query, limit=None):
+        """Cards que casam com a busca, do melhor para o pior"""
+        tokens = title_tokens(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            # Todas as palavras da busca precisam casar (as mais longas primeiro, que filtram mais)
+            candidates = None
+            similarity = {}    # watch_link -> pior similaridade entre as palavras corrigidas
+            for token in sorted(set(tokens), key=len, reverse=True):
+                matches = self._prefix_matches(token)
+                if not matches:
+                    similar = self._similar_matches(token)
+                    for key, value in similar.items():
+                        similarity[key] = min(similarity.get(key, 1.0), value)
+                    matches = similar.keys()
+                candidates = set(matches) if candidates is None else candidates & matches
+                if not candidates:
+                    return []
+
+            phrase = ' '.join(tokens)
+            scored = []
+            for key in candidates:
+                norm, _, rank = self._entries[key]
+                if key in similarity:
+                    quality = (0, -round(similarity[key], 1))
+                else:
+                    quality = (-2 if norm == phrase else -1 if norm.startswith(phrase) else 0, -1.0)
+                scored.append((quality + rank, key))
+
+            scored.sort()
+            if limit and limit > 0:
+                scored = scored[:limit]
+            return [self._items[key].to_dict() for _, key in scored]
+
+
+class Catalog:
+    """
+    Catálogo local (SQLite) de títulos, episódios e URLs resolvidas
+
+    Alimentado pelos resultados do scraper (cards da busca e do "Mais Visto",
+    detalhes de filmes, episódios de séries e URLs de player/vídeo) e
+    mantido entre reinícios. Responde a busca rápida por título sem acessar
+    o site e reaquece o URLCache na inicialização.
+
+    Uma conexão compartilhada entre threads (protegida por lock) em modo WAL.
+    Os títulos também ficam em um TitleIndex em memória (self.index),
+    carregado na abertura e atualizado a cada gravação; com vários
+    processos no mesmo arquivo, sync_index() traz as gravações dos outros.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+            rows = self._conn.execute('SELECT * FROM titles').fetchall()
+
+        self.index = TitleIndex()
+        self.index.add(self._card(row) for row in rows)
+        self._synced_at = max((row['updated_at'] for row in rows), default=0)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _write(self, sql, rows):
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(sql, rows)
+
+    def add_titles(self, items):
+        """Grava/atualiza os cards (mantém os detalhes já conhecidos)"""
+        now = time.time()
+        items = [item for item in items if item.get('watch_link')]
+        rows = [
+            (
+                link_key(item['watch_link']), item['title'], normalize_title(item['title']), item['type'],
+                item.get('duration_or_seasons', ''), item.get('year', ''), item.get('imdb', ''),
+                item.get('image_url', ''), now
+            )
+            for item in items
+        ]
+        if not rows:
+            return
+        self._write("""
+            INSERT INTO titles (watch_link, title, norm_title, type, duration_or_seasons, year, imdb, image_url, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (watch_link) DO UPDATE SET
+                title = excluded.title, norm_title = excluded.norm_title, type = excluded.type,
+                duration_or_seasons = excluded.duration_or_seasons, year = excluded.year,
+                imdb = excluded.imdb, image_url = excluded.image_url, updated_at = excluded.updated_at
+        """, rows)
+        self.index.add(
+            dict(item, watch_link=link_key(item['watch_link']), player_url=None, video_url=None, episodes=[])
+            for item in items
+        )
+
+    def add_details(self, info):
+        """Grava o resultado de get_movie_details (cria o título se ainda não existir)"""
+        if not info or not info.get('watch_link') or not info.get('title'):
+            return
+        details = json.dumps({k: info.get(k) for k in DETAIL_FIELDS}, ensure_ascii=False)
+        is_series = 'Temporada' in info.get('duration', '')
+        self._write("""
+            INSERT INTO titles (watch_link, title, norm_title, type, duration_or_seasons, year, imdb, image_url, details, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (watch_link) DO UPDATE SET details = excluded.details, updated_at = excluded.updated_at
+        """, [(
+            link_key(info['watch_link']), info['title'], normalize_title(info['title']),
+            'series' if is_series else 'movie', info.get('duration', ''), info.get('year', ''),
+            info.get('imdb_rating', ''), info.get('image_url', ''), details, time.time()
+        )])
+        if link_key(info['watch_link']) not in self.index:
+            card = self.get_title(info['watch_link'])
+            card.pop('details', None)
+            self.index.add([card])
+
+    def sync_index(self, overlap=5.0):
+        """
+        Indexa os títulos gravados por outros processos desde a última sincronização
+
+        `overlap` (segundos) cobre gravações que terminaram depois de um
+        updated_at já visto; reindexar um título é só um upsert.
+
+        Returns:
+            Quantidade de títulos (re)indexados
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT * FROM titles WHERE updated_at > ?', (self._synced_at - overlap,)
+            ).fetchall()
+        if rows:
+            self.index.add(self._card(row) for row in rows)
+            self._synced_at = max(self._synced_at, max(row['updated_at'] for row in rows))
+        return len(rows)
+
+    def add_episodes(self, watch_link, episodes):
+        """Substitui os episódios conhecidos da série (na ordem do site)"""
+        key = link_key(watch_link)
+        now = time.time()
+        rows = [
+            (
+                key, position, ep.get('season_id') or '', ep.get('season') or '', ep.get('episode_id') or '',
+                ep.get('title') or '', ep.get('duration') or '', ep.get('published_date') or '',
+                ep.get('player_url'), now
+            )
+            for position, ep in enumerate(episodes)
+        ]
+        with self._lock:
+            with self._conn:
+                self._conn.execute('DELETE FROM episodes WHERE watch_link = ?', (key,))
+                self._conn.executemany('INSERT INTO episodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def add_url(self, kind, url, value, expires_at):
+        """Guarda uma URL resolvida ('player' ou 'mp4') até expirar"""
+        self._write('INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?)', [(kind, url, value, expires_at)])
+
+    def _card(self, row):
+        """Linha de titles no mesmo formato dos itens do scraper"""
+        is_series = row['type'] == 'series'
+        return {
+            'title': row['title'],
+            'type': row['type'],
+            'watch_link': row['watch_link'],
+            'duration_or_seasons': row['duration_or_seasons'],
+            'year': row['year'],
+            'imdb': row['imdb'],
+            'image_url': row['image_url'],
+            'player_url': None,
+            'video_url': None,
+            'is_series': is_series,
+            'episodes': []
+        }
+
+    def search(self, query, limit=None):
+        """
+        Títulos cujo nome normalizado contém a busca
+
+        Os que começam com a busca vêm primeiro (faixa no índice de
+        norm_title); os demais, em que ela aparece no meio, depois.
+        """
+        norm = normalize_title(query)
+        if not norm:
+            return []
+
+        limit = limit if limit and limit > 0 else -1
+        with self._lock:
+            prefix = self._conn.execute(
+                'SELECT * FROM titles WHERE norm_title >= ? AND norm_title < ? ORDER BY norm_title LIMIT ?',
+                (norm, norm + '\uffff', limit)
+            ).fetchall()
+            rows = list(prefix)
+            if limit < 0 or len(rows) < limit:
+                rows += self._conn.execute(
+                    'SELECT * FROM titles WHERE instr(norm_title, ?) > 1 ORDER BY norm_title LIMIT ?',
+                    (norm, limit - len(rows) if limit > 0 else -1)
+                ).fetchall()
+        return [self._card(row) for row in rows]
+
+    def get_title(self, watch_link):
+        """Card + detalhes (se conhecidos) de um título, ou None"""
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM titles WHERE watch_link = ?', (link_key(watch_link),)).fetchone()
+        if row is None:
+            return None
+        item = self._card(row)
+        if row['details']:
+            item['details'] = json.loads(row['details'])
+        return item
+
+    def get_episodes(self, watch_link):
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT * FROM episodes WHERE watch_link = ? ORDER BY position', (link_key(watch_link),)
+            ).fetchall()
+        return [
+            {
+                'episode_id': row['episode_id'],
+                'season': row['season'],
+                'season_id': row['season_id'],
+                'title': row['title'],
+                'duration': row['duration'],
+                'published_date': row['published_date'],
+                'player_url': row['player_url'],
+                'video_url': None
+            }
+            for row in rows
+        ]
+
+    def warm(self, cache, base_url, season_ttl):
+        """
+        Recarrega no URLCache as URLs ainda válidas e as temporadas recentes
+
+        Args:
+            cache: URLCache a aquecer
+            base_url: Origem usada nas chaves de temporada do scraper
+            season_ttl: TTL das temporadas antigas (a mais recente usa o TTL padrão do cache)
+
+        Returns:
+            {urls: n, seasons: n}
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute('DELETE FROM urls WHERE expires_at <= ?', (now,))
+            urls = self._conn.execute('SELECT kind, url, value, expires_at FROM urls').fetchall()
+            episodes = self._conn.execute(
+                'SELECT * FROM episodes WHERE updated_at > ? ORDER BY watch_link, position',
+                (now - season_ttl,)
+            ).fetchall()
+
+        for row in urls:
+            cache.set((row['kind'], row['url']), row['value'], row['expires_at'] - now)
+
+        # Agrupa por série e temporada (na ordem do site; a última é a mais recente)
+        by_series = {}
+        for row in episodes:
+            seasons = by_series.setdefault(row['watch_link'], {})
+            seasons.setdefault(row['season_id'], []).append(row)
+
+        warmed = 0
+        for key, seasons in by_series.items():
+            watch_link = base_url.rstrip('/') + key
+            newest_id = list(seasons)[-1]
+            for season_id, rows in seasons.items():
+                if season_id in ('', 'unknown'):
+                    continue
+                age = now - rows[0]['updated_at']
+                ttl = (cache.default_ttl if season_id == newest_id else season_ttl) - age
+                if ttl <= 0:
+                    continue
+                season_episodes = tuple(
+                    Episode(
+                        row['episode_id'], row['season'], row['season_id'], row['title'], row['duration'],
+                        row['published_date'], row['player_url']
+                    )
+                    for row in rows
+                )
+                cache.set(('season', watch_link, season_id), season_episodes, ttl)
+                warmed += 1
+
+        return {'urls': len(urls), 'seasons': warmed}
+
+    def stats(self):
+        with self._lock:
+            titles = self._conn.execute('SELECT COUNT(*) FROM titles').fetchone()[0]
+            episodes = self._conn.execute('SELECT COUNT(*) FROM episodes').fetchone()[0]
+            urls = self._conn.execute('SELECT COUNT(*) FROM urls WHERE expires_at > ?', (time.time(),)).fetchone()[0]
+        return {'titles': titles, 'indexed': len(self.index), 'episodes': episodes, 'urls': urls}
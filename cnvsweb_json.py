@@ -0,0 +1,72 @@
+"""
+Serialização JSON das respostas da API
+
+FastJSONProvider substitui o provider padrão do Flask: usa o orjson quando
+ele está instalado (dependência opcional) e o json da stdlib quando não
+está ou quando ensure_ascii é pedido. A saída segue as opções do Flask
+(sort_keys, compact/indent, datas no formato HTTP) e aceita Title/Episode.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+from cnvsweb_records import Episode, Title
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider com orjson (quando disponível)
+
+    Use app.json.dumps_bytes() para serializar uma vez e guardar os bytes
+    (ex.: respostas do snapshot).
+    """
+
+    # UTF-8 direto: respostas menores e o caminho rápido do orjson
+    ensure_ascii = False
+
+    @property
+    def fast(self):
+        """True se a serialização usa o orjson"""
+        return orjson is not None and not self.ensure_ascii
+
+    def _default(self, obj):
+        if isinstance(obj, (Title, Episode)):
+            return obj.to_dict()
+        return self.default(obj)
+
+    def dumps_bytes(self, obj, indent=False):
+        """JSON em UTF-8 (compacto, ou com indentação de 2 espaços)"""
+        if self.fast:
+            # Datas passam pelo default do Flask (formato HTTP, como no json da stdlib)
+            option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, default=self._default, option=option)
+            except TypeError:
+                # orjson.JSONEncodeError (ex.: inteiro com mais de 64 bits): a stdlib decide
+                pass
+
+        kwargs = {'indent': 2} if indent else {'separators': (',', ':')}
+        return super().dumps(obj, default=self._default, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if kwargs or not self.fast:
+            kwargs.setdefault('default', self._default)
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,71 @@
+"""
+Configuração de logging da API e dos scripts
+
+Os registros entram em uma fila (QueueHandler) e são escritos por uma
+thread própria (QueueListener): quem loga nunca espera pelo stdout.
+
+Variáveis de ambiente:
+    LOG_LEVEL   DEBUG, INFO (padrão), WARNING, ERROR
+    LOG_FORMAT  text (padrão) ou json (um objeto JSON por linha)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+
+TEXT_FORMAT = '%(asctime)s %(levelname)-7s %(name)s [%(threadName)s] %(message)s'
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro (para coletores de log)"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(level=None, fmt=None, stream=None):
+    """
+    Instala o QueueHandler no logger raiz (só na primeira chamada)
+
+    Args:
+        level: Nível mínimo (None = LOG_LEVEL ou INFO)
+        fmt: 'text' ou 'json' (None = LOG_FORMAT ou text)
+        stream: Destino dos registros (None = stdout)
+
+    Returns:
+        O QueueListener em execução (parado automaticamente na saída)
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = (level or os.environ.get('LOG_LEVEL') or 'INFO').upper()
+    fmt = (fmt or os.environ.get('LOG_FORMAT') or 'text').lower()
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
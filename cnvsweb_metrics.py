@@ -0,0 +1,204 @@
+"""
+Métricas em memória no formato de texto do Prometheus
+
+Contadores, gauges e histogramas com labels, thread-safe e sem
+dependências; REGISTRY.render() gera o corpo servido em /metrics.
+"""
+import bisect
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Limites dos histogramas de latência (segundos)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """Conjunto de métricas expostas juntas"""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if any(m.name == metric.name for m in self._metrics):
+                raise ValueError(f"Métrica duplicada: {metric.name}")
+            self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Texto no formato de exposição do Prometheus (0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} espera os labels {self.labelnames}, recebeu {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter(_Metric):
+    """Contador monotônico (use nomes terminados em _total)"""
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, self._format_labels(key), value
+
+
+class Gauge(Counter):
+    """Valor instantâneo (atualizado por quem expõe as métricas)"""
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribuição de durações (buckets cumulativos, _sum e _count)"""
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # [contagem por bucket (não cumulativa, último = +Inf), soma]
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Mede o bloco (inclusive quando ele levanta exceção)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", self._format_labels(key, [('le', _format_value(float(bound)))]), cumulative
+            yield f"{self.name}_sum", self._format_labels(key), total
+            yield f"{self.name}_count", self._format_labels(key), cumulative
+
+
+def timed(histogram, **labels):
+    """Decorator que mede cada chamada da função (síncrona ou async) no histograma"""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with histogram.time(**labels):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Métricas do scraper (compartilhadas pelos motores sync e async)
+STAGE_SECONDS = Histogram(
+    'cnvsweb_stage_seconds',
+    'Duração de cada etapa do scraper: fetch (HTTP), parse (BeautifulSoup), '
+    'extract (parse + extração dos dados), enrich (um item completo) e wait (espera do rate limiter)',
+    ['stage', 'target']
+)
+HTTP_RESPONSES = Counter(
+    'cnvsweb_http_responses_total',
+    'Respostas HTTP recebidas do site, por página e status',
+    ['page', 'status']
+)
+CACHE_REQUESTS = Counter(
+    'cnvsweb_cache_requests_total',
+    'Consultas ao URLCache, por tipo de chave e resultado (hit, shared = veio de outro worker, miss, '
+    'stale = valor expirado servido com a origem fora)',
+    ['kind', 'result']
+)
+SESSION_EVENTS = Counter(
+    'cnvsweb_session_events_total',
+    'Eventos de sessão: login, login_failed, keep_alive, session_expired, keep_alive_error',
+    ['event']
+)
+ORIGIN_EVENTS = Counter(
+    'cnvsweb_origin_events_total',
+    'Circuit breaker e rate limiter da origem: opened, half_open, closed, rejected (falhou sem acessar o site), '
+    'backoff (taxa reduzida) e paused (Retry-After)',
+    ['event']
+)
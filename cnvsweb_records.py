@@ -0,0 +1,117 @@
+"""
+Registros compactos de títulos e episódios
+
+Os dicts do scraper custam uma tabela de hash por item; o que fica muito
+tempo em memória (índice do catálogo, temporadas no URLCache) é guardado
+nestas classes com __slots__ e convertido de volta para o formato JSON da
+API com to_dict() só na hora de responder.
+"""
+
+
+class Episode:
+    """Episódio de uma série (mesmos campos do dict de _parse_episodes)"""
+
+    __slots__ = ('episode_id', 'season', 'season_id', 'title', 'duration', 'published_date', 'player_url', 'video_url')
+
+    def __init__(self, episode_id, season, season_id, title, duration='', published_date='', player_url=None,
+                 video_url=None):
+        self.episode_id = episode_id
+        self.season = season
+        self.season_id = season_id
+        self.title = title
+        self.duration = duration
+        self.published_date = published_date
+        self.player_url = player_url
+        self.video_url = video_url
+
+    @classmethod
+    def from_dict(cls, ep):
+        return cls(
+            ep.get('episode_id'), ep.get('season'), ep.get('season_id'), ep.get('title'), ep.get('duration', ''),
+            ep.get('published_date', ''), ep.get('player_url'), ep.get('video_url')
+        )
+
+    def to_dict(self):
+        """Dict novo no formato da API (quem recebe pode alterá-lo)"""
+        return {
+            'episode_id': self.episode_id,
+            'season': self.season,
+            'season_id': self.season_id,
+            'title': self.title,
+            'duration': self.duration,
+            'published_date': self.published_date,
+            'player_url': self.player_url,
+            'video_url': self.video_url
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Episode):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"Episode({self.season!r}, {self.title!r})"
+
+
+class Title:
+    """Card de filme/série (mesmos campos do dict de _parse_card; is_series vem do tipo)"""
+
+    __slots__ = ('title', 'type', 'watch_link', 'duration_or_seasons', 'year', 'imdb', 'image_url', 'player_url',
+                 'video_url', 'episodes')
+
+    def __init__(self, title, type, watch_link, duration_or_seasons='', year='', imdb='', image_url='', player_url=None,
+                 video_url=None, episodes=()):
+        self.title = title
+        self.type = type
+        self.watch_link = watch_link
+        self.duration_or_seasons = duration_or_seasons
+        self.year = year
+        self.imdb = imdb
+        self.image_url = image_url
+        self.player_url = player_url
+        self.video_url = video_url
+        self.episodes = episodes    # tupla de Episode
+
+    @property
+    def is_series(self):
+        return self.type == 'series'
+
+    @classmethod
+    def from_dict(cls, item):
+        episodes = item.get('episodes') or ()
+        return cls(
+            item['title'], item['type'], item['watch_link'], item.get('duration_or_seasons', ''),
+            item.get('year', ''), item.get('imdb', ''), item.get('image_url', ''), item.get('player_url'),
+            item.get('video_url'), tuple(Episode.from_dict(ep) for ep in episodes) if episodes else ()
+        )
+
+    def to_dict(self):
+        """Dict novo no formato da API (quem recebe pode alterá-lo)"""
+        return {
+            'title': self.title,
+            'type': self.type,
+            'watch_link': self.watch_link,
+            'duration_or_seasons': self.duration_or_seasons,
+            'year': self.year,
+            'imdb': self.imdb,
+            'image_url': self.image_url,
+            'player_url': self.player_url,
+            'video_url': self.video_url,
+            'is_series': self.type == 'series',
+            'episodes': [ep.to_dict() for ep in self.episodes]
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Title):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"Title({self.title!r}, {self.type!r}, {self.watch_link!r})"
+
+
+def to_json(obj):
+    """`default` do json.dumps para registros (Title/Episode -> dict)"""
+    if isinstance(obj, (Title, Episode)):
+        return obj.to_dict()
+    raise TypeError(f"{type(obj).__name__} não é serializável em JSON")
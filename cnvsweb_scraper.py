@@ -1,23 +1,1114 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 import time
 import re
+import string
+import os
+import threading
+import asyncio
+import inspect
+import sys
+import base64
+import heapq
+import itertools
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin, urlparse, parse_qs
 import json
+import logging
+
+from cnvsweb_metrics import CACHE_REQUESTS, HTTP_RESPONSES, ORIGIN_EVENTS, SESSION_EVENTS, STAGE_SECONDS, timed
+from cnvsweb_records import Episode
+
+try:
+    import httpx
+except ImportError:  # motor assíncrono opcional (AsyncCNVSWebScraper)
+    httpx = None
+
+
+logger = logging.getLogger(__name__)
+
+# Margem de segurança antes da expiração do token (segundos)
+TOKEN_EXPIRY_MARGIN = 60
+
+# Status HTTP que disparam nova tentativa (só em GET/HEAD, com backoff)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Retry-After maior que isto não é esperado dentro da requisição: a resposta
+# volta na hora e o rate limiter pausa o host até o horário pedido
+MAX_RETRY_AFTER = 10
+
+# TTL do cache de temporadas já encerradas (a mais recente usa o TTL padrão)
+SEASON_CACHE_TTL = 6 * 3600
+
+# Parâmetros de query que podem conter a expiração da URL (epoch)
+_EXPIRY_PARAMS = ('expires', 'expire', 'expiry', 'exp', 'e', 'valid_until')
+
+# Onde a página da série pode declarar o endpoint da troca de temporada:
+# atributos do select#seasons-view ou uma URL .php em um <script> inline
+_SEASON_URL_ATTRS = ('data-url', 'data-ajax', 'data-action', 'data-endpoint', 'data-src')
+_SEASON_SCRIPT_URL_RE = re.compile(
+    r"""["']((?:https?://[^"'\s]+)?/[^"'\s]*(?:season|temporada|episod)[^"'\s]*\.php[^"'\s]*)["']""", re.I
+)
+
+# Epoch com 10 dígitos isolado
+_EPOCH_RE = re.compile(r'(?<!\d)\d{10}(?!\d)')
+
+
+def _epoch_in_range(value, now):
+    """Retorna o epoch se o valor parece uma data de expiração plausível"""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    # Aceita de 1 minuto atrás até 30 dias à frente
+    if now - 60 <= value <= now + 30 * 86400:
+        return value
+    return None
+
+
+def parse_token_expiry(video_url, now=None):
+    """
+    Tenta descobrir quando a URL do vídeo expira (epoch em segundos)
+    
+    Procura um parâmetro de expiração na query string e, em seguida, dentro
+    do `cnvs_token` (segmentos numéricos ou base64/JWT com campo `exp`).
+    Retorna None quando não for possível determinar.
+    """
+    if not video_url:
+        return None
+    now = now or time.time()
+    
+    try:
+        query = parse_qs(urlparse(video_url).query)
+    except ValueError:
+        return None
+    
+    for name in _EXPIRY_PARAMS:
+        for value in query.get(name, []):
+            expiry = _epoch_in_range(value, now)
+            if expiry:
+                return expiry
+    
+    for token in query.get('cnvs_token', []):
+        # Epoch em texto puro dentro do token (ex: "<hash>-1700000000")
+        for number in _EPOCH_RE.findall(token):
+            expiry = _epoch_in_range(number, now)
+            if expiry:
+                return expiry
+        
+        # Segmentos base64 (JWT ou JSON/texto codificado)
+        for segment in token.split('.'):
+            try:
+                padded = segment + '=' * (-len(segment) % 4)
+                decoded = base64.urlsafe_b64decode(padded).decode('utf-8')
+            except (ValueError, UnicodeDecodeError):
+                continue
+            
+            try:
+                payload = json.loads(decoded)
+            except ValueError:
+                payload = None
+            
+            if isinstance(payload, dict):
+                for key in ('exp', 'expires', 'expiry'):
+                    expiry = _epoch_in_range(payload.get(key), now)
+                    if expiry:
+                        return expiry
+            else:
+                for number in _EPOCH_RE.findall(decoded):
+                    expiry = _epoch_in_range(number, now)
+                    if expiry:
+                        return expiry
+    
+    return None
+
+
+def _export_cookies(jar):
+    """Cookies de um jar (requests ou httpx) como lista de dicts serializável"""
+    return [
+        {'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain, 'path': cookie.path}
+        for cookie in jar
+    ]
+
+
+def _import_cookies(cookies, exported):
+    """Grava em `cookies` (RequestsCookieJar ou httpx.Cookies) a saída de _export_cookies"""
+    for cookie in exported:
+        cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'])
+
+
+class URLCache:
+    """
+    Cache LRU com TTL por entrada e limite aproximado de memória
+    
+    Usado para as URLs resolvidas (watch_link -> player_url e
+    player_url -> video_url). Thread-safe.
+    
+    Com `store` (cnvsweb_shared.SharedStore), as entradas gravadas também
+    vão para o armazenamento compartilhado entre processos, e uma falta na
+    memória consulta o store antes de contar como miss: o que um worker do
+    gunicorn resolve serve para os outros.
+    
+    Entradas expiradas continuam na memória por até `stale_ttl` segundos
+    (se houver espaço): get() não as devolve, mas get_stale() sim, para
+    responder quando o site está fora do ar.
+    """
+    
+    def __init__(self, max_entries=2048, max_bytes=8 * 1024 * 1024, default_ttl=600, store=None, stale_ttl=3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.store = store
+        self.stale_ttl = stale_ttl
+        self._data = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+    
+    @staticmethod
+    def _sizeof(key, value):
+        return sys.getsizeof(key) + sys.getsizeof(value)
+    
+    @staticmethod
+    def _kind(key):
+        # Label das métricas: 'player', 'mp4', 'season'...
+        return key[0] if isinstance(key, tuple) and key else 'other'
+    
+    def get(self, key):
+        """Retorna o valor em cache ou None se ausente/expirado"""
+        with self._lock:
+            entry = self._data.get(key)
+            now = time.time()
+            if entry is not None and entry[1] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                CACHE_REQUESTS.inc(kind=self._kind(key), result='hit')
+                return entry[0]
+            
+            if entry is not None and entry[1] + self.stale_ttl <= now:
+                self._remove(key)
+        
+        # Fora do lock: a consulta ao store é I/O
+        shared = self._load_shared(key)
+        with self._lock:
+            if shared is None:
+                self.misses += 1
+                CACHE_REQUESTS.inc(kind=self._kind(key), result='miss')
+                return None
+            
+            self.shared_hits += 1
+            CACHE_REQUESTS.inc(kind=self._kind(key), result='shared')
+        self._put(key, *shared)
+        return shared[0]
+    
+    def set(self, key, value, ttl=None):
+        """Armazena o valor; ttl em segundos (None = default_ttl)"""
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        
+        expires_at = time.time() + ttl
+        self._put(key, value, expires_at)
+        if self.store is not None:
+            try:
+                self.store.save(key, value, expires_at)
+            except Exception as e:
+                logger.warning("Falha ao gravar %s no cache compartilhado: %s", self._kind(key), e)
+    
+    def _put(self, key, value, expires_at):
+        size = self._sizeof(key, value)
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            self._evict()
+    
+    def _load_shared(self, key):
+        """(valor, expires_at) vindo do store, ou None"""
+        if self.store is None:
+            return None
+        try:
+            found = self.store.load(key)
+        except Exception as e:
+            logger.warning("Falha ao ler %s do cache compartilhado: %s", self._kind(key), e)
+            return None
+        if found is None:
+            return None
+        
+        value, expires_at = found
+        # JSON devolve dicts; as temporadas ficam em cache como tupla de Episode
+        if self._kind(key) == 'season':
+            value = tuple(Episode.from_dict(ep) for ep in value)
+        return value, expires_at
+    
+    def get_stale(self, key, max_stale=None):
+        """
+        Valor em cache mesmo que expirado (só da memória), ou None
+        
+        Args:
+            max_stale: Máximo de segundos depois da expiração (None = stale_ttl)
+        """
+        max_stale = self.stale_ttl if max_stale is None else max_stale
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] + max_stale <= time.time():
+                return None
+            CACHE_REQUESTS.inc(kind=self._kind(key), result='stale')
+            return entry[0]
+    
+    def expires_at(self, key):
+        """Horário de expiração (epoch) da entrada ainda válida, ou None"""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry[1] if entry and entry[1] > time.time() else None
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'shared_hits': self.shared_hits,
+                'shared': self.store is not None
+            }
+    
+    def _remove(self, key):
+        value, expires_at, size = self._data.pop(key)
+        self._bytes -= size
+    
+    def _evict(self):
+        # Primeiro descarta entradas expiradas, depois as menos usadas (LRU)
+        if len(self._data) <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+        
+        now = time.time()
+        for key in [k for k, (_, expires_at, _) in self._data.items() if expires_at <= now]:
+            self._remove(key)
+        
+        while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._data)))
+
+
+def _retry_delay(status, retry_after, attempt, retries, backoff):
+    """
+    Espera antes de repetir uma resposta 429/5xx, ou None para devolvê-la
+    (status bom, tentativas esgotadas ou Retry-After maior que MAX_RETRY_AFTER)
+    """
+    if status not in RETRY_STATUS or attempt >= retries:
+        return None
+    delay = backoff * (2 ** attempt)
+    if retry_after and retry_after.isdigit():
+        if int(retry_after) > MAX_RETRY_AFTER:
+            return None
+        delay = max(delay, int(retry_after))
+    return delay
+
+
+class CircuitOpenError(Exception):
+    """Requisição recusada sem acessar o site: o circuit breaker do host está aberto"""
+    
+    def __init__(self, host, retry_after):
+        super().__init__(f"origem {host} indisponível (nova tentativa em {retry_after:.0f}s)")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class HostRateLimiter:
+    """
+    Token bucket por host que se adapta às respostas da origem
+    
+    Cada host acumula `rate` fichas por segundo (até `burst`); reserve()
+    gasta uma ficha e diz quanto esperar quando o saldo fica negativo, então
+    threads concorrentes fazem fila sem dormir a mais. A taxa segue um AIMD
+    alimentado por observe(): 429/5xx, erros de rede e respostas mais lentas
+    que `slow_after` segundos cortam a taxa pela metade (até `min_rate`);
+    cada resposta boa devolve `recovery` req/s, até o limite configurado. Um
+    Retry-After da origem pausa o host até o horário pedido.
+    """
+    
+    def __init__(self, requests_per_second=5.0, burst=1.0, min_rate=0.5, slow_after=5.0, recovery=0.25):
+        self.max_rate = requests_per_second if requests_per_second and requests_per_second > 0 else 0
+        self.burst = max(1.0, burst)
+        self.min_rate = min(min_rate, self.max_rate) if self.max_rate else 0
+        self.slow_after = slow_after
+        self.recovery = recovery
+        self._lock = threading.Lock()
+        self._buckets = {}  # host -> [rate, fichas, atualizado em, pausado até]
+    
+    def _bucket(self, host, now):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = [self.max_rate, self.burst, now, 0.0]
+        else:
+            bucket[1] = min(self.burst, bucket[1] + (now - bucket[2]) * bucket[0])
+            bucket[2] = now
+        return bucket
+    
+    def reserve(self, url):
+        """Reserva a próxima ficha do host da URL; retorna quantos segundos esperar"""
+        if not self.max_rate:
+            return 0
+        
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(host, now)
+            bucket[1] -= 1
+            delay = max(0.0, bucket[3] - now, -bucket[1] / bucket[0])
+        
+        STAGE_SECONDS.observe(delay, stage='wait', target='rate_limit')
+        return delay
+    
+    def wait(self, url):
+        """Bloqueia até que o host da URL possa receber mais uma requisição"""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+    
+    def observe(self, url, status=None, elapsed=None, retry_after=None):
+        """
+        Ajusta a taxa do host com o resultado de uma requisição
+        
+        Args:
+            status: Status HTTP (None = erro de conexão/timeout)
+            elapsed: Duração da requisição (segundos)
+            retry_after: Header Retry-After da resposta, se houver
+        """
+        if not self.max_rate:
+            return
+        
+        overloaded = status is None or status in RETRY_STATUS or (elapsed is not None and elapsed > self.slow_after)
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(host, now)
+            if not overloaded:
+                bucket[0] = min(self.max_rate, bucket[0] + self.recovery)
+                return
+            
+            bucket[0] = max(self.min_rate, bucket[0] / 2)
+            paused = retry_after is not None and retry_after.isdigit()
+            if paused:
+                bucket[3] = max(bucket[3], now + int(retry_after))
+        
+        ORIGIN_EVENTS.inc(event='backoff')
+        if paused:
+            ORIGIN_EVENTS.inc(event='paused')
+        logger.debug("🐢 %s: taxa reduzida para %.2f req/s (status %s)", host, bucket[0], status)
+    
+    def stats(self):
+        """Taxa atual e pausa restante por host"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                host: {'rate': round(rate, 2), 'paused_for': round(max(0, paused_until - now), 1)}
+                for host, (rate, _, _, paused_until) in self._buckets.items()
+            }
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por host para as requisições ao site
+    
+    closed: tudo passa; `failure_threshold` falhas seguidas (429/5xx, erro de
+    conexão/timeout) abrem o circuito. open: por `reset_timeout` segundos as
+    requisições falham na hora com CircuitOpenError, e quem chama responde
+    com o que tem em cache. half_open: passa uma requisição de teste; se der
+    certo o circuito fecha, senão abre de novo com o dobro do tempo (até
+    `max_reset_timeout`).
+    """
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, max_reset_timeout=300.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max(reset_timeout, max_reset_timeout)
+        self._lock = threading.Lock()
+        self._circuits = {}  # host -> {'state', 'failures', 'timeout', 'retry_at'}
+    
+    def before(self, url):
+        """Levanta CircuitOpenError se o host da URL não deve ser acessado agora"""
+        host = urlparse(url).netloc
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None or circuit['state'] == 'closed':
+                return
+            
+            now = time.monotonic()
+            if now >= circuit['retry_at']:
+                # Uma requisição de teste; se ela não voltar, outra passa após o mesmo prazo
+                if circuit['state'] == 'open':
+                    circuit['state'] = 'half_open'
+                    ORIGIN_EVENTS.inc(event='half_open')
+                circuit['retry_at'] = now + circuit['timeout']
+                return
+            retry_after = circuit['retry_at'] - now
+        
+        ORIGIN_EVENTS.inc(event='rejected')
+        raise CircuitOpenError(host, retry_after)
+    
+    def record(self, url, ok):
+        """Resultado de uma requisição que passou por before()"""
+        host = urlparse(url).netloc
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if ok:
+                if circuit is not None and (circuit['state'] != 'closed' or circuit['failures']):
+                    if circuit['state'] != 'closed':
+                        ORIGIN_EVENTS.inc(event='closed')
+                        logger.info("✓ Origem %s respondendo de novo (circuito fechado)", host)
+                    circuit.update(state='closed', failures=0, timeout=self.reset_timeout)
+                return
+            
+            if circuit is None:
+                circuit = self._circuits[host] = {
+                    'state': 'closed', 'failures': 0, 'timeout': self.reset_timeout, 'retry_at': 0.0
+                }
+            circuit['failures'] += 1
+            
+            if circuit['state'] == 'half_open':
+                circuit['timeout'] = min(self.max_reset_timeout, circuit['timeout'] * 2)
+            elif circuit['state'] == 'open' or circuit['failures'] < self.failure_threshold:
+                return
+            
+            circuit['state'] = 'open'
+            circuit['retry_at'] = time.monotonic() + circuit['timeout']
+            timeout = circuit['timeout']
+        
+        ORIGIN_EVENTS.inc(event='opened')
+        logger.warning("⚡ Origem %s instável: circuito aberto por %.0fs", host, timeout)
+    
+    def check(self, url):
+        """Levanta CircuitOpenError se o circuito do host não está fechado (sem ocupar a requisição de teste)"""
+        host = urlparse(url).netloc
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None or circuit['state'] == 'closed':
+                return
+            retry_after = max(0, circuit['retry_at'] - time.monotonic())
+        raise CircuitOpenError(host, retry_after)
+    
+    def healthy(self, url):
+        """False se o circuito do host da URL não está fechado"""
+        with self._lock:
+            circuit = self._circuits.get(urlparse(url).netloc)
+            return circuit is None or circuit['state'] == 'closed'
+    
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            return {
+                host: {
+                    'state': circuit['state'],
+                    'failures': circuit['failures'],
+                    'retry_in': round(max(0, circuit['retry_at'] - now), 1) if circuit['state'] != 'closed' else None
+                }
+                for host, circuit in self._circuits.items()
+            }
+
+
+class RequestBudget:
+    """
+    Orçamento global de requisições (token bucket) para o trabalho em segundo plano
+    
+    Acumula `rate` fichas por segundo, até `burst`. acquire() espera até haver
+    fichas; charge() desconta requisições já feitas (o saldo pode ficar
+    negativo e é pago antes das próximas reservas).
+    """
+    
+    def __init__(self, rate, burst=None):
+        if not rate or rate <= 0:
+            raise ValueError("RequestBudget precisa de rate > 0")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.spent = 0
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def charge(self, cost=1):
+        """Desconta requisições sem esperar"""
+        with self._lock:
+            self._refill()
+            self._tokens -= cost
+            self.spent += cost
+    
+    def acquire(self, cost=1, stop=None):
+        """
+        Espera até poder gastar `cost` requisições
+        
+        Returns:
+            False se `stop` (threading.Event) for acionado durante a espera
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    self.spent += cost
+                    return True
+                delay = (cost - self._tokens) / self.rate
+            
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                return False
+    
+    def stats(self):
+        with self._lock:
+            self._refill()
+            return {'rate': self.rate, 'available': round(self._tokens, 2), 'spent': self.spent}
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes com a mesma chave em uma única execução
+    
+    A primeira thread executa a função; as que chegam enquanto ela está em
+    andamento esperam e recebem o mesmo resultado (ou a mesma exceção).
+    O resultado é compartilhado entre todas - quem recebe não deve alterá-lo.
+    """
+    
+    class _Call:
+        __slots__ = ('done', 'result', 'error')
+        
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+    
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+    
+    def stats(self):
+        with self._lock:
+            return {'in_flight': len(self._calls), 'executed': self.executed, 'coalesced': self.coalesced}
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight para corrotinas (um único event loop)
+    
+    A execução roda em uma task própria: se quem a iniciou for cancelado,
+    as demais corrotinas que esperam pela mesma chave continuam recebendo
+    o resultado.
+    """
+    
+    def __init__(self):
+        self._tasks = {}
+        self.executed = 0
+        self.coalesced = 0
+    
+    async def do(self, key, fn, *args, **kwargs):
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+    
+    def _done(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Marca a exceção como lida mesmo que ninguém mais esteja esperando
+        if not task.cancelled():
+            task.exception()
+    
+    def stats(self):
+        return {'in_flight': len(self._tasks), 'executed': self.executed, 'coalesced': self.coalesced}
+
+
+def _detect_html_parser():
+    """Escolhe o parser mais rápido disponível (lxml) ou cai para o html.parser"""
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+
+# Backend usado pelo BeautifulSoup (pode ser forçado com CNVS_HTML_PARSER)
+HTML_PARSER = os.environ.get('CNVS_HTML_PARSER') or _detect_html_parser()
+
+
+def make_soup(markup, parse_only=None, parser=None):
+    """
+    Cria o BeautifulSoup com o backend configurado
+    
+    Args:
+        markup: HTML (bytes ou str)
+        parse_only: SoupStrainer para montar apenas as subárvores necessárias
+        parser: Força um backend específico ('lxml', 'html.parser')
+    """
+    parser = parser or HTML_PARSER
+    with STAGE_SECONDS.time(stage='parse', target=parser):
+        return BeautifulSoup(markup, parser, parse_only=parse_only)
+
+
+def _page(url):
+    """Label das métricas HTTP: primeiro segmento do path ('watch', 'player', 'ajax'...) ou 'home'"""
+    return urlparse(url).path.strip('/').split('/', 1)[0] or 'home'
+
+
+def _mask_token(token):
+    """Token para os logs: só os 4 últimos caracteres ("****CU0B")"""
+    token = token or ''
+    return '****' + token[-4:] if len(token) > 4 else '****'
+
+
+def _class_string(attrs):
+    """Atributo class como string (o builder pode entregar str ou lista)"""
+    classes = attrs.get('class') or ''
+    return classes if isinstance(classes, str) else ' '.join(classes)
+
+
+_PLAYER_CLASS_RE = re.compile(r'jw-|player|video', re.I)
+_DETAILS_CLASSES = frozenset(('title', 'poster', 'synopsis', 'overview', 'tags', 'genres'))
+
+
+def _home_tags(name, attrs):
+    # Seções da home (div.col-12 com o h5 do título e os slides)
+    return name == 'div' and 'col-12' in _class_string(attrs).split()
+
+
+def _search_tags(name, attrs):
+    # Cards do resultado da busca (div.item.poster)
+    return name == 'div' and {'item', 'poster'}.issubset(_class_string(attrs).split())
+
+
+def _watch_page_tags(name, attrs):
+    # Botões/links, iframes e qualquer elemento com id (destino das âncoras "#...")
+    return name in ('a', 'iframe') or 'id' in attrs
+
+
+def _player_page_tags(name, attrs):
+    # <video> e divs do player (jw-*, player, video)
+    return name == 'video' or (name == 'div' and _PLAYER_CLASS_RE.search(_class_string(attrs)) is not None)
+
+
+def _details_page_tags(name, attrs):
+    return name == 'h1' or not _DETAILS_CLASSES.isdisjoint(_class_string(attrs).split())
+
+
+def _episode_tags(name, attrs):
+    # Episódios no fragmento HTML da troca de temporada
+    return name == 'div' and 'ep' in _class_string(attrs).split()
+
+
+# Subárvores usadas por cada extrator (o resto da página nem vira Tag)
+# (o builder entrega o atributo class ainda como string, por isso as funções)
+HOME_STRAINER = SoupStrainer(_home_tags)
+SEARCH_STRAINER = SoupStrainer(_search_tags)
+SERIES_STRAINER = SoupStrainer(id=['seasons-view', 'episodes-view'])
+EPISODES_STRAINER = SoupStrainer(_episode_tags)
+WATCH_PAGE_STRAINER = SoupStrainer(_watch_page_tags)
+PLAYER_PAGE_STRAINER = SoupStrainer(_player_page_tags)
+DETAILS_PAGE_STRAINER = SoupStrainer(_details_page_tags)
+
+
+# Imagem de fundo em style="background-image: url(...)"
+_BG_URL_RE = re.compile(r'url\((.*?)\)')
+
+# --- Scanner de URLs .mp4 (get_video_mp4_url) ---
+#
+# Prioridades (da mais forte para a mais fraca):
+#   0  https://server...mp4            (padrão do site: server-amz.playmycnvs.com)
+#   1  https://...playmycnvs...mp4
+#   2  src="...mp4" / src: ...mp4
+#   3  "file": "...mp4"
+#   4  "src": "...mp4"
+#   5  qualquer URL .mp4
+#
+# Mesma regra da busca original: vale só a PRIMEIRA ocorrência de cada
+# padrão; se ela não for uma URL http...mp4, passa para o padrão seguinte.
+# Toda ocorrência contém ".mp4" e nenhuma atravessa o primeiro ".mp4" do
+# buffer vindo de antes do trecho dele, então cada padrão é procurado a
+# partir do início desse trecho (o resto do HTML antes dele é pulado).
+_MP4_MARK_RE = re.compile(r'\.mp4', re.I)
+_MP4_URL_RES = (
+    re.compile(r'https?://server[^"\s]*?\.mp4[^"\s]*', re.I),
+    re.compile(r'https?://[^"\s]*playmycnvs[^"\s]*?\.mp4[^"\s]*', re.I),
+    re.compile(r'src["\s]*[:=]["\s]*([^"\s]+\.mp4[^"\s]*)', re.I),
+    re.compile(r'"file"["\s]*:["\s]*"([^"]+\.mp4[^"]*)"', re.I),
+    re.compile(r'"src"["\s]*:["\s]*"([^"]+\.mp4[^"]*)"', re.I),
+    re.compile(r'https?://[^"\s<>]+\.mp4[^\s<>"\']*', re.I),
+)
+_MP4_BREAKS = '"' + string.whitespace
+
+# Busca agressiva (último recurso)
+_ANY_URL_RE = re.compile(r'https?://[^\s<>"\']+')
+
+
+def _clean_mp4_candidate(value):
+    """Remove aspas/espaços e valida (precisa ser http... e conter .mp4)"""
+    value = value.strip('"\'\\').strip()
+    if value.startswith('http') and '.mp4' in value:
+        return value
+    return None
+
+
+def _skip_back(html, pos, chars):
+    """Recua `pos` enquanto o caractere anterior estiver em `chars`"""
+    while pos > 0 and html[pos - 1] in chars:
+        pos -= 1
+    return pos
+
+
+def _mp4_search_starts(html, first_mp4):
+    """
+    Posição a partir da qual cada padrão pode ocorrer (limite inferior)
+    
+    URLs (0, 1, 5) e o valor de src= não têm aspas nem espaços antes do
+    ".mp4"; o valor de "file"/"src" não tem aspas. Os prefixos src=,
+    "file": e "src": só têm letras fixas, aspas, espaços, ":" e "=".
+    """
+    token = max(html.rfind(c, 0, first_mp4) for c in _MP4_BREAKS) + 1
+    quoted = html.rfind('"', 0, first_mp4) + 1
+    keyed = max(0, _skip_back(html, token, _MP4_BREAKS + ':=') - len('src'))
+    json_keyed = max(0, _skip_back(html, quoted, _MP4_BREAKS + ':') - len('"file"'))
+    return (token, token, keyed, json_keyed, json_keyed, token)
+
+
+def scan_mp4_url(html):
+    """
+    Encontra a URL .mp4 de maior prioridade no HTML
+    
+    Returns:
+        (url, prioridade) ou (None, None)
+    """
+    first_mp4 = _MP4_MARK_RE.search(html)
+    if first_mp4 is None:
+        return None, None
+    
+    starts = _mp4_search_starts(html, first_mp4.start())
+    for priority, (pattern, start) in enumerate(zip(_MP4_URL_RES, starts)):
+        match = pattern.search(html, start)
+        url = match and _clean_mp4_candidate(match.group(pattern.groups))
+        if url:
+            return url, priority
+    
+    return None, None
+
+
+def _parse_card(item):
+    """
+    Extrai um card (div.swiper-slide/div.item da página principal ou
+    div.item.poster da busca); None se não tiver div.info
+    """
+    info_div = item.find('div', class_='info')
+    
+    if not info_div:
+        return None
+    
+    # Título
+    title_tag = info_div.find('h6')
+    title = title_tag.text.strip() if title_tag else "Sem título"
+    
+    # Link para assistir
+    watch_btn = info_div.find('a', href=True)
+    watch_link = watch_btn['href'] if watch_btn else ""
+    
+    # Tags (duração/temporadas, ano, IMDb)
+    tags = info_div.find('p', class_='tags')
+    duration_or_seasons = ""
+    year = ""
+    imdb = ""
+    
+    if tags:
+        spans = tags.find_all('span')
+        if len(spans) > 0:
+            duration_or_seasons = spans[0].text.strip()
+        if len(spans) > 1:
+            year = spans[1].text.strip()
+        if len(spans) > 2:
+            imdb_text = spans[2].text.strip()
+            # Remove "IMDb" do texto
+            imdb = imdb_text.replace('IMDb', '').strip()
+    
+    # Imagem de fundo
+    content_div = item.find('div', class_='content')
+    image_url = ""
+    if content_div:
+        bg_style = content_div.get('style', '')
+        image_match = _BG_URL_RE.search(bg_style)
+        if image_match:
+            image_url = image_match.group(1).strip('"\'')
+    
+    # Detecta se é série ou filme
+    is_series = 'Temporada' in duration_or_seasons
+    
+    return {
+        'title': title,
+        'type': 'series' if is_series else 'movie',
+        'watch_link': watch_link,
+        'duration_or_seasons': duration_or_seasons,
+        'year': year,
+        'imdb': imdb,
+        'image_url': image_url,
+        'player_url': None,
+        'video_url': None,
+        'is_series': is_series,
+        'episodes': []
+    }
+
+
+def _iter_cards(items):
+    """
+    Etapa de parse do pipeline de cards (página principal e busca)
+    
+    Gera um registro por card válido; cards sem div.info são pulados e um
+    card com erro não interrompe os demais. Depois vêm o enriquecimento
+    (_enrich_items/_iter_enriched) e a separação (organize_items).
+    """
+    for idx, item in enumerate(items, 1):
+        try:
+            movie_data = _parse_card(item)
+        except Exception as e:
+            logger.warning("✗ Erro ao processar item %s: %s", idx, e)
+            continue
+        
+        if movie_data:
+            logger.debug("%s. %s", idx, movie_data['title'])
+            yield movie_data
+
+
+def organize_items(movies):
+    """Separa os itens em {movies: [], series: [], summary: {}} em uma única passada"""
+    organized = {'movie': [], 'series': []}
+    total = 0
+    for movie_data in movies:
+        total += 1
+        bucket = organized.get(movie_data['type'])
+        if bucket is not None:
+            bucket.append(movie_data)
+    
+    return {
+        'movies': organized['movie'],
+        'series': organized['series'],
+        'summary': {
+            'total': total,
+            'movies': len(organized['movie']),
+            'series': len(organized['series'])
+        }
+    }
+
+
+# Campos de um card na API e os que só são preenchidos pelo enriquecimento
+CARD_FIELDS = ('title', 'type', 'watch_link', 'duration_or_seasons', 'year', 'imdb', 'image_url', 'player_url',
+               'video_url', 'is_series', 'episodes')
+ENRICHED_FIELDS = frozenset(('player_url', 'video_url', 'episodes'))
+
+
+def needs_enrichment(fields):
+    """True se algum dos campos pedidos (None = todos) depende do enriquecimento"""
+    return fields is None or not ENRICHED_FIELDS.isdisjoint(fields)
+
+
+def page_slice(movies, offset=0, limit=None):
+    """Itens [offset, offset + limit) da lista (limit None = até o fim)"""
+    if limit is None:
+        return movies[offset:]
+    return movies[offset:offset + limit]
+
+
+def project_item(item, fields):
+    """Cópia do item só com os campos pedidos (None = o próprio item)"""
+    if fields is None:
+        return item
+    return {name: item[name] for name in fields if name in item}
+
+
+def project_items(items, fields):
+    """project_item() em cada item da lista"""
+    if fields is None:
+        return items
+    return [project_item(item, fields) for item in items]
+
 
 class CNVSWebScraper:
-    def __init__(self, token):
-        self.base_url = "https://cnvsweb.stream"
+    # Endpoint da troca de temporada quando a página da série não declara o
+    # seu (ver _season_url): é um palpite, não algo lido do site
+    season_ajax_path = '/ajax/episodes.php'
+    
+    # Tipo de SingleFlight compatível com o motor de I/O
+    single_flight_class = SingleFlight
+    
+    def __init__(self, token, max_workers=4, rate_limit=5.0, cache=None, base_url="https://cnvsweb.stream",
+                 max_season_workers=3, pool_size=None, max_retries=3, retry_backoff=0.5,
+                 connect_timeout=5.0, read_timeout=20.0, single_flight=None, catalog=None, circuit_breaker=None):
+        """
+        Args:
+            token: Token de acesso ao site
+            max_workers: Número de itens enriquecidos em paralelo (1 = sequencial)
+            max_season_workers: Temporadas de uma série buscadas em paralelo
+            rate_limit: Máximo de requisições por segundo por host (0 = sem limite); a taxa
+                cai sozinha quando o site responde 429/5xx ou fica lento e volta aos poucos
+            cache: URLCache compartilhado para player/vídeo (None = cria um próprio)
+            base_url: Origem do site (trocada nos benchmarks por um servidor local)
+            pool_size: Conexões keep-alive por host (None = max_workers * max_season_workers, mínimo 10)
+            max_retries: Novas tentativas em GET com erro de conexão/timeout ou status 429/5xx (0 = nenhuma)
+            retry_backoff: Fator do backoff exponencial entre tentativas (segundos)
+            connect_timeout: Timeout de conexão por requisição (segundos)
+            read_timeout: Timeout de leitura por requisição (segundos)
+            single_flight: SingleFlight compartilhado para player/vídeo (None = cria um próprio)
+            catalog: cnvsweb_catalog.Catalog alimentado com os resultados (None = sem catálogo)
+            circuit_breaker: CircuitBreaker compartilhado (None = cria um próprio)
+        """
+        self.base_url = base_url.rstrip('/')
         self.token = token
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.max_workers = max(1, int(max_workers))
+        self.max_season_workers = max(1, int(max_season_workers))
+        self.rate_limiter = HostRateLimiter(rate_limit)
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.cache = cache if cache is not None else URLCache()
+        # Resoluções de player/vídeo em andamento (chamadas iguais esperam a primeira)
+        self.inflight = single_flight if single_flight is not None else self.single_flight_class()
+        self.catalog = catalog
+        self.timeout = (connect_timeout, read_timeout)
+        if pool_size is None:
+            pool_size = max(10, self.max_workers * self.max_season_workers)
+        self.pool_size = max(1, int(pool_size))
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff = retry_backoff
+        self.session = self._build_session(max_retries, retry_backoff)
+        self.last_activity = time.time()
+        self.logged_in = False
+    
+    def _default_headers(self):
+        """Headers de navegador enviados em todas as requisições"""
+        return {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Referer': 'https://cnvsweb.stream/',
-        })
-        self.last_activity = time.time()
-        self.logged_in = False
+            # gzip/deflate sempre; br (e zstd) quando o urllib3 consegue decodificar
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Connection': 'keep-alive',
+            'Referer': f'{self.base_url}/',
+        }
+    
+    def _build_session(self, max_retries, retry_backoff):
+        """
+        Session com pool de conexões dimensionado para o paralelismo do scraper
+        
+        O pool padrão do requests guarda 10 conexões por host; com o
+        enriquecimento e as temporadas em paralelo, as excedentes eram
+        abertas e descartadas a cada requisição. O adapter só repete erros
+        de conexão/leitura, e só em métodos idempotentes (o POST de login
+        nunca é repetido depois de enviado); 429/5xx são repetidos por
+        _send(), para que cada tentativa passe pelo rate limiter e pelo
+        circuit breaker, como no motor assíncrono.
+        """
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=0,
+            backoff_factor=retry_backoff,
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(self._default_headers())
+        return session
+    
+    def _get(self, url, **kwargs):
+        """GET pelo circuit breaker e pelo rate limiter do host, com novas tentativas em 429/5xx"""
+        return self._send(self.session.get, url, self.max_retries, **kwargs)
+    
+    def _post(self, url, **kwargs):
+        """POST pelo circuit breaker e pelo rate limiter do host (nunca repetido)"""
+        return self._send(self.session.post, url, 0, **kwargs)
+    
+    def _send(self, send, url, retries, **kwargs):
+        """
+        Toda requisição ao site passa por aqui: falha na hora com
+        CircuitOpenError se o circuito do host está aberto, espera a ficha do
+        token bucket e o resultado de cada tentativa ajusta os dois. Status
+        429/5xx são repetidos até `retries` vezes com backoff exponencial
+        (ou o Retry-After, se não passar de MAX_RETRY_AFTER)
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        for attempt in range(retries + 1):
+            self.circuit_breaker.before(url)
+            self.rate_limiter.wait(url)
+            started = time.monotonic()
+            try:
+                with STAGE_SECONDS.time(stage='fetch', target=_page(url)):
+                    response = send(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._observe(url, None, time.monotonic() - started)
+                raise
+            HTTP_RESPONSES.inc(page=_page(url), status=response.status_code)
+            retry_after = response.headers.get('Retry-After')
+            self._observe(url, response.status_code, time.monotonic() - started, retry_after)
+            
+            delay = _retry_delay(response.status_code, retry_after, attempt, retries, self.retry_backoff)
+            if delay is None:
+                return response
+            response.close()
+            time.sleep(delay)
+    
+    def _observe(self, url, status, elapsed, retry_after=None):
+        """Resultado de uma requisição (status None = erro de conexão/timeout) para o limiter e o breaker"""
+        self.rate_limiter.observe(url, status, elapsed, retry_after)
+        self.circuit_breaker.record(url, status is not None and status not in RETRY_STATUS)
     
     def login(self):
         """Faz login no site usando o token"""
@@ -26,912 +1117,2247 @@ class CNVSWebScraper:
             login_ajax_url = f"{self.base_url}/ajax/login.php"
             
             # Primeiro GET para pegar cookies
-            print("🔑 Acessando página de login...")
-            response = self.session.get(login_page_url)
-            time.sleep(1)
+            logger.info("🔑 Acessando página de login...")
+            response = self._get(login_page_url)
             
             # POST para o endpoint AJAX com o token
-            payload = {
-                'uid': None,
-                'email': None,
-                'token': self.token,
-                'emailVerified': None,
-                'displayName': None,
-                'photoURL': None,
-                'phoneNumber': None,
-                'referer': ''
-            }
-            
-            # Headers específicos para o AJAX
-            ajax_headers = {
-                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-                'X-Requested-With': 'XMLHttpRequest',
-                'Accept': 'application/json, text/javascript, */*; q=0.01',
-                'Origin': self.base_url,
-                'Referer': login_page_url
-            }
+            payload, ajax_headers = self._login_request(login_page_url)
             
-            print(f"🔑 Fazendo login com token: {self.token}")
-            response = self.session.post(
+            logger.info("🔑 Fazendo login com token: %s", _mask_token(self.token))
+            response = self._post(
                 login_ajax_url, 
                 data=payload, 
                 headers=ajax_headers,
                 allow_redirects=False
             )
             
-            print(f"📊 Status do login: {response.status_code}")
+            logger.debug("📊 Status do login: %s", response.status_code)
             
             # Verifica a resposta JSON
             if response.status_code == 200:
                 try:
                     data = response.json()
-                    print(f"📦 Resposta JSON: {data}")
+                    logger.debug("📦 Resposta JSON: %s", data)
                     
                     if data.get('status') == 'success':
                         redirect_url = data.get('redirect', self.base_url)
-                        print(f"✓ Login realizado com sucesso!")
-                        print(f"↪️  Redirecionando para: {redirect_url}")
+                        logger.info("✓ Login realizado com sucesso!")
+                        logger.debug("↪️  Redirecionando para: %s", redirect_url)
                         
                         # Acessa a página de redirecionamento para completar o login
-                        response = self.session.get(redirect_url)
+                        response = self._get(redirect_url)
                         
                         # Verifica se está realmente logado
                         if response.status_code == 200 and '/login' not in response.url:
-                            print("✓ Login confirmado - sessão ativa")
+                            logger.info("✓ Login confirmado - sessão ativa")
                             self.last_activity = time.time()
                             self.logged_in = True
                             return True
                         else:
-                            print(f"⚠ Redirecionamento falhou")
+                            logger.warning("⚠ Redirecionamento falhou")
                             return False
                     else:
                         error_msg = data.get('message', 'Erro desconhecido')
-                        print(f"✗ Erro no login: {error_msg}")
+                        logger.error("✗ Erro no login: %s", error_msg)
                         return False
                         
                 except ValueError as e:
-                    print(f"✗ Resposta não é JSON válido: {response.text[:200]}")
+                    logger.error("✗ Resposta não é JSON válido: %s", response.text[:200])
                     return False
             else:
-                print(f"✗ Erro no login: Status {response.status_code}")
-                print(f"📝 Resposta: {response.text[:200]}")
+                logger.error("✗ Erro no login: Status %s", response.status_code)
+                logger.debug("📝 Resposta: %s", response.text[:200])
                 return False
                 
         except Exception as e:
-            print(f"✗ Erro no login: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("✗ Erro no login: %s", e, exc_info=True)
             return False
     
+    def _login_request(self, login_page_url):
+        """Payload e headers do POST de login (AJAX)"""
+        payload = {
+            'uid': None,
+            'email': None,
+            'token': self.token,
+            'emailVerified': None,
+            'displayName': None,
+            'photoURL': None,
+            'phoneNumber': None,
+            'referer': ''
+        }
+        
+        # Headers específicos para o AJAX
+        ajax_headers = {
+            'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
+            'X-Requested-With': 'XMLHttpRequest',
+            'Accept': 'application/json, text/javascript, */*; q=0.01',
+            'Origin': self.base_url,
+            'Referer': login_page_url
+        }
+        return payload, ajax_headers
+    
     def keep_alive(self):
-        """Atualiza a sessão para não deslogar"""
+        """
+        Atualiza a sessão para não deslogar
+        
+        Returns:
+            False se a sessão não está logada ou caiu (redirecionou para o login)
+        """
         if not self.logged_in:
-            return
+            return False
             
         current_time = time.time()
         # Verifica se passaram 3 minutos desde a última atividade
         if current_time - self.last_activity > 180:  # 3 minutos
-            print("⟳ Atualizando sessão...")
+            logger.info("⟳ Atualizando sessão...")
             try:
-                response = self.session.get(self.base_url)
+                response = self._get(self.base_url)
+                if response.status_code in RETRY_STATUS:
+                    logger.warning("⚠ Sessão não verificada (status %s)", response.status_code)
+                    return True
+                if response.status_code != 200 or '/login' in response.url:
+                    logger.warning("✗ Sessão expirada (status %s)", response.status_code)
+                    SESSION_EVENTS.inc(event='session_expired')
+                    self.logged_in = False
+                    return False
                 self.last_activity = time.time()
-                print("✓ Sessão atualizada")
+                SESSION_EVENTS.inc(event='keep_alive')
+                logger.info("✓ Sessão atualizada")
+            except CircuitOpenError as e:
+                # Site fora do ar não derruba a sessão: ela é conferida quando o circuito fechar
+                logger.info("⚡ Sessão não verificada: %s", e)
+                return True
             except Exception as e:
-                print(f"Erro ao atualizar sessão: {e}")
+                logger.warning("Erro ao atualizar sessão: %s", e)
+                SESSION_EVENTS.inc(event='keep_alive_error')
+                return False
+        return True
     
-    def get_most_watched_today(self, get_video_urls=True, max_episodes_per_series=5, organize_output=True):
+    def export_session(self):
+        """Cookies e estado de login, para outro processo reaproveitar a sessão"""
+        return {'logged_in': self.logged_in, 'cookies': _export_cookies(self.session.cookies)}
+    
+    def import_session(self, state, last_activity=None):
         """
-        Pega os filmes/séries mais assistidos do dia
+        Adota a sessão exportada por export_session() (sem fazer login)
         
         Args:
-            get_video_urls: Se True, extrai URLs dos vídeos
+            last_activity: Quando a sessão foi usada por último (None = agora);
+                o keep_alive() confere no site as que passaram de 3 minutos
+        """
+        _import_cookies(self.session.cookies, state.get('cookies', []))
+        self.logged_in = bool(state.get('logged_in'))
+        self.last_activity = time.time() if last_activity is None else last_activity
+    
+    def get_most_watched_today(self, get_video_urls=True, max_episodes_per_series=5, organize_output=True):
+        """
+        Pega os filmes/séries mais assistidos do dia
+        
+        Args:
+            get_video_urls: Se True, extrai URLs dos vídeos
             max_episodes_per_series: Máximo de episódios para extrair por série (0 = todos)
             organize_output: Se True, retorna dados organizados em {movies: [], series: []}
         """
         self.keep_alive()
         
         try:
-            print("📡 Acessando página principal...")
-            response = self.session.get(self.base_url)
-            self.last_activity = time.time()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Procura pela seção "Mais Visto do Dia"
-            most_watched_section = None
+            movies = self._fetch_most_watched_items()
+            return self._collect(movies, get_video_urls, max_episodes_per_series, organize_output)
+        except Exception as e:
+            logger.error("✗ Erro ao buscar filmes mais assistidos: %s", e, exc_info=True)
+            return []
+    
+    def most_watched_page(self, offset=0, limit=None, get_video_urls=True, max_episodes_per_series=5):
+        """
+        Uma página do "Mais Visto do Dia", na ordem da página
+        
+        Só os itens [offset, offset + limit) são enriquecidos (limit None =
+        até o fim); os demais cards ficam de fora sem acessar o site.
+        
+        Returns:
+            {'items': [itens da página], 'total': número de cards da seção}
+        
+        Raises:
+            CircuitOpenError: O site está fora (quem chama responde com o que
+                tiver em cache); os demais erros viram uma página vazia
+        """
+        self.keep_alive()
+        
+        try:
+            movies = self._fetch_most_watched_items()
+            return self._collect_page(movies, offset, limit, get_video_urls, max_episodes_per_series)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error("✗ Erro ao buscar filmes mais assistidos: %s", e, exc_info=True)
+            return {'items': [], 'total': 0}
+    
+    def iter_most_watched_today(self, get_video_urls=True, max_episodes_per_series=5, offset=0, limit=None):
+        """
+        Versão em streaming de most_watched_page
+        
+        A página principal é acessada já na chamada (erros são propagados em
+        vez de virarem uma lista vazia); só o enriquecimento fica para o
+        iterador, que gera cada item assim que ele termina (ordem de
+        conclusão, não a ordem da página).
+        
+        Returns:
+            {'items': iterador dos itens da página, 'total': número de cards da seção}
+        """
+        self.keep_alive()
+        movies = self._fetch_most_watched_items()
+        page = page_slice(movies, offset, limit)
+        return {'items': self._iter_enriched(page, get_video_urls, max_episodes_per_series), 'total': len(movies)}
+    
+    def _fetch_most_watched_items(self):
+        """Acessa a página principal e extrai os cards da seção 'Mais Visto do Dia'"""
+        logger.info("📡 Acessando página principal...")
+        response = self._get(self.base_url)
+        self.last_activity = time.time()
+        movies = self._parse_most_watched_items(response.content)
+        self._to_catalog('add_titles', movies)
+        return movies
+    
+    def get_home_sections(self):
+        """
+        Cards de todas as seções da página principal (sem URLs de vídeo)
+        
+        Returns:
+            [(título da seção, [itens])], na ordem da página
+        """
+        self.keep_alive()
+        response = self._get(self.base_url)
+        self.last_activity = time.time()
+        sections = self._parse_home_sections(response.content)
+        for _, movies in sections:
+            self._to_catalog('add_titles', movies)
+        return sections
+    
+    @timed(STAGE_SECONDS, stage='extract', target='home')
+    def _parse_most_watched_items(self, markup):
+        """Extrai os cards da seção 'Mais Visto do Dia' do HTML da página principal"""
+        soup = make_soup(markup, HOME_STRAINER)
+        
+        # Procura pela seção "Mais Visto do Dia"
+        most_watched_section = None
+        
+        # MÉTODO 1: Procura por h5 com texto exato
+        all_h5 = soup.find_all('h5')
+        for h5 in all_h5:
+            if h5.text and 'Mais Visto' in h5.text:
+                most_watched_section = h5
+                logger.debug("✓ Seção encontrada: '%s'", h5.text.strip())
+                break
+        
+        if not most_watched_section:
+            logger.error("✗ Seção 'Mais Visto do Dia' não encontrada")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🔍 Seções encontradas: %s", [h5.text.strip() for h5 in all_h5])
+            return []
+        
+        # Pega o container pai
+        container = most_watched_section.find_parent('div', class_='col-12')
+        
+        if not container:
+            logger.error("✗ Container pai não encontrado")
+            return []
+        
+        logger.debug("✓ Container encontrado")
+        
+        # Procura por todos os slides
+        items = container.find_all('div', class_='swiper-slide')
+        
+        if not items:
+            # Método alternativo
+            items = container.find_all('div', class_='item')
+        
+        logger.debug("📊 Encontrados %s itens na seção", len(items))
+        
+        return list(_iter_cards(items))
+    
+    @timed(STAGE_SECONDS, stage='extract', target='home')
+    def _parse_home_sections(self, markup):
+        """Cards de todas as seções da página principal: [(título da seção, [itens])], na ordem da página"""
+        soup = make_soup(markup, HOME_STRAINER)
+        
+        sections = []
+        for h5 in soup.find_all('h5'):
+            container = h5.find_parent('div', class_='col-12')
+            if not container:
+                continue
             
-            # MÉTODO 1: Procura por h5 com texto exato
-            all_h5 = soup.find_all('h5')
-            for h5 in all_h5:
-                if h5.text and 'Mais Visto' in h5.text:
-                    most_watched_section = h5
-                    print(f"✓ Seção encontrada: '{h5.text.strip()}'")
-                    break
+            items = container.find_all('div', class_='swiper-slide') or container.find_all('div', class_='item')
+            sections.append((h5.text.strip(), list(_iter_cards(items))))
+        
+        return sections
+    
+    def search_movies(self, query, get_video_urls=True, max_episodes_per_series=5, organize_output=True):
+        """
+        Busca filmes/séries no site
+        
+        Args:
+            query: Termo de busca
+            get_video_urls: Se True, extrai URLs dos vídeos
+            max_episodes_per_series: Máximo de episódios para extrair por série (0 = todos)
+            organize_output: Se True, retorna dados organizados em {movies: [], series: []}
+        """
+        self.keep_alive()
+        
+        try:
+            movies = self._fetch_search_items(query)
+            return self._collect(movies, get_video_urls, max_episodes_per_series, organize_output)
+        except Exception as e:
+            logger.error("✗ Erro na busca: %s", e, exc_info=True)
+            return []
+    
+    def search_page(self, query, offset=0, limit=None, get_video_urls=True, max_episodes_per_series=5):
+        """
+        Uma página dos resultados da busca (ver most_watched_page)
+        
+        Returns:
+            {'items': [itens da página], 'total': número de resultados}
+        """
+        self.keep_alive()
+        
+        try:
+            movies = self._fetch_search_items(query)
+            return self._collect_page(movies, offset, limit, get_video_urls, max_episodes_per_series)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error("✗ Erro na busca: %s", e, exc_info=True)
+            return {'items': [], 'total': 0}
+    
+    def iter_search_movies(self, query, get_video_urls=True, max_episodes_per_series=5, offset=0, limit=None):
+        """
+        Versão em streaming de search_page (ver iter_most_watched_today)
+        
+        Returns:
+            {'items': iterador dos resultados da página, 'total': número de resultados}
+        """
+        self.keep_alive()
+        movies = self._fetch_search_items(query)
+        page = page_slice(movies, offset, limit)
+        return {'items': self._iter_enriched(page, get_video_urls, max_episodes_per_series), 'total': len(movies)}
+    
+    def _fetch_search_items(self, query):
+        """Acessa a busca do site e extrai os cards dos resultados"""
+        search_url = f"{self.base_url}/search.php"
+        params = {'q': query}
+        
+        logger.info("🔍 Buscando: %s", query)
+        response = self._get(search_url, params=params)
+        self.last_activity = time.time()
+        movies = self._parse_search_items(response.content)
+        self._to_catalog('add_titles', movies)
+        return movies
+    
+    @timed(STAGE_SECONDS, stage='extract', target='search')
+    def _parse_search_items(self, markup):
+        """Extrai os cards dos resultados do HTML da busca"""
+        soup = make_soup(markup, SEARCH_STRAINER)
+        items = soup.find_all('div', class_='item poster')
+        
+        logger.debug("📊 Encontrados %s resultados", len(items))
+        
+        return list(_iter_cards(items))
+    
+    def _collect(self, movies, get_video_urls=True, max_episodes_per_series=5, organize_output=True):
+        """
+        Final do pipeline de get_most_watched_today/search_movies: enriquece
+        (a ordem da página é preservada) e, se pedido, separa filmes e séries
+        """
+        if get_video_urls:
+            self._enrich_items(movies, max_episodes_per_series)
+        return self._finish(movies, organize_output)
+    
+    def _collect_page(self, movies, offset, limit, get_video_urls, max_episodes_per_series):
+        """Final do pipeline de most_watched_page/search_page: recorta a página e enriquece só ela"""
+        page = page_slice(movies, offset, limit)
+        if get_video_urls:
+            self._enrich_items(page, max_episodes_per_series)
+        logger.info("✓ Página: %s de %s itens (a partir de %s)", len(page), len(movies), offset)
+        return {'items': page, 'total': len(movies)}
+    
+    @staticmethod
+    def _finish(movies, organize_output):
+        """Lista simples ou {movies, series, summary}, conforme organize_output"""
+        logger.info("✓ Total: %s itens extraídos", len(movies))
+        if not organize_output:
+            return movies
+        
+        organized_data = organize_items(movies)
+        logger.info("📊 Organizado: %s filmes, %s séries", organized_data['summary']['movies'], organized_data['summary']['series'])
+        return organized_data
+    
+    def _enrich_items(self, movies, max_episodes_per_series=5):
+        """
+        Enriquece os itens com URLs do player/vídeo (ou episódios, para séries)
+        
+        Os itens são alterados no próprio dicionário, então a lista mantém a
+        ordem original mesmo que terminem fora de ordem.
+        """
+        for _ in self._iter_enriched(movies, True, max_episodes_per_series):
+            pass
+        return movies
+    
+    def _iter_enriched(self, movies, get_video_urls=True, max_episodes_per_series=5):
+        """
+        Gera os itens conforme o enriquecimento de cada um termina
+        
+        Os itens são processados por até `max_workers` threads; o ritmo das
+        requisições é controlado pelo rate limiter por host. Se o consumidor
+        parar no meio (ex: cliente desconectou), os itens pendentes são
+        cancelados.
+        """
+        if not get_video_urls:
+            yield from movies
+            return
+        
+        if self.max_workers <= 1 or len(movies) <= 1:
+            for movie_data in movies:
+                yield self._enrich_item(movie_data, max_episodes_per_series)
+            return
+        
+        workers = min(self.max_workers, len(movies))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cnvs-enrich')
+        try:
+            futures = [executor.submit(self._enrich_item, m, max_episodes_per_series) for m in movies]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    @timed(STAGE_SECONDS, stage='enrich', target='item')
+    def _enrich_item(self, movie_data, max_episodes_per_series=5):
+        """Extrai URLs do player e vídeo (filme) ou episódios (série) de um item"""
+        watch_link = movie_data['watch_link']
+        if not watch_link:
+            return movie_data
+        
+        if movie_data['is_series']:
+            logger.debug("📺 Série detectada - extraindo episódios: %s", movie_data['title'])
+            try:
+                episodes = self.get_series_episodes(watch_link)
+                
+                # Limita número de episódios se configurado
+                if max_episodes_per_series > 0:
+                    episodes = episodes[:max_episodes_per_series]
+                    logger.debug("⚠ Limitado a %s episódios", max_episodes_per_series)
+                
+                movie_data['episodes'] = episodes
+                
+                # Opcionalmente, extrai URLs de vídeo dos primeiros episódios
+                if episodes:
+                    logger.debug("🎬 Extraindo URLs de vídeo dos primeiros episódios...")
+                    for ep in episodes[:3]:  # Primeiros 3 como exemplo
+                        if ep.get('player_url'):
+                            try:
+                                video_url = self.get_video_mp4_url(ep['player_url'])
+                                ep['video_url'] = video_url
+                                if video_url:
+                                    logger.debug("✓ %s: %s...", ep['title'], video_url[:60])
+                            except Exception as e:
+                                logger.warning("✗ Erro: %s", e)
+            except Exception as e:
+                logger.warning("✗ Erro ao extrair episódios: %s", e)
+        else:
+            logger.debug("🎬 Filme detectado - extraindo vídeo: %s", movie_data['title'])
+            try:
+                player_url = self.get_player_url(watch_link)
+                movie_data['player_url'] = player_url
+                
+                if player_url:
+                    logger.debug("✓ Player: %s...", player_url[:60])
+                    video_url = self.get_video_mp4_url(player_url)
+                    movie_data['video_url'] = video_url
+                    if video_url:
+                        logger.debug("✓ Vídeo: %s...", video_url[:80])
+                    else:
+                        logger.warning("⚠ URL do vídeo não encontrada")
+                else:
+                    logger.warning("⚠ URL do player não encontrada")
+            except Exception as e:
+                logger.warning("✗ Erro ao extrair vídeo: %s", e)
+        
+        return movie_data
+    
+    def get_movie_details(self, movie_url):
+        """Extrai TODAS as informações detalhadas de um filme"""
+        self.keep_alive()
+        
+        try:
+            if not movie_url.startswith('http'):
+                movie_url = urljoin(self.base_url, movie_url)
             
-            if not most_watched_section:
-                print("✗ Seção 'Mais Visto do Dia' não encontrada")
-                print(f"🔍 Seções encontradas: {[h5.text.strip() for h5 in all_h5]}")
-                return []
+            logger.debug("📄 Acessando página do filme: %s", movie_url)
+            response = self._get(movie_url)
+            self.last_activity = time.time()
+            movie_info = self._parse_movie_details(response.content, movie_url)
             
-            # Pega o container pai
-            container = most_watched_section.find_parent('div', class_='col-12')
+            # Player e vídeo
+            logger.debug("🎬 Extraindo player e vídeo...")
+            player_url = self.get_player_url(movie_url)
+            movie_info['player_url'] = player_url
             
-            if not container:
-                print("✗ Container pai não encontrado")
-                return []
+            if player_url:
+                logger.debug("✓ Player: %s", player_url)
+                video_url = self.get_video_mp4_url(player_url)
+                movie_info['video_url'] = video_url
+                if video_url:
+                    logger.debug("✓ Vídeo MP4 extraído")
             
-            print("✓ Container encontrado")
+            self._to_catalog('add_details', movie_info)
+            return movie_info
             
-            movies = []
-            # Procura por todos os slides
-            items = container.find_all('div', class_='swiper-slide')
+        except Exception as e:
+            logger.error("✗ Erro ao obter detalhes do filme: %s", e, exc_info=True)
+            return None
+    
+    @timed(STAGE_SECONDS, stage='extract', target='details')
+    def _parse_movie_details(self, markup, movie_url):
+        """Extrai as informações da página do filme (sem player/vídeo)"""
+        soup = make_soup(markup, DETAILS_PAGE_STRAINER)
+        
+        movie_info = {
+            'title': '',
+            'original_title': '',
+            'year': '',
+            'duration': '',
+            'genres': [],
+            'imdb_rating': '',
+            'synopsis': '',
+            'director': '',
+            'cast': [],
+            'trailer_url': '',
+            'image_url': '',
+            'backdrop_url': '',
+            'watch_link': movie_url,
+            'player_url': None,
+            'video_url': None
+        }
+        
+        # Título
+        title_tag = soup.find('h1') or soup.find('h2', class_='title')
+        if title_tag:
+            movie_info['title'] = title_tag.text.strip()
+        
+        # Imagem principal
+        poster_div = soup.find('div', class_='poster') or soup.find('img', class_='poster')
+        if poster_div:
+            if poster_div.name == 'img':
+                movie_info['image_url'] = poster_div.get('src', '')
+            else:
+                bg_style = poster_div.get('style', '')
+                image_match = _BG_URL_RE.search(bg_style)
+                if image_match:
+                    movie_info['image_url'] = image_match.group(1).strip('"\'')
+        
+        # Sinopse
+        synopsis_div = soup.find('div', class_='synopsis') or soup.find('p', class_='overview')
+        if synopsis_div:
+            movie_info['synopsis'] = synopsis_div.text.strip()
+        
+        # Tags (ano, duração, IMDb)
+        tags = soup.find('p', class_='tags') or soup.find('div', class_='tags')
+        if tags:
+            spans = tags.find_all('span')
+            for span in spans:
+                text = span.text.strip()
+                if 'Min' in text or 'Temporadas' in text:
+                    movie_info['duration'] = text
+                elif text.isdigit() and len(text) == 4:
+                    movie_info['year'] = text
+                elif 'IMDb' in text:
+                    movie_info['imdb_rating'] = text.replace('IMDb', '').strip()
+        
+        # Gêneros
+        genres_div = soup.find('div', class_='genres')
+        if genres_div:
+            genre_links = genres_div.find_all('a')
+            movie_info['genres'] = [g.text.strip() for g in genre_links]
+        
+        return movie_info
+    
+    def _cache_ttl(self, url):
+        """TTL para uma URL resolvida: expiração do token ou o padrão do cache"""
+        expiry = parse_token_expiry(url)
+        if expiry:
+            return expiry - time.time() - TOKEN_EXPIRY_MARGIN
+        return None
+    
+    def _remember(self, kind, url, value):
+        """Guarda uma URL resolvida ('player'/'mp4') no cache e no catálogo"""
+        key = (kind, url)
+        self.cache.set(key, value, self._cache_ttl(value))
+        expires_at = self.cache.expires_at(key)
+        if expires_at:
+            self._to_catalog('add_url', kind, url, value, expires_at)
+    
+    def _stale(self, key, url, max_stale=None):
+        """Valor expirado do cache se o site está fora (circuito não fechado), senão None"""
+        if self.circuit_breaker.healthy(url):
+            return None
+        value = self.cache.get_stale(key, max_stale)
+        if value:
+            logger.info("♻ Site indisponível - %s expirado do cache: %s", key[0], url)
+        return value
+    
+    def _stale_episodes(self, watch_link):
+        """Episódios que o catálogo conhece se o site está fora (circuito não fechado), senão []"""
+        if self.catalog is None or self.circuit_breaker.healthy(urljoin(self.base_url, watch_link)):
+            return []
+        try:
+            episodes = self.catalog.get_episodes(watch_link)
+        except Exception as e:
+            logger.warning("⚠ Erro ao ler episódios do catálogo: %s", e)
+            return []
+        if episodes:
+            logger.info("♻ Site indisponível - %s episódios do catálogo: %s", len(episodes), watch_link)
+        return episodes
+    
+    def _to_catalog(self, method, *args):
+        """Grava no catálogo, se houver (erros do catálogo não interrompem a extração)"""
+        if self.catalog is None:
+            return
+        try:
+            getattr(self.catalog, method)(*args)
+        except Exception as e:
+            logger.warning("⚠ Erro ao gravar no catálogo (%s): %s", method, e)
+    
+    def get_player_url(self, movie_url, save_debug_html=False):
+        """Extrai a URL do player do filme (com cache por watch_link)"""
+        if not movie_url.startswith('http'):
+            movie_url = urljoin(self.base_url, movie_url)
+        
+        cache_key = ('player', movie_url)
+        if not save_debug_html:
+            player_url = self.cache.get(cache_key)
+            if player_url:
+                logger.debug("⚡ Player em cache: %s", movie_url)
+                return player_url
+        
+        if save_debug_html:
+            return self._extract_player_url(movie_url, save_debug_html)
+        return self.inflight.do(cache_key, self._resolve_player_url, movie_url) or self._stale(cache_key, movie_url)
+    
+    def refresh_url(self, kind, url):
+        """
+        Resolve de novo uma URL ('player': watch_link absoluto, 'mp4': player_url)
+        ignorando o cache, para renovar a entrada antes que o token expire
+        """
+        resolve = self._resolve_player_url if kind == 'player' else self._resolve_video_mp4_url
+        return self.inflight.do((kind, url), resolve, url)
+    
+    def _resolve_player_url(self, movie_url):
+        """Extrai a URL do player e guarda no cache (executada uma vez por URL em andamento)"""
+        player_url = self._extract_player_url(movie_url)
+        if player_url:
+            self._remember('player', movie_url, player_url)
+        return player_url
+    
+    def _extract_player_url(self, movie_url, save_debug_html=False):
+        """Acessa a página do filme e extrai a URL do player"""
+        self.keep_alive()
+        
+        try:
+            logger.debug("🌐 Acessando: %s", movie_url)
+            response = self._get(movie_url)
+            self.last_activity = time.time()
+            return self._parse_player_url(response.content, movie_url, save_debug_html)
             
-            if not items:
-                # Método alternativo
-                items = container.find_all('div', class_='item')
+        except Exception as e:
+            logger.warning("✗ Erro ao extrair player URL: %s", e, exc_info=True)
+            return None
+    
+    @timed(STAGE_SECONDS, stage='extract', target='player')
+    def _parse_player_url(self, markup, movie_url, save_debug_html=False):
+        """Extrai a URL do player do HTML da página do filme"""
+        # O HTML de debug precisa da página completa
+        soup = make_soup(markup, None if save_debug_html else WATCH_PAGE_STRAINER)
+        
+        # Opção de salvar HTML para debug
+        if save_debug_html:
+            filename = f"debug_{movie_url.split('/')[-1]}.html"
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write(soup.prettify())
+            logger.debug("💾 HTML salvo em: %s", filename)
+        
+        # DEBUG: Mostra todos os botões/links encontrados (só com o nível DEBUG ativo)
+        if logger.isEnabledFor(logging.DEBUG):
+            all_buttons = soup.find_all('a', class_=lambda x: x and 'btn' in str(x))
+            logger.debug("📊 Encontrados %s botões na página", len(all_buttons))
             
-            print(f"📊 Encontrados {len(items)} itens na seção")
+            for i, btn in enumerate(all_buttons[:5], 1):  # Primeiros 5
+                text = btn.get_text(strip=True)[:30]
+                href = btn.get('href', 'N/A')
+                classes = btn.get('class', [])
+                logger.debug("🔘 Botão %s: '%s' | href='%s' | class=%s", i, text, href, classes)
+        
+        # MÉTODO 1: Procura botão "ASSISTIR" - várias tentativas
+        assistir_btn = None
+        
+        # Tentativa 1: classe "btn free"
+        assistir_btn = soup.find('a', class_='btn free')
+        if assistir_btn:
+            logger.debug("✓ Encontrado com classe 'btn free'")
+        
+        # Tentativa 2: classe contendo "btn" e texto "ASSISTIR"
+        if not assistir_btn:
+            all_links = soup.find_all('a')
+            for link in all_links:
+                text = link.get_text(strip=True).upper()
+                if 'ASSISTIR' in text or 'PLAY' in text:
+                    assistir_btn = link
+                    logger.debug("✓ Encontrado por texto: '%s'", link.get_text(strip=True))
+                    break
+        
+        # Tentativa 3: procura por data-tippy-content com "Assistir"
+        if not assistir_btn:
+            assistir_btn = soup.find('a', attrs={'data-tippy-content': lambda x: x and 'Assistir' in x})
+            if assistir_btn:
+                logger.debug("✓ Encontrado por data-tippy-content")
+        
+        if assistir_btn:
+            href = assistir_btn.get('href', '')
+            logger.debug("🎯 Botão ASSISTIR encontrado com href: '%s'", href)
+            
+            # CASO 1: Se o href é uma URL completa (http://...), é o player direto!
+            if href.startswith('http'):
+                if 'play' in href.lower() or 'stream' in href.lower():
+                    logger.debug("✓ URL do player encontrada diretamente!")
+                    return href
+                else:
+                    logger.warning("⚠ URL não parece ser um player: %s", href)
             
-            for idx, item in enumerate(items, 1):
-                try:
-                    # Extrai informações do item
-                    info_div = item.find('div', class_='info')
-                    
-                    if not info_div:
-                        continue
-                    
-                    # Título
-                    title_tag = info_div.find('h6')
-                    title = title_tag.text.strip() if title_tag else "Sem título"
-                    
-                    # Link para assistir
-                    watch_btn = info_div.find('a', href=True)
-                    watch_link = watch_btn['href'] if watch_btn else ""
-                    
-                    # Tags (duração/temporadas, ano, IMDb)
-                    tags = info_div.find('p', class_='tags')
-                    duration_or_seasons = ""
-                    year = ""
-                    imdb = ""
-                    
-                    if tags:
-                        spans = tags.find_all('span')
-                        if len(spans) > 0:
-                            duration_or_seasons = spans[0].text.strip()
-                        if len(spans) > 1:
-                            year = spans[1].text.strip()
-                        if len(spans) > 2:
-                            imdb_text = spans[2].text.strip()
-                            # Remove "IMDb" do texto
-                            imdb = imdb_text.replace('IMDb', '').strip()
-                    
-                    # Imagem de fundo
-                    content_div = item.find('div', class_='content')
-                    image_url = ""
-                    if content_div:
-                        bg_style = content_div.get('style', '')
-                        image_match = re.search(r'url\((.*?)\)', bg_style)
-                        if image_match:
-                            image_url = image_match.group(1).strip('"\'')
-                    
-                    # Detecta se é série ou filme
-                    is_series = 'Temporada' in duration_or_seasons
-                    
-                    movie_data = {
-                        'title': title,
-                        'type': 'series' if is_series else 'movie',  # NOVO: identifica o tipo
-                        'watch_link': watch_link,
-                        'duration_or_seasons': duration_or_seasons,
-                        'year': year,
-                        'imdb': imdb,
-                        'image_url': image_url,
-                        'player_url': None,
-                        'video_url': None,
-                        'is_series': is_series,
-                        'episodes': []
-                    }
+            # CASO 2: Se o href começa com #, é uma âncora para um elemento na mesma página
+            elif href.startswith('#'):
+                element_id = href[1:]  # Remove o #
+                logger.debug("🔍 Procurando elemento com ID: '%s'", element_id)
+                
+                # Procura o elemento com esse ID
+                player_element = soup.find(id=element_id)
+                
+                if player_element:
+                    logger.debug("✓ Elemento encontrado: %s", element_id)
+                    logger.debug("📝 Tag: %s, Classes: %s", player_element.name, player_element.get('class', []))
                     
-                    print(f"  {idx}. {title}")
+                    # Procura por iframe dentro desse elemento
+                    iframe = player_element.find('iframe')
                     
-                    # Se solicitado, extrai URLs do player e vídeo
-                    if get_video_urls and watch_link:
-                        if is_series:
-                            print(f"     📺 Série detectada - extraindo episódios...")
-                            try:
-                                episodes = self.get_series_episodes(watch_link)
-                                
-                                # NOVO: Limita número de episódios se configurado
-                                if max_episodes_per_series > 0:
-                                    episodes = episodes[:max_episodes_per_series]
-                                    print(f"     ⚠ Limitado a {max_episodes_per_series} episódios")
-                                
-                                movie_data['episodes'] = episodes
-                                
-                                # Opcionalmente, extrai URLs de vídeo dos episódios
-                                if episodes:
-                                    print(f"     🎬 Extraindo URLs de vídeo dos episódios...")
-                                    for ep in episodes[:3]:  # Primeiros 3 episódios como exemplo
-                                        if ep.get('player_url'):
-                                            try:
-                                                video_url = self.get_video_mp4_url(ep['player_url'])
-                                                ep['video_url'] = video_url
-                                                if video_url:
-                                                    print(f"        ✓ {ep['title']}: {video_url[:60]}...")
-                                            except Exception as e:
-                                                print(f"        ✗ Erro: {e}")
-                            except Exception as e:
-                                print(f"     ✗ Erro ao extrair episódios: {e}")
+                    if iframe:
+                        src = iframe.get('src', '')
+                        if src:
+                            player_url = src if src.startswith('http') else urljoin(self.base_url, src)
+                            logger.debug("✓ iframe encontrado: %s...", player_url[:80])
+                            return player_url
                         else:
-                            print(f"     🎬 Filme detectado - extraindo vídeo...")
-                            try:
-                                player_url = self.get_player_url(watch_link)
-                                movie_data['player_url'] = player_url
-                                
-                                if player_url:
-                                    print(f"     ✓ Player: {player_url[:60]}...")
-                                    video_url = self.get_video_mp4_url(player_url)
-                                    movie_data['video_url'] = video_url
-                                    if video_url:
-                                        print(f"     ✓ Vídeo: {video_url[:80]}...")
-                                    else:
-                                        print(f"     ⚠ URL do vídeo não encontrada")
-                                else:
-                                    print(f"     ⚠ URL do player não encontrada")
-                            except Exception as e:
-                                print(f"     ✗ Erro ao extrair vídeo: {e}")
-                    
-                    movies.append(movie_data)
+                            logger.warning("⚠ iframe sem src")
+                    else:
+                        logger.warning("⚠ Nenhum iframe dentro do elemento %s", element_id)
+                        
+                        # Debug: mostra o conteúdo do elemento
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("📝 Conteúdo do elemento (primeiros 200 chars): %s", str(player_element)[:200])
                     
-                    # Delay para não sobrecarregar o servidor
-                    if get_video_urls and idx < len(items):
-                        time.sleep(0.3)
+                    # Se não encontrou iframe, procura por data-src ou data-player
+                    for attr in ['data-src', 'data-player', 'data-url', 'data-iframe']:
+                        elem_with_attr = player_element.find(attrs={attr: True})
+                        if elem_with_attr:
+                            data_src = elem_with_attr.get(attr)
+                            if data_src:
+                                player_url = data_src if data_src.startswith('http') else urljoin(self.base_url, data_src)
+                                logger.debug("✓ URL encontrada em %s: %s...", attr, player_url[:80])
+                                return player_url
+                else:
+                    logger.warning("⚠ Elemento com ID '%s' não encontrado", element_id)
                     
-                except Exception as e:
-                    print(f"  ✗ Erro ao processar item {idx}: {e}")
-                    continue
+                    # Debug: lista os IDs disponíveis
+                    if logger.isEnabledFor(logging.DEBUG):
+                        all_ids = [elem.get('id') for elem in soup.find_all(id=True, limit=10)]
+                        logger.debug("📝 IDs disponíveis na página: %s", all_ids)
+            
+            # CASO 3: Se for URL relativa, converte para absoluta
+            elif href.startswith('/'):
+                full_url = urljoin(self.base_url, href)
+                logger.debug("✓ URL relativa convertida: %s", full_url)
+                return full_url
+            else:
+                logger.warning("⚠ Formato de href não reconhecido: '%s'", href)
+        else:
+            logger.warning("⚠ Botão ASSISTIR não encontrado")
+        
+        # MÉTODO 2: Procura por iframes na página com "play" no src
+        logger.debug("🔍 Procurando iframes na página...")
+        iframes = soup.find_all('iframe')
+        logger.debug("📊 Encontrados %s iframes", len(iframes))
+        
+        for idx, iframe in enumerate(iframes):
+            src = iframe.get('src', '')
+            iframe_id = iframe.get('id', 'N/A')
+            logger.debug("🔍 iframe %s: id='%s' src='%s...'", idx+1, iframe_id, src[:60] if src else 'sem src')
+            
+            if src and ('play' in src.lower() or 'stream' in src.lower()):
+                player_url = src if src.startswith('http') else urljoin(self.base_url, src)
+                logger.debug("✓ iframe com 'play' ou 'stream' encontrado")
+                return player_url
+        
+        # MÉTODO 3: Pega o primeiro iframe disponível
+        if iframes and iframes[0].get('src'):
+            player_url = iframes[0]['src']
+            if not player_url.startswith('http'):
+                player_url = urljoin(self.base_url, player_url)
+            logger.warning("⚠ Usando primeiro iframe disponível")
+            return player_url
+        
+        logger.warning("✗ Nenhum player encontrado")
+        return None
+        
+    def get_series_episodes(self, watch_link):
+        """
+        Extrai todos os episódios de todas as temporadas de uma série
+        
+        A página da série traz apenas a temporada selecionada; as demais são
+        buscadas, com até `max_season_workers` em paralelo, no endpoint que
+        a página declara para a troca do select#seasons-view (ver
+        _season_url) ou, sem ele, em `season_ajax_path`. Cada temporada
+        fica em cache separadamente: as antigas com SEASON_CACHE_TTL, a mais
+        recente com o TTL padrão do cache (pode ganhar episódios novos a
+        qualquer momento). Se alguma temporada falhar, a lista parcial é
+        retornada sem ir para o cache nem para o catálogo.
+        """
+        self.keep_alive()
+        
+        try:
+            if not watch_link.startswith('http'):
+                watch_link = urljoin(self.base_url, watch_link)
             
-            print(f"\n✓ Total: {len(movies)} filmes extraídos")
-            
-            # NOVO: Retorna dados organizados se solicitado
-            if organize_output:
-                organized_data = {
-                    'movies': [m for m in movies if m['type'] == 'movie'],
-                    'series': [m for m in movies if m['type'] == 'series'],
-                    'summary': {
-                        'total': len(movies),
-                        'movies': len([m for m in movies if m['type'] == 'movie']),
-                        'series': len([m for m in movies if m['type'] == 'series'])
-                    }
-                }
-                print(f"📊 Organizado: {organized_data['summary']['movies']} filmes, {organized_data['summary']['series']} séries")
-                return organized_data
+            logger.debug("📺 Acessando página da série: %s", watch_link)
+            response = self._get(watch_link)
+            self.last_activity = time.time()
+            page = self._parse_series_page(response.content)
+            if page is None:
+                return []
             
-            return movies
+            episodes_by_season, pending = self._cached_seasons(watch_link, page)
+            
+            # Busca as temporadas que faltam em paralelo
+            if pending:
+                workers = min(self.max_season_workers, len(pending))
+                fetch = lambda season: self._fetch_season_episodes(
+                    season[0], season[1], page['serie_id'], page['season_url']
+                )
+                
+                if workers <= 1:
+                    fetched = [fetch(season) for season in pending]
+                else:
+                    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cnvs-season') as executor:
+                        fetched = list(executor.map(fetch, pending))
+                
+                for (option_id, _), season_episodes in zip(pending, fetched):
+                    if season_episodes is not None:
+                        episodes_by_season[option_id] = season_episodes
+            
+            return self._merge_seasons(watch_link, page, episodes_by_season)
             
         except Exception as e:
-            print(f"✗ Erro ao buscar filmes mais assistidos: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
+            logger.warning("✗ Erro ao extrair episódios: %s", e, exc_info=True)
+            return self._stale_episodes(watch_link)
     
-    def search_movies(self, query, get_video_urls=True, max_episodes_per_series=5, organize_output=True):
+    @timed(STAGE_SECONDS, stage='extract', target='series')
+    def _parse_series_page(self, markup):
         """
-        Busca filmes/séries no site
+        Extrai da página da série as temporadas do select e os episódios da
+        temporada que já vem na página
         
-        Args:
-            query: Termo de busca
-            get_video_urls: Se True, extrai URLs dos vídeos
-            max_episodes_per_series: Máximo de episódios para extrair por série (0 = todos)
-            organize_output: Se True, retorna dados organizados em {movies: [], series: []}
+        Returns:
+            {seasons: [(id, nome)], season_id, season_name, episodes, serie_id,
+            season_url} ou None se a página não tem o select/container de
+            episódios
         """
-        self.keep_alive()
+        soup = make_soup(markup, SERIES_STRAINER)
+        
+        # Procura o select de temporadas
+        seasons_select = soup.find('select', id='seasons-view')
+        
+        if not seasons_select:
+            logger.warning("⚠ Select de temporadas não encontrado")
+            return None
+        
+        # Pega todas as temporadas
+        seasons = seasons_select.find_all('option')
+        logger.debug("📊 Encontradas %s temporadas", len(seasons))
+        
+        episodes_container = soup.find('div', id='episodes-view')
+        
+        if not episodes_container:
+            logger.warning("⚠ Container de episódios não encontrado")
+            return None
+        
+        # Identifica qual temporada está selecionada (é a que veio na página);
+        # sem "selected", o navegador mostra a primeira opção do select
+        selected_season = seasons_select.find('option', selected=True)
+        if selected_season is None:
+            selected_season = next((option for option in seasons if option.get('value')), None)
+        season_name = selected_season.get_text(strip=True) if selected_season else "Temporada 1"
+        season_id = selected_season.get('value') if selected_season else "unknown"
+        
+        # Encontra todos os episódios da temporada atual
+        episodes = episodes_container.find_all('div', class_='ep')
+        logger.debug("📊 Encontrados %s episódios na temporada atual", len(episodes))
         
+        return {
+            'seasons': [(option.get('value'), option.get_text(strip=True)) for option in seasons],
+            'season_id': season_id,
+            'season_name': season_name,
+            'episodes': self._parse_episodes(episodes, season_name, season_id),
+            'serie_id': seasons_select.get('data-serie'),
+            'season_url': self._season_url(seasons_select, markup)
+        }
+    
+    @staticmethod
+    def _season_url(seasons_select, markup):
+        """
+        Endpoint da troca de temporada declarado na página (atributo data-*
+        do select ou URL .php de temporada/episódios em um script inline),
+        ou None
+        """
+        for attr in _SEASON_URL_ATTRS:
+            if seasons_select.get(attr):
+                return seasons_select[attr]
+        
+        # Os scripts ficam fora do SoupStrainer: procura no HTML bruto
+        text = markup.decode('utf-8', 'replace') if isinstance(markup, bytes) else markup
+        match = _SEASON_SCRIPT_URL_RE.search(text)
+        return match.group(1) if match else None
+    
+    def _season_request(self, season_id, serie_id, season_url):
+        """URL e parâmetros da troca de temporada"""
+        if not season_url:
+            logger.debug("Página da série sem endpoint de temporadas; usando %s", self.season_ajax_path)
+        params = {'season': season_id}
+        if serie_id:
+            params['serie'] = serie_id
+        return urljoin(self.base_url, season_url or self.season_ajax_path), params
+    
+    def _cached_seasons(self, watch_link, page):
+        """
+        Separa as temporadas da série em já conhecidas (página ou cache) e
+        pendentes
+        
+        Returns:
+            ({season_id: [episódios]}, [(season_id, nome)] a buscar)
+        """
+        episodes_by_season = {page['season_id']: page['episodes']}
+        pending = []
+        
+        for option_id, name in page['seasons']:
+            if not option_id or option_id in episodes_by_season:
+                continue
+            
+            cached = self.cache.get(('season', watch_link, option_id))
+            if cached is not None:
+                logger.debug("⚡ %s em cache", name)
+                episodes_by_season[option_id] = [ep.to_dict() for ep in cached]
+            else:
+                pending.append((option_id, name))
+        
+        return episodes_by_season, pending
+    
+    def _merge_seasons(self, watch_link, page, episodes_by_season):
+        """
+        Monta a lista na ordem do select; com a série completa, guarda cada
+        temporada no cache e os episódios no catálogo
+        """
+        seasons = page['seasons']
+        newest_id = seasons[-1][0] if seasons else None
+        missing = [name for option_id, name in seasons if option_id and option_id not in episodes_by_season]
+        
+        if missing:
+            # Endpoint errado ou site instável: nada de guardar uma série pela metade
+            logger.warning(
+                "⚠ %s: %s de %s temporadas não vieram (%s); resultado parcial fora do cache e do catálogo",
+                watch_link, len(missing), len(seasons), ', '.join(missing)
+            )
+        else:
+            # A mais recente fica com o TTL curto (pode ganhar episódios novos)
+            for option_id, season_episodes in episodes_by_season.items():
+                if option_id != 'unknown' and season_episodes:
+                    ttl = None if option_id == newest_id else SEASON_CACHE_TTL
+                    self.cache.set(
+                        ('season', watch_link, option_id), tuple(Episode.from_dict(ep) for ep in season_episodes), ttl
+                    )
+        
+        all_episodes = []
+        for option_id, _ in seasons:
+            all_episodes.extend(episodes_by_season.pop(option_id, []))
+        for season_episodes in episodes_by_season.values():
+            all_episodes.extend(season_episodes)
+        
+        if not missing and all_episodes:
+            self._to_catalog('add_episodes', watch_link, all_episodes)
+        
+        logger.debug("✓ Total de episódios extraídos: %s (%s temporadas)", len(all_episodes), len(seasons))
+        return all_episodes
+    
+    def _fetch_season_episodes(self, season_id, season_name, serie_id=None, season_url=None):
+        """Busca os episódios de uma temporada pela requisição AJAX de troca de temporada"""
         try:
-            search_url = f"{self.base_url}/search.php"
-            params = {'q': query}
+            url, params = self._season_request(season_id, serie_id, season_url)
             
-            print(f"🔍 Buscando: {query}")
-            response = self.session.get(search_url, params=params)
+            logger.debug("📺 Buscando %s (id %s)...", season_name, season_id)
+            response = self._get(url, params=params, headers={'X-Requested-With': 'XMLHttpRequest'})
             self.last_activity = time.time()
-            soup = BeautifulSoup(response.content, 'html.parser')
             
-            movies = []
-            items = soup.find_all('div', class_='item poster')
+            if response.status_code != 200:
+                logger.warning("⚠ %s: status %s", season_name, response.status_code)
+                return None
             
-            print(f"📊 Encontrados {len(items)} resultados")
+            return self._parse_season_response(
+                response.content, response.headers.get('Content-Type', ''), season_name, season_id
+            )
             
-            for idx, item in enumerate(items, 1):
-                try:
-                    info_div = item.find('div', class_='info')
-                    if not info_div:
-                        continue
-                    
-                    title_tag = info_div.find('h6')
-                    title = title_tag.text.strip() if title_tag else "Sem título"
-                    
-                    watch_btn = info_div.find('a', href=True)
-                    watch_link = watch_btn['href'] if watch_btn else ""
-                    
-                    tags = info_div.find('p', class_='tags')
-                    duration_or_seasons = ""
-                    year = ""
-                    imdb = ""
-                    
-                    if tags:
-                        spans = tags.find_all('span')
-                        if len(spans) > 0:
-                            duration_or_seasons = spans[0].text.strip()
-                        if len(spans) > 1:
-                            year = spans[1].text.strip()
-                        if len(spans) > 2:
-                            imdb_text = spans[2].text.strip()
-                            imdb = imdb_text.replace('IMDb', '').strip()
-                    
-                    content_div = item.find('div', class_='content')
-                    image_url = ""
-                    if content_div:
-                        bg_style = content_div.get('style', '')
-                        image_match = re.search(r'url\((.*?)\)', bg_style)
-                        if image_match:
-                            image_url = image_match.group(1).strip('"\'')
-                    
-                    movie_data = {
-                        'title': title,
-                        'type': 'series' if 'Temporada' in duration_or_seasons else 'movie',  # NOVO
-                        'watch_link': watch_link,
-                        'duration_or_seasons': duration_or_seasons,
-                        'year': year,
-                        'imdb': imdb,
-                        'image_url': image_url,
-                        'player_url': None,
-                        'video_url': None,
-                        'is_series': 'Temporada' in duration_or_seasons,
-                        'episodes': []
-                    }
-                    
-                    print(f"  {idx}. {title}")
-                    
-                    # Detecta se é série ou filme
-                    is_series = 'Temporada' in duration_or_seasons
-                    
-                    if get_video_urls and watch_link:
-                        if is_series:
-                            print(f"     📺 Série detectada - extraindo episódios...")
-                            try:
-                                episodes = self.get_series_episodes(watch_link)
-                                
-                                # NOVO: Limita número de episódios se configurado
-                                if max_episodes_per_series > 0:
-                                    episodes = episodes[:max_episodes_per_series]
-                                    print(f"     ⚠ Limitado a {max_episodes_per_series} episódios")
-                                
-                                movie_data['episodes'] = episodes
-                                
-                                # Opcionalmente, extrai URLs de vídeo dos primeiros episódios
-                                if episodes:
-                                    print(f"     🎬 Extraindo URLs de vídeo dos primeiros episódios...")
-                                    for ep in episodes[:3]:  # Primeiros 3 como exemplo
-                                        if ep.get('player_url'):
-                                            try:
-                                                video_url = self.get_video_mp4_url(ep['player_url'])
-                                                ep['video_url'] = video_url
-                                                if video_url:
-                                                    print(f"        ✓ {ep['title']}: {video_url[:60]}...")
-                                            except Exception as e:
-                                                print(f"        ✗ Erro: {e}")
-                            except Exception as e:
-                                print(f"     ✗ Erro ao extrair episódios: {e}")
-                        else:
-                            print(f"     🎬 Filme detectado - extraindo vídeo...")
-                            try:
-                                player_url = self.get_player_url(watch_link)
-                                movie_data['player_url'] = player_url
-                                
-                                if player_url:
-                                    print(f"     ✓ Player: {player_url[:60]}...")
-                                    video_url = self.get_video_mp4_url(player_url)
-                                    movie_data['video_url'] = video_url
-                                    if video_url:
-                                        print(f"     ✓ Vídeo: {video_url[:80]}...")
-                                    else:
-                                        print(f"     ⚠ Vídeo não encontrado")
-                                else:
-                                    print(f"     ⚠ Player não encontrado")
-                            except Exception as e:
-                                print(f"     ✗ Erro: {e}")
-                    
-                    movies.append(movie_data)
-                    
-                    if get_video_urls and idx < len(items):
-                        time.sleep(0.3)
-                    
-                except Exception as e:
-                    print(f"  ✗ Erro ao processar item {idx}: {e}")
+        except Exception as e:
+            logger.warning("✗ Erro ao buscar %s: %s", season_name, e)
+            return None
+    
+    @timed(STAGE_SECONDS, stage='extract', target='season')
+    def _parse_season_response(self, markup, content_type, season_name, season_id):
+        """Converte a resposta da troca de temporada em episódios"""
+        # A resposta pode ser o fragmento HTML ou um JSON com o HTML
+        if 'json' in content_type:
+            data = json.loads(markup)
+            markup = data.get('html', '') if isinstance(data, dict) else ''
+        
+        soup = make_soup(markup, EPISODES_STRAINER)
+        return self._parse_episodes(soup.find_all('div', class_='ep'), season_name, season_id)
+    
+    def _parse_episodes(self, episodes, season_name, season_id):
+        """Converte os div.ep de uma temporada em dicionários de episódio"""
+        season_episodes = []
+        
+        for idx, ep in enumerate(episodes, 1):
+            try:
+                # ID do episódio
+                ep_id = ep.get('id', '')
+                
+                # Informações do episódio
+                info_div = ep.find('div', class_='info')
+                
+                if not info_div:
                     continue
-            
-            print(f"\n✓ Total: {len(movies)} resultados para '{query}'")
-            
-            # NOVO: Retorna dados organizados se solicitado
-            if organize_output:
-                organized_data = {
-                    'movies': [m for m in movies if m['type'] == 'movie'],
-                    'series': [m for m in movies if m['type'] == 'series'],
-                    'summary': {
-                        'total': len(movies),
-                        'movies': len([m for m in movies if m['type'] == 'movie']),
-                        'series': len([m for m in movies if m['type'] == 'series'])
-                    }
+                
+                # Título do episódio
+                title_tag = info_div.find('h5', class_='fw-bold')
+                ep_title = title_tag.get_text(strip=True) if title_tag else f"Episódio {idx}"
+                
+                # Duração
+                duration_tags = info_div.find_all('p', class_='small')
+                duration = "N/A"
+                pub_date = "N/A"
+                
+                for tag in duration_tags:
+                    text = tag.get_text(strip=True)
+                    if 'Duração:' in text:
+                        duration = text.replace('Duração:', '').strip()
+                    elif 'Publicado:' in text:
+                        pub_date = text.replace('Publicado:', '').strip()
+                
+                # Botão de assistir - procura dentro da div.buttons
+                buttons_div = ep.find('div', class_='buttons')
+                player_url = None
+                
+                if buttons_div:
+                    # Procura pelo link <a> com href
+                    watch_link_tag = buttons_div.find('a', href=True)
+                    if watch_link_tag:
+                        player_url = watch_link_tag.get('href')
+                        # Remove o '>' no final se existir (bug do HTML)
+                        if player_url and player_url.endswith('>'):
+                            player_url = player_url[:-1]
+                
+                episode_data = {
+                    'episode_id': ep_id,
+                    'season': season_name,
+                    'season_id': season_id,
+                    'title': ep_title,
+                    'duration': duration,
+                    'published_date': pub_date,
+                    'player_url': player_url,
+                    'video_url': None
                 }
-                print(f"📊 Organizado: {organized_data['summary']['movies']} filmes, {organized_data['summary']['series']} séries")
-                return organized_data
+                
+                if player_url:
+                    logger.debug("%s. %s: %s...", idx, ep_title, player_url[:60])
+                else:
+                    logger.debug("%s. %s: ⚠ sem player_url", idx, ep_title)
+                
+                season_episodes.append(episode_data)
+                
+            except Exception as e:
+                logger.warning("✗ Erro ao processar episódio %s: %s", idx, e)
+                continue
+        
+        return season_episodes
+    
+    def get_video_mp4_url(self, player_url):
+        """
+        Extrai a URL do vídeo .mp4 do player (com cache por player_url)
+        
+        A entrada expira junto com o cnvs_token da URL do vídeo (quando for
+        possível identificar a expiração) ou após o TTL padrão do cache.
+        """
+        cache_key = ('mp4', player_url)
+        video_url = self.cache.get(cache_key)
+        if video_url:
+            logger.debug("⚡ Vídeo em cache: %s...", player_url[:60])
+            return video_url
+        
+        # O token do vídeo ainda vale por TOKEN_EXPIRY_MARGIN depois que a entrada expira
+        return (
+            self.inflight.do(cache_key, self._resolve_video_mp4_url, player_url)
+            or self._stale(cache_key, player_url, TOKEN_EXPIRY_MARGIN)
+        )
+    
+    def _resolve_video_mp4_url(self, player_url):
+        """Extrai a URL do vídeo e guarda no cache (executada uma vez por URL em andamento)"""
+        video_url = self._extract_video_mp4_url(player_url)
+        if video_url:
+            self._remember('mp4', player_url, video_url)
+        return video_url
+    
+    def _extract_video_mp4_url(self, player_url):
+        """Acessa o player e extrai a URL do vídeo .mp4"""
+        self.keep_alive()
+        
+        try:
+            logger.debug("🔍 Acessando player: %s...", player_url[:60])
+            response = self._get(player_url)
+            self.last_activity = time.time()
+            return self._parse_video_mp4_url(response.content, response.text)
             
-            return movies
+        except Exception as e:
+            logger.warning("✗ Erro ao extrair vídeo MP4: %s", e, exc_info=True)
+            return None
+    
+    @timed(STAGE_SECONDS, stage='extract', target='mp4')
+    def _parse_video_mp4_url(self, markup, html):
+        """Extrai a URL do vídeo .mp4 do HTML do player (markup em bytes, html já decodificado)"""
+        soup = make_soup(markup, PLAYER_PAGE_STRAINER)
+        
+        # MÉTODO 1: Procura tag <video> com src
+        video_tags = soup.find_all('video')
+        logger.debug("📊 Encontradas %s tags <video>", len(video_tags))
+        
+        for idx, video_tag in enumerate(video_tags):
+            src = video_tag.get('src')
+            if src and '.mp4' in src:
+                logger.debug("✓ URL encontrada em <video> tag #%s", idx+1)
+                return src
+            
+            # Procura <source> dentro de <video>
+            source_tags = video_tag.find_all('source')
+            for source_tag in source_tags:
+                src = source_tag.get('src')
+                if src:
+                    logger.debug("✓ URL encontrada em <source> dentro de <video> #%s", idx+1)
+                    return src
+        
+        # MÉTODO 2: Padrões de URL .mp4 do site, em uma única passada pelo HTML
+        # Padrão: https://server-amz.playmycnvs.com/...mp4?cnvs_token=...
+        video_url, priority = scan_mp4_url(html)
+        if video_url:
+            logger.debug("✓ URL encontrada com pattern #%s: %s...", priority+1, video_url[:80])
+            return video_url
+        
+        # MÉTODO 3: Procura por divs com classe específica do player (jw-media, jw-video, etc)
+        player_divs = soup.find_all(['div', 'video'], class_=_PLAYER_CLASS_RE)
+        logger.debug("📊 Encontrados %s elementos de player", len(player_divs))
+        
+        for div in player_divs:
+            # Procura por data-src ou outros atributos
+            for attr in ['data-src', 'data-url', 'data-file', 'src']:
+                url = div.get(attr)
+                if url and '.mp4' in url:
+                    logger.debug("✓ URL encontrada em %s de elemento player", attr)
+                    return url
+        
+        # MÉTODO 4: Busca agressiva no HTML por qualquer string que pareça uma URL de vídeo
+        # (sem ".mp4" no HTML não há o que procurar)
+        all_urls = _ANY_URL_RE.findall(html) if '.mp4' in html else []
+        if all_urls:
+            logger.debug("🔍 Fazendo busca agressiva no HTML...")
+        
+        for url in all_urls:
+            url = url.strip('"\'\\,;')
+            if '.mp4' in url and ('server' in url.lower() or 'play' in url.lower() or 'cnvs' in url.lower()):
+                logger.debug("✓ URL encontrada em busca agressiva")
+                return url
+        
+        logger.warning("✗ Nenhuma URL de vídeo encontrada")
+        logger.debug("📝 Tamanho do HTML: %s caracteres", len(html))
+        
+        # Debug: salva o HTML para análise
+        if len(html) < 10000:  # Só para HTMLs pequenos
+            logger.debug("📝 HTML snippet: %s...", html[:500])
+        
+        return None
+
+
+class AsyncCNVSWebScraper(CNVSWebScraper):
+    """
+    Motor assíncrono (asyncio + httpx) com a mesma API pública do CNVSWebScraper
+    
+    Os métodos públicos são corrotinas (iter_* devolvem async generators).
+    Todas as páginas passam por um único httpx.AsyncClient, com pool de
+    conexões compartilhado; o enriquecimento dispara as páginas de todos os
+    itens ao mesmo tempo, limitadas por `max_concurrency`, em vez de ocupar
+    uma thread por item. O parsing é o mesmo do motor síncrono (_parse_*),
+    mas roda em threads (asyncio.to_thread), assim como as gravações no
+    catálogo e o cache quando ele usa o SharedStore: nada disso trava o loop.
+    
+    Para usar a partir de código síncrono (rotas Flask), veja BlockingScraper.
+    """
+    
+    single_flight_class = AsyncSingleFlight
+    
+    def __init__(self, token, max_concurrency=64, **kwargs):
+        """
+        Args:
+            token: Token de acesso ao site
+            max_concurrency: Requisições em andamento ao mesmo tempo (pool do cliente)
+            kwargs: Os mesmos do CNVSWebScraper (max_workers não se aplica)
+        """
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._client = None
+        self._semaphore = None
+        super().__init__(token, **kwargs)
+    
+    def _build_session(self, max_retries, retry_backoff):
+        # O cliente httpx só é criado dentro do event loop que vai usá-lo
+        if httpx is None:
+            raise ImportError("AsyncCNVSWebScraper requer o pacote httpx (pip install httpx)")
+        return None
+    
+    def _get_client(self):
+        if self._client is None:
+            headers = self._default_headers()
+            # O httpx negocia gzip/deflate (e br, se houver brotli) sozinho
+            headers.pop('Accept-Encoding', None)
+            self._client = httpx.AsyncClient(
+                headers=headers,
+                timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.pool_size
+                ),
+                follow_redirects=True
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+    
+    @staticmethod
+    async def _parse(parse, *args):
+        """Roda um _parse_* em uma thread (BeautifulSoup é CPU puro)"""
+        return await asyncio.to_thread(parse, *args)
+    
+    async def _storage(self, fn, *args):
+        """
+        Chama `fn` (que lê/grava cache e catálogo) em uma thread se ela vai a
+        disco (catálogo SQLite ou cache com SharedStore); só memória roda aqui
+        """
+        if self.catalog is None and self.cache.store is None:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+    
+    async def aclose(self):
+        """Fecha o cliente (e as conexões do pool)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _get(self, url, **kwargs):
+        """
+        GET pelo circuit breaker e pelo limite do host, com novas tentativas e
+        backoff em erro de conexão/timeout ou status 429/5xx (como o motor
+        síncrono); cada tentativa alimenta o limiter e o breaker
+        """
+        client = self._get_client()
+        for attempt in range(self.max_retries + 1):
+            self.circuit_breaker.before(url)
+            await asyncio.sleep(self.rate_limiter.reserve(url))
             
+            async with self._semaphore:
+                started = time.monotonic()
+                try:
+                    with STAGE_SECONDS.time(stage='fetch', target=_page(url)):
+                        response = await client.get(url, **kwargs)
+                except (httpx.TimeoutException, httpx.NetworkError):
+                    self._observe(url, None, time.monotonic() - started)
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self.retry_backoff * (2 ** attempt)
+                else:
+                    HTTP_RESPONSES.inc(page=_page(url), status=response.status_code)
+                    retry_after = response.headers.get('Retry-After')
+                    self._observe(url, response.status_code, time.monotonic() - started, retry_after)
+                    delay = _retry_delay(response.status_code, retry_after, attempt, self.max_retries, self.retry_backoff)
+                    if delay is None:
+                        return response
+            
+            await asyncio.sleep(delay)
+    
+    async def _post(self, url, **kwargs):
+        """POST pelo circuit breaker e pelo limite do host (nunca repetido)"""
+        client = self._get_client()
+        self.circuit_breaker.before(url)
+        await asyncio.sleep(self.rate_limiter.reserve(url))
+        async with self._semaphore:
+            started = time.monotonic()
+            try:
+                with STAGE_SECONDS.time(stage='fetch', target=_page(url)):
+                    response = await client.post(url, **kwargs)
+            except (httpx.TimeoutException, httpx.NetworkError):
+                self._observe(url, None, time.monotonic() - started)
+                raise
+        HTTP_RESPONSES.inc(page=_page(url), status=response.status_code)
+        self._observe(url, response.status_code, time.monotonic() - started, response.headers.get('Retry-After'))
+        return response
+    
+    async def login(self):
+        """Faz login no site usando o token"""
+        try:
+            login_page_url = f"{self.base_url}/login"
+            login_ajax_url = f"{self.base_url}/ajax/login.php"
+            
+            # Primeiro GET para pegar cookies
+            logger.info("🔑 Acessando página de login...")
+            await self._get(login_page_url)
+            
+            # POST para o endpoint AJAX com o token
+            payload, ajax_headers = self._login_request(login_page_url)
+            
+            logger.info("🔑 Fazendo login com token: %s", _mask_token(self.token))
+            response = await self._post(
+                login_ajax_url,
+                data=payload,
+                headers=ajax_headers,
+                follow_redirects=False
+            )
+            
+            logger.debug("📊 Status do login: %s", response.status_code)
+            
+            if response.status_code != 200:
+                logger.error("✗ Erro no login: Status %s", response.status_code)
+                logger.debug("📝 Resposta: %s", response.text[:200])
+                return False
+            
+            try:
+                data = response.json()
+            except ValueError:
+                logger.error("✗ Resposta não é JSON válido: %s", response.text[:200])
+                return False
+            
+            logger.debug("📦 Resposta JSON: %s", data)
+            if data.get('status') != 'success':
+                logger.error("✗ Erro no login: %s", data.get('message', 'Erro desconhecido'))
+                return False
+            
+            redirect_url = data.get('redirect', self.base_url)
+            logger.info("✓ Login realizado com sucesso!")
+            logger.debug("↪️  Redirecionando para: %s", redirect_url)
+            
+            # Acessa a página de redirecionamento para completar o login
+            response = await self._get(redirect_url)
+            
+            # Verifica se está realmente logado
+            if response.status_code == 200 and '/login' not in str(response.url):
+                logger.info("✓ Login confirmado - sessão ativa")
+                self.last_activity = time.time()
+                self.logged_in = True
+                return True
+            
+            logger.warning("⚠ Redirecionamento falhou")
+            return False
+                
+        except Exception as e:
+            logger.error("✗ Erro no login: %s", e, exc_info=True)
+            return False
+    
+    async def keep_alive(self):
+        """Atualiza a sessão para não deslogar (ver CNVSWebScraper.keep_alive)"""
+        if not self.logged_in:
+            return False
+        
+        if time.time() - self.last_activity > 180:  # 3 minutos
+            logger.info("⟳ Atualizando sessão...")
+            try:
+                response = await self._get(self.base_url)
+                if response.status_code in RETRY_STATUS:
+                    logger.warning("⚠ Sessão não verificada (status %s)", response.status_code)
+                    return True
+                if response.status_code != 200 or '/login' in str(response.url):
+                    logger.warning("✗ Sessão expirada (status %s)", response.status_code)
+                    SESSION_EVENTS.inc(event='session_expired')
+                    self.logged_in = False
+                    return False
+                self.last_activity = time.time()
+                SESSION_EVENTS.inc(event='keep_alive')
+                logger.info("✓ Sessão atualizada")
+            except CircuitOpenError as e:
+                # Site fora do ar não derruba a sessão: ela é conferida quando o circuito fechar
+                logger.info("⚡ Sessão não verificada: %s", e)
+                return True
+            except Exception as e:
+                logger.warning("Erro ao atualizar sessão: %s", e)
+                SESSION_EVENTS.inc(event='keep_alive_error')
+                return False
+        return True
+    
+    def export_session(self):
+        """Cookies e estado de login (ver CNVSWebScraper.export_session)"""
+        return {'logged_in': self.logged_in, 'cookies': _export_cookies(self._get_client().cookies.jar)}
+    
+    def import_session(self, state, last_activity=None):
+        """Adota a sessão exportada por export_session() (ver CNVSWebScraper.import_session)"""
+        _import_cookies(self._get_client().cookies, state.get('cookies', []))
+        self.logged_in = bool(state.get('logged_in'))
+        self.last_activity = time.time() if last_activity is None else last_activity
+    
+    async def get_most_watched_today(self, get_video_urls=True, max_episodes_per_series=5, organize_output=True):
+        """Pega os filmes/séries mais assistidos do dia (ver CNVSWebScraper)"""
+        await self.keep_alive()
+        
+        try:
+            movies = await self._fetch_most_watched_items()
+            return await self._collect(movies, get_video_urls, max_episodes_per_series, organize_output)
+        except Exception as e:
+            logger.error("✗ Erro ao buscar filmes mais assistidos: %s", e, exc_info=True)
+            return []
+    
+    async def most_watched_page(self, offset=0, limit=None, get_video_urls=True, max_episodes_per_series=5):
+        """Uma página do "Mais Visto do Dia" (ver CNVSWebScraper)"""
+        await self.keep_alive()
+        
+        try:
+            movies = await self._fetch_most_watched_items()
+            return await self._collect_page(movies, offset, limit, get_video_urls, max_episodes_per_series)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error("✗ Erro ao buscar filmes mais assistidos: %s", e, exc_info=True)
+            return {'items': [], 'total': 0}
+    
+    async def iter_most_watched_today(self, get_video_urls=True, max_episodes_per_series=5, offset=0, limit=None):
+        """Versão em streaming: {'items': async generator (ordem de conclusão), 'total'}"""
+        await self.keep_alive()
+        movies = await self._fetch_most_watched_items()
+        page = page_slice(movies, offset, limit)
+        return {'items': self._iter_enriched(page, get_video_urls, max_episodes_per_series), 'total': len(movies)}
+    
+    async def _fetch_most_watched_items(self):
+        logger.info("📡 Acessando página principal...")
+        response = await self._get(self.base_url)
+        self.last_activity = time.time()
+        movies = await self._parse(self._parse_most_watched_items, response.content)
+        await self._storage(self._to_catalog, 'add_titles', movies)
+        return movies
+    
+    async def get_home_sections(self):
+        await self.keep_alive()
+        response = await self._get(self.base_url)
+        self.last_activity = time.time()
+        sections = await self._parse(self._parse_home_sections, response.content)
+        for _, movies in sections:
+            await self._storage(self._to_catalog, 'add_titles', movies)
+        return sections
+    
+    async def search_movies(self, query, get_video_urls=True, max_episodes_per_series=5, organize_output=True):
+        """Busca filmes/séries no site (ver CNVSWebScraper)"""
+        await self.keep_alive()
+        
+        try:
+            movies = await self._fetch_search_items(query)
+            return await self._collect(movies, get_video_urls, max_episodes_per_series, organize_output)
         except Exception as e:
-            print(f"✗ Erro na busca: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("✗ Erro na busca: %s", e, exc_info=True)
             return []
     
-    def get_movie_details(self, movie_url):
+    async def search_page(self, query, offset=0, limit=None, get_video_urls=True, max_episodes_per_series=5):
+        """Uma página dos resultados da busca (ver CNVSWebScraper)"""
+        await self.keep_alive()
+        
+        try:
+            movies = await self._fetch_search_items(query)
+            return await self._collect_page(movies, offset, limit, get_video_urls, max_episodes_per_series)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error("✗ Erro na busca: %s", e, exc_info=True)
+            return {'items': [], 'total': 0}
+    
+    async def iter_search_movies(self, query, get_video_urls=True, max_episodes_per_series=5, offset=0, limit=None):
+        """Versão em streaming: {'items': async generator (ordem de conclusão), 'total'}"""
+        await self.keep_alive()
+        movies = await self._fetch_search_items(query)
+        page = page_slice(movies, offset, limit)
+        return {'items': self._iter_enriched(page, get_video_urls, max_episodes_per_series), 'total': len(movies)}
+    
+    async def _fetch_search_items(self, query):
+        logger.info("🔍 Buscando: %s", query)
+        response = await self._get(f"{self.base_url}/search.php", params={'q': query})
+        self.last_activity = time.time()
+        movies = await self._parse(self._parse_search_items, response.content)
+        await self._storage(self._to_catalog, 'add_titles', movies)
+        return movies
+    
+    async def _collect(self, movies, get_video_urls=True, max_episodes_per_series=5, organize_output=True):
+        """Final do pipeline (ver CNVSWebScraper._collect)"""
+        if get_video_urls:
+            await self._enrich_items(movies, max_episodes_per_series)
+        return self._finish(movies, organize_output)
+    
+    async def _collect_page(self, movies, offset, limit, get_video_urls, max_episodes_per_series):
+        """Final do pipeline de most_watched_page/search_page (ver CNVSWebScraper._collect_page)"""
+        page = page_slice(movies, offset, limit)
+        if get_video_urls:
+            await self._enrich_items(page, max_episodes_per_series)
+        logger.info("✓ Página: %s de %s itens (a partir de %s)", len(page), len(movies), offset)
+        return {'items': page, 'total': len(movies)}
+    
+    async def _enrich_items(self, movies, max_episodes_per_series=5):
+        """Enriquece todos os itens ao mesmo tempo (a lista mantém a ordem)"""
+        await asyncio.gather(*(self._enrich_item(m, max_episodes_per_series) for m in movies))
+        return movies
+    
+    async def _iter_enriched(self, movies, get_video_urls=True, max_episodes_per_series=5):
+        """
+        Gera os itens conforme o enriquecimento de cada um termina; se o
+        consumidor parar no meio, as tarefas pendentes são canceladas
+        """
+        if not get_video_urls:
+            for movie_data in movies:
+                yield movie_data
+            return
+        
+        tasks = [asyncio.ensure_future(self._enrich_item(m, max_episodes_per_series)) for m in movies]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    @timed(STAGE_SECONDS, stage='enrich', target='item')
+    async def _enrich_item(self, movie_data, max_episodes_per_series=5):
+        """Extrai URLs do player e vídeo (filme) ou episódios (série) de um item"""
+        watch_link = movie_data['watch_link']
+        if not watch_link:
+            return movie_data
+        
+        if movie_data['is_series']:
+            logger.debug("📺 Série detectada - extraindo episódios: %s", movie_data['title'])
+            try:
+                episodes = await self.get_series_episodes(watch_link)
+                
+                if max_episodes_per_series > 0:
+                    episodes = episodes[:max_episodes_per_series]
+                    logger.debug("⚠ Limitado a %s episódios", max_episodes_per_series)
+                
+                movie_data['episodes'] = episodes
+                
+                # URLs de vídeo dos 3 primeiros episódios, em paralelo
+                with_player = [ep for ep in episodes[:3] if ep.get('player_url')]
+                if with_player:
+                    logger.debug("🎬 Extraindo URLs de vídeo dos primeiros episódios...")
+                    results = await asyncio.gather(
+                        *(self.get_video_mp4_url(ep['player_url']) for ep in with_player),
+                        return_exceptions=True
+                    )
+                    for ep, video_url in zip(with_player, results):
+                        if isinstance(video_url, Exception):
+                            logger.warning("✗ Erro: %s", video_url)
+                            continue
+                        ep['video_url'] = video_url
+                        if video_url:
+                            logger.debug("✓ %s: %s...", ep['title'], video_url[:60])
+            except Exception as e:
+                logger.warning("✗ Erro ao extrair episódios: %s", e)
+        else:
+            logger.debug("🎬 Filme detectado - extraindo vídeo: %s", movie_data['title'])
+            try:
+                player_url = await self.get_player_url(watch_link)
+                movie_data['player_url'] = player_url
+                
+                if player_url:
+                    logger.debug("✓ Player: %s...", player_url[:60])
+                    video_url = await self.get_video_mp4_url(player_url)
+                    movie_data['video_url'] = video_url
+                    if video_url:
+                        logger.debug("✓ Vídeo: %s...", video_url[:80])
+                    else:
+                        logger.warning("⚠ URL do vídeo não encontrada")
+                else:
+                    logger.warning("⚠ URL do player não encontrada")
+            except Exception as e:
+                logger.warning("✗ Erro ao extrair vídeo: %s", e)
+        
+        return movie_data
+    
+    async def get_movie_details(self, movie_url):
         """Extrai TODAS as informações detalhadas de um filme"""
-        self.keep_alive()
+        await self.keep_alive()
         
         try:
             if not movie_url.startswith('http'):
                 movie_url = urljoin(self.base_url, movie_url)
             
-            print(f"📄 Acessando página do filme: {movie_url}")
-            response = self.session.get(movie_url)
+            logger.debug("📄 Acessando página do filme: %s", movie_url)
+            response = await self._get(movie_url)
             self.last_activity = time.time()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            movie_info = {
-                'title': '',
-                'original_title': '',
-                'year': '',
-                'duration': '',
-                'genres': [],
-                'imdb_rating': '',
-                'synopsis': '',
-                'director': '',
-                'cast': [],
-                'trailer_url': '',
-                'image_url': '',
-                'backdrop_url': '',
-                'watch_link': movie_url,
-                'player_url': None,
-                'video_url': None
-            }
-            
-            # Título
-            title_tag = soup.find('h1') or soup.find('h2', class_='title')
-            if title_tag:
-                movie_info['title'] = title_tag.text.strip()
-            
-            # Imagem principal
-            poster_div = soup.find('div', class_='poster') or soup.find('img', class_='poster')
-            if poster_div:
-                if poster_div.name == 'img':
-                    movie_info['image_url'] = poster_div.get('src', '')
-                else:
-                    bg_style = poster_div.get('style', '')
-                    image_match = re.search(r'url\((.*?)\)', bg_style)
-                    if image_match:
-                        movie_info['image_url'] = image_match.group(1).strip('"\'')
-            
-            # Sinopse
-            synopsis_div = soup.find('div', class_='synopsis') or soup.find('p', class_='overview')
-            if synopsis_div:
-                movie_info['synopsis'] = synopsis_div.text.strip()
-            
-            # Tags (ano, duração, IMDb)
-            tags = soup.find('p', class_='tags') or soup.find('div', class_='tags')
-            if tags:
-                spans = tags.find_all('span')
-                for span in spans:
-                    text = span.text.strip()
-                    if 'Min' in text or 'Temporadas' in text:
-                        movie_info['duration'] = text
-                    elif text.isdigit() and len(text) == 4:
-                        movie_info['year'] = text
-                    elif 'IMDb' in text:
-                        movie_info['imdb_rating'] = text.replace('IMDb', '').strip()
-            
-            # Gêneros
-            genres_div = soup.find('div', class_='genres')
-            if genres_div:
-                genre_links = genres_div.find_all('a')
-                movie_info['genres'] = [g.text.strip() for g in genre_links]
+            movie_info = await self._parse(self._parse_movie_details, response.content, movie_url)
             
-            # Player e vídeo
-            print("     🎬 Extraindo player e vídeo...")
-            player_url = self.get_player_url(movie_url)
+            logger.debug("🎬 Extraindo player e vídeo...")
+            player_url = await self.get_player_url(movie_url)
             movie_info['player_url'] = player_url
             
             if player_url:
-                print(f"     ✓ Player: {player_url}")
-                video_url = self.get_video_mp4_url(player_url)
-                movie_info['video_url'] = video_url
-                if video_url:
-                    print(f"     ✓ Vídeo MP4 extraído")
+                logger.debug("✓ Player: %s", player_url)
+                movie_info['video_url'] = await self.get_video_mp4_url(player_url)
+                if movie_info['video_url']:
+                    logger.debug("✓ Vídeo MP4 extraído")
             
+            await self._storage(self._to_catalog, 'add_details', movie_info)
             return movie_info
             
         except Exception as e:
-            print(f"✗ Erro ao obter detalhes do filme: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("✗ Erro ao obter detalhes do filme: %s", e, exc_info=True)
             return None
     
-    def get_player_url(self, movie_url, save_debug_html=False):
-        """Extrai a URL do player do filme"""
-        self.keep_alive()
+    async def get_player_url(self, movie_url, save_debug_html=False):
+        """Extrai a URL do player do filme (com cache por watch_link)"""
+        if not movie_url.startswith('http'):
+            movie_url = urljoin(self.base_url, movie_url)
+        
+        cache_key = ('player', movie_url)
+        if not save_debug_html:
+            player_url = await self._storage(self.cache.get, cache_key)
+            if player_url:
+                logger.debug("⚡ Player em cache: %s", movie_url)
+                return player_url
+        
+        if save_debug_html:
+            return await self._extract_player_url(movie_url, save_debug_html)
+        return await self.inflight.do(cache_key, self._resolve_player_url, movie_url) or self._stale(cache_key, movie_url)
+    
+    async def refresh_url(self, kind, url):
+        resolve = self._resolve_player_url if kind == 'player' else self._resolve_video_mp4_url
+        return await self.inflight.do((kind, url), resolve, url)
+    
+    async def _resolve_player_url(self, movie_url):
+        player_url = await self._extract_player_url(movie_url)
+        if player_url:
+            await self._storage(self._remember, 'player', movie_url, player_url)
+        return player_url
+    
+    async def _extract_player_url(self, movie_url, save_debug_html=False):
+        await self.keep_alive()
         
         try:
-            if not movie_url.startswith('http'):
-                movie_url = urljoin(self.base_url, movie_url)
-            
-            print(f"       🌐 Acessando: {movie_url}")
-            response = self.session.get(movie_url)
+            logger.debug("🌐 Acessando: %s", movie_url)
+            response = await self._get(movie_url)
             self.last_activity = time.time()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Opção de salvar HTML para debug
-            if save_debug_html:
-                filename = f"debug_{movie_url.split('/')[-1]}.html"
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(soup.prettify())
-                print(f"       💾 HTML salvo em: {filename}")
-            
-            # DEBUG: Mostra todos os botões/links encontrados
-            all_buttons = soup.find_all('a', class_=lambda x: x and 'btn' in str(x))
-            print(f"       📊 Encontrados {len(all_buttons)} botões na página")
-            
-            for i, btn in enumerate(all_buttons[:5], 1):  # Primeiros 5
-                text = btn.get_text(strip=True)[:30]
-                href = btn.get('href', 'N/A')
-                classes = btn.get('class', [])
-                print(f"       🔘 Botão {i}: '{text}' | href='{href}' | class={classes}")
-            
-            # MÉTODO 1: Procura botão "ASSISTIR" - várias tentativas
-            assistir_btn = None
-            
-            # Tentativa 1: classe "btn free"
-            assistir_btn = soup.find('a', class_='btn free')
-            if assistir_btn:
-                print(f"       ✓ Encontrado com classe 'btn free'")
-            
-            # Tentativa 2: classe contendo "btn" e texto "ASSISTIR"
-            if not assistir_btn:
-                all_links = soup.find_all('a')
-                for link in all_links:
-                    text = link.get_text(strip=True).upper()
-                    if 'ASSISTIR' in text or 'PLAY' in text:
-                        assistir_btn = link
-                        print(f"       ✓ Encontrado por texto: '{link.get_text(strip=True)}'")
-                        break
-            
-            # Tentativa 3: procura por data-tippy-content com "Assistir"
-            if not assistir_btn:
-                assistir_btn = soup.find('a', attrs={'data-tippy-content': lambda x: x and 'Assistir' in x})
-                if assistir_btn:
-                    print(f"       ✓ Encontrado por data-tippy-content")
-            
-            if assistir_btn:
-                href = assistir_btn.get('href', '')
-                print(f"       🎯 Botão ASSISTIR encontrado com href: '{href}'")
-                
-                # CASO 1: Se o href é uma URL completa (http://...), é o player direto!
-                if href.startswith('http'):
-                    if 'play' in href.lower() or 'stream' in href.lower():
-                        print(f"       ✓ URL do player encontrada diretamente!")
-                        return href
-                    else:
-                        print(f"       ⚠ URL não parece ser um player: {href}")
-                
-                # CASO 2: Se o href começa com #, é uma âncora para um elemento na mesma página
-                elif href.startswith('#'):
-                    element_id = href[1:]  # Remove o #
-                    print(f"       🔍 Procurando elemento com ID: '{element_id}'")
-                    
-                    # Procura o elemento com esse ID
-                    player_element = soup.find(id=element_id)
-                    
-                    if player_element:
-                        print(f"       ✓ Elemento encontrado: {element_id}")
-                        print(f"       📝 Tag: {player_element.name}, Classes: {player_element.get('class', [])}")
-                        
-                        # Procura por iframe dentro desse elemento
-                        iframe = player_element.find('iframe')
-                        
-                        if iframe:
-                            src = iframe.get('src', '')
-                            if src:
-                                player_url = src if src.startswith('http') else urljoin(self.base_url, src)
-                                print(f"       ✓ iframe encontrado: {player_url[:80]}...")
-                                return player_url
-                            else:
-                                print(f"       ⚠ iframe sem src")
-                        else:
-                            print(f"       ⚠ Nenhum iframe dentro do elemento {element_id}")
-                            
-                            # Debug: mostra o conteúdo do elemento
-                            print(f"       📝 Conteúdo do elemento (primeiros 200 chars):")
-                            print(f"           {str(player_element)[:200]}")
-                        
-                        # Se não encontrou iframe, procura por data-src ou data-player
-                        for attr in ['data-src', 'data-player', 'data-url', 'data-iframe']:
-                            elem_with_attr = player_element.find(attrs={attr: True})
-                            if elem_with_attr:
-                                data_src = elem_with_attr.get(attr)
-                                if data_src:
-                                    player_url = data_src if data_src.startswith('http') else urljoin(self.base_url, data_src)
-                                    print(f"       ✓ URL encontrada em {attr}: {player_url[:80]}...")
-                                    return player_url
-                    else:
-                        print(f"       ⚠ Elemento com ID '{element_id}' não encontrado")
-                        
-                        # Debug: lista todos os IDs disponíveis
-                        all_ids = [elem.get('id') for elem in soup.find_all(id=True)]
-                        print(f"       📝 IDs disponíveis na página: {all_ids[:10]}")
-                
-                # CASO 3: Se for URL relativa, converte para absoluta
-                elif href.startswith('/'):
-                    full_url = urljoin(self.base_url, href)
-                    print(f"       ✓ URL relativa convertida: {full_url}")
-                    return full_url
-                else:
-                    print(f"       ⚠ Formato de href não reconhecido: '{href}'")
-            else:
-                print(f"       ⚠ Botão ASSISTIR não encontrado")
-            
-            # MÉTODO 2: Procura por iframes na página com "play" no src
-            print(f"       🔍 Procurando iframes na página...")
-            iframes = soup.find_all('iframe')
-            print(f"       📊 Encontrados {len(iframes)} iframes")
-            
-            for idx, iframe in enumerate(iframes):
-                src = iframe.get('src', '')
-                iframe_id = iframe.get('id', 'N/A')
-                print(f"       🔍 iframe {idx+1}: id='{iframe_id}' src='{src[:60] if src else 'sem src'}...'")
-                
-                if src and ('play' in src.lower() or 'stream' in src.lower()):
-                    player_url = src if src.startswith('http') else urljoin(self.base_url, src)
-                    print(f"       ✓ iframe com 'play' ou 'stream' encontrado")
-                    return player_url
-            
-            # MÉTODO 3: Pega o primeiro iframe disponível
-            if iframes and iframes[0].get('src'):
-                player_url = iframes[0]['src']
-                if not player_url.startswith('http'):
-                    player_url = urljoin(self.base_url, player_url)
-                print(f"       ⚠ Usando primeiro iframe disponível")
-                return player_url
-            
-            print(f"       ✗ Nenhum player encontrado")
-            return None
-            
+            return await self._parse(self._parse_player_url, response.content, movie_url, save_debug_html)
         except Exception as e:
-            print(f"       ✗ Erro ao extrair player URL: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("✗ Erro ao extrair player URL: %s", e)
             return None
     
-    def get_series_episodes(self, watch_link):
-        """Extrai todos os episódios de todas as temporadas de uma série"""
-        self.keep_alive()
+    async def get_series_episodes(self, watch_link):
+        """Extrai todos os episódios de todas as temporadas de uma série (ver CNVSWebScraper)"""
+        await self.keep_alive()
         
         try:
             if not watch_link.startswith('http'):
                 watch_link = urljoin(self.base_url, watch_link)
             
-            print(f"       📺 Acessando página da série: {watch_link}")
-            response = self.session.get(watch_link)
+            logger.debug("📺 Acessando página da série: %s", watch_link)
+            response = await self._get(watch_link)
             self.last_activity = time.time()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Procura o select de temporadas
-            seasons_select = soup.find('select', id='seasons-view')
-            
-            if not seasons_select:
-                print(f"       ⚠ Select de temporadas não encontrado")
+            page = await self._parse(self._parse_series_page, response.content)
+            if page is None:
                 return []
             
-            # Pega todas as temporadas
-            seasons = seasons_select.find_all('option')
-            print(f"       📊 Encontradas {len(seasons)} temporadas")
+            episodes_by_season, pending = await self._storage(self._cached_seasons, watch_link, page)
             
-            all_episodes = []
+            # As temporadas que faltam em paralelo, até max_season_workers por série
+            seasons = asyncio.Semaphore(self.max_season_workers)
             
-            # NOTA: Por enquanto, vamos extrair apenas os episódios da temporada ATUAL
-            # (a que está visível na página)
-            # Para extrair TODAS as temporadas, seria necessário fazer requisições AJAX
-            # ou usar Selenium
+            async def fetch_season(option_id, name):
+                async with seasons:
+                    return await self._fetch_season_episodes(option_id, name, page['serie_id'], page['season_url'])
             
-            episodes_container = soup.find('div', id='episodes-view')
+            fetched = await asyncio.gather(*(fetch_season(option_id, name) for option_id, name in pending))
+            for (option_id, _), season_episodes in zip(pending, fetched):
+                if season_episodes is not None:
+                    episodes_by_season[option_id] = season_episodes
             
-            if not episodes_container:
-                print(f"       ⚠ Container de episódios não encontrado")
-                return []
+            return await self._storage(self._merge_seasons, watch_link, page, episodes_by_season)
             
-            # Encontra todos os episódios
-            episodes = episodes_container.find_all('div', class_='ep')
-            print(f"       📊 Encontrados {len(episodes)} episódios na temporada atual")
+        except Exception as e:
+            logger.warning("✗ Erro ao extrair episódios: %s", e, exc_info=True)
+            return await self._storage(self._stale_episodes, watch_link)
+    
+    async def _fetch_season_episodes(self, season_id, season_name, serie_id=None, season_url=None):
+        """Busca os episódios de uma temporada pela requisição AJAX de troca de temporada"""
+        try:
+            url, params = self._season_request(season_id, serie_id, season_url)
             
-            # Identifica qual temporada está selecionada
-            selected_season = seasons_select.find('option', selected=True)
-            season_name = selected_season.get_text(strip=True) if selected_season else "Temporada 1"
-            season_id = selected_season.get('value') if selected_season else "unknown"
+            logger.debug("📺 Buscando %s (id %s)...", season_name, season_id)
+            response = await self._get(url, params=params, headers={'X-Requested-With': 'XMLHttpRequest'})
+            self.last_activity = time.time()
             
-            for idx, ep in enumerate(episodes, 1):
-                try:
-                    # ID do episódio
-                    ep_id = ep.get('id', '')
-                    
-                    # Informações do episódio
-                    info_div = ep.find('div', class_='info')
-                    
-                    if not info_div:
-                        continue
-                    
-                    # Título do episódio
-                    title_tag = info_div.find('h5', class_='fw-bold')
-                    ep_title = title_tag.get_text(strip=True) if title_tag else f"Episódio {idx}"
-                    
-                    # Duração
-                    duration_tags = info_div.find_all('p', class_='small')
-                    duration = "N/A"
-                    pub_date = "N/A"
-                    
-                    for tag in duration_tags:
-                        text = tag.get_text(strip=True)
-                        if 'Duração:' in text:
-                            duration = text.replace('Duração:', '').strip()
-                        elif 'Publicado:' in text:
-                            pub_date = text.replace('Publicado:', '').strip()
-                    
-                    # Botão de assistir - procura dentro da div.buttons
-                    buttons_div = ep.find('div', class_='buttons')
-                    player_url = None
-                    
-                    if buttons_div:
-                        # Procura pelo link <a> com href
-                        watch_link_tag = buttons_div.find('a', href=True)
-                        if watch_link_tag:
-                            player_url = watch_link_tag.get('href')
-                            # Remove o '>' no final se existir (bug do HTML)
-                            if player_url and player_url.endswith('>'):
-                                player_url = player_url[:-1]
-                    
-                    episode_data = {
-                        'episode_id': ep_id,
-                        'season': season_name,
-                        'season_id': season_id,
-                        'title': ep_title,
-                        'duration': duration,
-                        'published_date': pub_date,
-                        'player_url': player_url,
-                        'video_url': None
-                    }
-                    
-                    if player_url:
-                        print(f"             {idx}. {ep_title}: {player_url[:60]}...")
-                    else:
-                        print(f"             {idx}. {ep_title}: ⚠ sem player_url")
-                    
-                    all_episodes.append(episode_data)
-                    
-                except Exception as e:
-                    print(f"             ✗ Erro ao processar episódio {idx}: {e}")
-                    continue
+            if response.status_code != 200:
+                logger.warning("⚠ %s: status %s", season_name, response.status_code)
+                return None
             
-            print(f"       ✓ Total de episódios extraídos: {len(all_episodes)}")
-            return all_episodes
+            return await self._parse(
+                self._parse_season_response,
+                response.content, response.headers.get('Content-Type', ''), season_name, season_id
+            )
             
         except Exception as e:
-            print(f"       ✗ Erro ao extrair episódios: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
+            logger.warning("✗ Erro ao buscar %s: %s", season_name, e)
+            return None
     
-    def get_video_mp4_url(self, player_url):
-        """Extrai a URL do vídeo .mp4 do player"""
-        self.keep_alive()
+    async def get_video_mp4_url(self, player_url):
+        """Extrai a URL do vídeo .mp4 do player (com cache por player_url)"""
+        cache_key = ('mp4', player_url)
+        video_url = await self._storage(self.cache.get, cache_key)
+        if video_url:
+            logger.debug("⚡ Vídeo em cache: %s...", player_url[:60])
+            return video_url
         
+        return (
+            await self.inflight.do(cache_key, self._resolve_video_mp4_url, player_url)
+            or self._stale(cache_key, player_url, TOKEN_EXPIRY_MARGIN)
+        )
+    
+    async def _resolve_video_mp4_url(self, player_url):
+        video_url = await self._extract_video_mp4_url(player_url)
+        if video_url:
+            await self._storage(self._remember, 'mp4', player_url, video_url)
+        return video_url
+    
+    async def _extract_video_mp4_url(self, player_url):
+        await self.keep_alive()
         try:
-            print(f"       🔍 Acessando player: {player_url[:60]}...")
-            response = self.session.get(player_url)
+            logger.debug("🔍 Acessando player: %s...", player_url[:60])
+            response = await self._get(player_url)
             self.last_activity = time.time()
-            html = response.text
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # MÉTODO 1: Procura tag <video> com src
-            video_tags = soup.find_all('video')
-            print(f"       📊 Encontradas {len(video_tags)} tags <video>")
-            
-            for idx, video_tag in enumerate(video_tags):
-                src = video_tag.get('src')
-                if src and '.mp4' in src:
-                    print(f"       ✓ URL encontrada em <video> tag #{idx+1}")
-                    return src
-                
-                # Procura <source> dentro de <video>
-                source_tags = video_tag.find_all('source')
-                for source_tag in source_tags:
-                    src = source_tag.get('src')
-                    if src:
-                        print(f"       ✓ URL encontrada em <source> dentro de <video> #{idx+1}")
-                        return src
-            
-            # MÉTODO 2: Regex mais específico para URLs .mp4 com o padrão do site
-            # Padrão: https://server-amz.playmycnvs.com/...mp4?cnvs_token=...
-            mp4_patterns = [
-                r'https?://server[^"\s]*?\.mp4[^"\s]*',                    # server...mp4
-                r'https?://[^"\s]*playmycnvs[^"\s]*?\.mp4[^"\s]*',         # playmycnvs...mp4
-                r'src["\s]*[:=]["\s]*([^"\s]+\.mp4[^"\s]*)',               # src="...mp4"
-                r'"file"["\s]*:["\s]*"([^"]+\.mp4[^"]*)"',                 # "file":"...mp4"
-                r'"src"["\s]*:["\s]*"([^"]+\.mp4[^"]*)"',                  # "src":"...mp4"
-                r'https?://[^"\s<>]+\.mp4[^\s<>"\']*',                     # qualquer URL .mp4
-            ]
-            
-            for idx, pattern in enumerate(mp4_patterns):
-                matches = re.findall(pattern, html, re.IGNORECASE)
-                if matches:
-                    # Pega a primeira URL encontrada
-                    video_url = matches[0]
-                    
-                    # Se for um grupo de captura, usa o grupo
-                    if isinstance(video_url, tuple):
-                        video_url = video_url[0]
-                    
-                    # Remove aspas e espaços
-                    video_url = video_url.strip('"\'\\').strip()
-                    
-                    # Verifica se é uma URL válida
-                    if video_url.startswith('http') and '.mp4' in video_url:
-                        print(f"       ✓ URL encontrada com pattern #{idx+1}: {video_url[:80]}...")
-                        return video_url
-            
-            # MÉTODO 3: Procura por divs com classe específica do player (jw-media, jw-video, etc)
-            player_divs = soup.find_all(['div', 'video'], class_=re.compile(r'jw-|player|video', re.I))
-            print(f"       📊 Encontrados {len(player_divs)} elementos de player")
-            
-            for div in player_divs:
-                # Procura por data-src ou outros atributos
-                for attr in ['data-src', 'data-url', 'data-file', 'src']:
-                    url = div.get(attr)
-                    if url and '.mp4' in url:
-                        print(f"       ✓ URL encontrada em {attr} de elemento player")
-                        return url
-            
-            # MÉTODO 4: Busca agressiva no HTML por qualquer string que pareça uma URL de vídeo
-            print(f"       🔍 Fazendo busca agressiva no HTML...")
-            all_urls = re.findall(r'https?://[^\s<>"\']+', html)
-            
-            for url in all_urls:
-                url = url.strip('"\'\\,;')
-                if '.mp4' in url and ('server' in url.lower() or 'play' in url.lower() or 'cnvs' in url.lower()):
-                    print(f"       ✓ URL encontrada em busca agressiva")
-                    return url
-            
-            print(f"       ✗ Nenhuma URL de vídeo encontrada")
-            print(f"       📝 Tamanho do HTML: {len(html)} caracteres")
-            
-            # Debug: salva o HTML para análise
-            if len(html) < 10000:  # Só para HTMLs pequenos
-                print(f"       📝 HTML snippet: {html[:500]}...")
-            
-            return None
-            
+            return await self._parse(self._parse_video_mp4_url, response.content, response.text)
         except Exception as e:
-            print(f"       ✗ Erro ao extrair vídeo MP4: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("✗ Erro ao extrair vídeo MP4: %s", e)
             return None
 
 
+class _EventLoopThread:
+    """Event loop rodando em uma thread daemon, compartilhado pelos BlockingScraper"""
+    
+    _instance = None
+    _instance_lock = threading.Lock()
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='cnvs-asyncio', daemon=True)
+        self._thread.start()
+    
+    @classmethod
+    def get(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+    
+    def run(self, coro):
+        """Executa a corrotina no loop e bloqueia até o resultado"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+
+class BlockingScraper:
+    """
+    Fachada síncrona do AsyncCNVSWebScraper (mesma interface do CNVSWebScraper)
+    
+    As corrotinas rodam em um event loop compartilhado em background, então
+    várias threads (ex: workers do Flask/gunicorn) usam o mesmo loop e o
+    mesmo pool de conexões. Async generators (inclusive o 'items' dos
+    iter_*) viram geradores comuns.
+    """
+    
+    single_flight_class = AsyncSingleFlight
+    
+    def __init__(self, token, **kwargs):
+        self._runner = _EventLoopThread.get()
+        self.scraper = AsyncCNVSWebScraper(token, **kwargs)
+    
+    def __getattr__(self, name):
+        attr = getattr(self.scraper, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+        
+        def call(*args, **kwargs):
+            result = self._runner.run(attr(*args, **kwargs))
+            if inspect.isasyncgen(result):
+                return self._iterate(result)
+            if isinstance(result, dict) and inspect.isasyncgen(result.get('items')):
+                return dict(result, items=self._iterate(result['items']))
+            return result
+        
+        call.__name__ = name
+        call.__doc__ = attr.__doc__
+        return call
+    
+    def _iterate(self, agen):
+        try:
+            while True:
+                try:
+                    yield self._runner.run(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._runner.run(agen.aclose())
+    
+    def close(self):
+        self._runner.run(self.scraper.aclose())
+
+
+class ScraperPool:
+    """
+    Pool de scrapers, um por token (conta), com seleção do menos ocupado
+    
+    Cada scraper tem sua própria Session, login e limite de requisições;
+    o cache de URLs é compartilhado. Sessões cujo login() ou keep_alive()
+    falha saem da rotação e são relogadas em segundo plano pelo keep_alive()
+    do pool.
+    """
+    
+    def __init__(self, tokens, cache=None, scraper_factory=CNVSWebScraper, **scraper_kwargs):
+        """
+        Args:
+            tokens: Lista de tokens de acesso (tokens repetidos são ignorados)
+            cache: URLCache compartilhado (None = cria um próprio)
+            scraper_factory: Classe de cada scraper (CNVSWebScraper ou BlockingScraper)
+            scraper_kwargs: Repassados a cada scraper
+        """
+        tokens = list(dict.fromkeys(t.strip() for t in tokens if t and t.strip()))
+        if not tokens:
+            raise ValueError("ScraperPool precisa de pelo menos um token")
+        
+        self.cache = cache if cache is not None else URLCache()
+        # Resoluções de player/vídeo em andamento são compartilhadas entre as sessões
+        self.single_flight = scraper_kwargs.pop('single_flight', None) or scraper_factory.single_flight_class()
+        # O site é o mesmo para todas as contas: um circuito aberto vale para o pool inteiro
+        self.circuit_breaker = scraper_kwargs.pop('circuit_breaker', None) or CircuitBreaker()
+        self.scrapers = [
+            scraper_factory(
+                token, cache=self.cache, single_flight=self.single_flight, circuit_breaker=self.circuit_breaker,
+                **scraper_kwargs
+            )
+            for token in tokens
+        ]
+        self._lock = threading.Lock()
+        self._in_flight = {id(s): 0 for s in self.scrapers}
+        self._healthy = set()
+    
+    @property
+    def ready(self):
+        """True se há ao menos uma sessão em rotação"""
+        return bool(self._healthy)
+    
+    def _set_health(self, scraper, healthy):
+        with self._lock:
+            if healthy:
+                self._healthy.add(id(scraper))
+            else:
+                self._healthy.discard(id(scraper))
+    
+    def _login(self, scraper):
+        ok = scraper.login()
+        SESSION_EVENTS.inc(event='login' if ok else 'login_failed')
+        self._set_health(scraper, ok)
+        return ok
+    
+    def login_all(self, scrapers=None):
+        """
+        Faz login de todas as contas em paralelo
+        
+        Returns:
+            Número de sessões em rotação
+        """
+        scrapers = self.scrapers if scrapers is None else scrapers
+        if scrapers:
+            with ThreadPoolExecutor(max_workers=len(scrapers)) as executor:
+                list(executor.map(self._login, scrapers))
+        return len(self._healthy)
+    
+    def keep_alive(self):
+        """
+        Mantém as sessões ativas, tira da rotação as que caíram e tenta
+        relogar as que estão fora
+        """
+        for scraper in self.scrapers:
+            if id(scraper) in self._healthy and not scraper.keep_alive():
+                logger.warning("⚠ Sessão do token %s fora da rotação", _mask_token(scraper.token))
+                self._set_health(scraper, False)
+        
+        unhealthy = [s for s in self.scrapers if id(s) not in self._healthy]
+        if unhealthy:
+            self.login_all(unhealthy)
+    
+    def export_sessions(self):
+        """Sessões de todas as contas ({token: estado}), para publicar a outros processos"""
+        return {scraper.token: scraper.export_session() for scraper in self.scrapers}
+    
+    def import_sessions(self, states, last_activity=None):
+        """
+        Adota as sessões publicadas por outro processo (export_sessions)
+        
+        Returns:
+            Número de sessões em rotação
+        """
+        for scraper in self.scrapers:
+            state = states.get(scraper.token)
+            if state is not None:
+                scraper.import_session(state, state.get('last_activity', last_activity))
+                self._set_health(scraper, scraper.logged_in)
+        return len(self._healthy)
+    
+    def save_sessions(self, path):
+        """Grava os cookies das sessões em disco (JSON legível só pelo dono, troca atômica)"""
+        sessions = {
+            scraper.token: dict(scraper.export_session(), last_activity=scraper.last_activity)
+            for scraper in self.scrapers
+        }
+        data = {'saved_at': time.time(), 'sessions': sessions}
+        tmp_path = f'{path}.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    
+    def load_sessions(self, path):
+        """
+        Adota as sessões gravadas por save_sessions() em uma execução anterior
+        
+        As usadas pela última vez há mais de 3 minutos são conferidas no
+        próximo keep_alive() (e relogadas se tiverem caído).
+        
+        Returns:
+            Número de sessões em rotação (0 se o arquivo não existe ou é inválido)
+        """
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            return self.import_sessions(data['sessions'], last_activity=data['saved_at'])
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("⚠ Sessões salvas ignoradas (%s): %s", path, e)
+            return 0
+    
+    def acquire(self):
+        """Reserva o scraper saudável com menos requisições em andamento"""
+        with self._lock:
+            candidates = [s for s in self.scrapers if id(s) in self._healthy]
+            if not candidates:
+                raise RuntimeError("Nenhuma sessão disponível no pool")
+            scraper = min(candidates, key=lambda s: self._in_flight[id(s)])
+            self._in_flight[id(scraper)] += 1
+            return scraper
+    
+    def release(self, scraper):
+        with self._lock:
+            self._in_flight[id(scraper)] -= 1
+    
+    @contextmanager
+    def lease(self):
+        """
+        Uso:
+            with pool.lease() as scraper:
+                scraper.search_movies(...)
+        """
+        scraper = self.acquire()
+        try:
+            yield scraper
+        finally:
+            self.release(scraper)
+    
+    def stream_leased(self, fn):
+        """
+        Reserva um scraper e chama `fn(scraper)` (um iter_*) na hora
+        
+        Erros até a listagem (pool vazio, CircuitOpenError, ...) saem daqui,
+        antes de a resposta começar; o scraper fica reservado enquanto o
+        'items' retornado produz itens e é liberado quando ele termina ou é
+        fechado (close() pode ser chamado mesmo sem ter iterado).
+        
+        Returns:
+            O dicionário de `fn`, com 'items' trocado por um LeasedIterator
+        """
+        scraper = self.acquire()
+        try:
+            page = fn(scraper)
+        except BaseException:
+            self.release(scraper)
+            raise
+        return dict(page, items=LeasedIterator(self, scraper, page['items']))
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self.scrapers),
+                'healthy': len(self._healthy),
+                'in_flight': sum(self._in_flight.values())
+            }
+
+
+class LeasedIterator:
+    """Itera `items` e devolve o scraper ao pool no fim ou no close() (uma vez só)"""
+    
+    def __init__(self, pool, scraper, items):
+        self._pool = pool
+        self._scraper = scraper
+        self._items = iter(items)
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        try:
+            return next(self._items)
+        except BaseException:
+            self.close()
+            raise
+    
+    def close(self):
+        scraper, self._scraper = self._scraper, None
+        if scraper is None:
+            return
+        try:
+            if hasattr(self._items, 'close'):
+                self._items.close()
+        finally:
+            self._pool.release(scraper)
+
+
+class Crawler:
+    """
+    Rastreador em segundo plano que pré-aquece o catálogo e o cache de URLs
+    
+    Percorre todas as seções da página principal, resolve player/vídeo dos
+    filmes (e os primeiros episódios das séries) e renova cada URL pouco
+    antes de o token expirar, para que os requests ao vivo encontrem tudo em
+    cache.
+    
+    A fila é por popularidade: cada título soma 1/(1 + posição) em cada
+    seção da home em que aparece. As requisições passam por um RequestBudget
+    global e o crawler pausa enquanto houver requisições ao vivo em
+    andamento no pool, para nunca disputar sessões com o tráfego real.
+    """
+    
+    def __init__(self, pool, budget=0.5, burst=5, refresh_margin=120, max_episodes=3,
+                 home_interval=1800, max_live=1, retry_backoff=60, max_retry_backoff=3600):
+        """
+        Args:
+            pool: ScraperPool (compartilhado com o tráfego ao vivo)
+            budget: Requisições por segundo do crawler
+            burst: Requisições que podem ser acumuladas no orçamento
+            refresh_margin: Renova cada URL esse tanto de segundos antes de expirar
+            max_episodes: Episódios por série com vídeo pré-resolvido
+            home_interval: Intervalo entre visitas à página principal (segundos)
+            max_live: Pausa enquanto o pool tiver essa quantidade de requisições em andamento
+            retry_backoff: Espera antes de tentar de novo uma tarefa que falhou (dobra a cada falha seguida)
+            max_retry_backoff: Limite dessa espera (segundos)
+        """
+        self.pool = pool
+        self.cache = pool.cache
+        self.budget = RequestBudget(budget, burst)
+        self.refresh_margin = refresh_margin
+        self.max_episodes = max_episodes
+        self.home_interval = home_interval
+        self.max_live = max_live
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.counters = {'home': 0, 'series': 0, 'resolved': 0, 'refreshed': 0, 'cached': 0, 'errors': 0, 'paused': 0}
+        self._lock = threading.Lock()
+        self._ready = []        # heap (prioridade, seq, tipo, url)
+        self._scheduled = []    # heap (horário, seq, prioridade, tipo, url)
+        self._pending = set()   # (tipo, url) na fila ou agendados
+        self._failures = {}     # (tipo, url) -> falhas seguidas
+        self._seq = itertools.count()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Roda o crawler em uma thread daemon"""
+        self._thread = threading.Thread(target=self.run, name='crawler', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def run(self):
+        """Laço principal (bloqueia até stop())"""
+        self._push(float('-inf'), 'home', self.pool.scrapers[0].base_url)
+        while True:
+            task = self._next()
+            if task is None:
+                return
+            
+            priority, kind, url = task
+            try:
+                self._handle(priority, kind, url)
+            except Exception as e:
+                logger.warning("⚠ Crawler: erro em %s %s: %s", kind, url, e)
+                self._retry(priority, kind, url)
+    
+    def _retry(self, priority, kind, url):
+        """Reagenda uma tarefa que falhou, esperando mais a cada falha seguida (até max_retry_backoff)"""
+        self.counters['errors'] += 1
+        failures = self._failures.get((kind, url), 0) + 1
+        self._failures[(kind, url)] = failures
+        delay = min(self.max_retry_backoff, self.retry_backoff * 2 ** (failures - 1))
+        self._push(priority, kind, url, due=time.time() + delay)
+    
+    def _push(self, priority, kind, url, due=None):
+        """Enfileira (ou agenda para `due`) uma tarefa; tarefas repetidas são ignoradas"""
+        with self._lock:
+            if (kind, url) in self._pending:
+                return
+            self._pending.add((kind, url))
+            if due is not None and due > time.time():
+                heapq.heappush(self._scheduled, (due, next(self._seq), priority, kind, url))
+            else:
+                heapq.heappush(self._ready, (priority, next(self._seq), kind, url))
+    
+    def _next(self):
+        """Próxima tarefa (a mais popular entre as vencidas), ou None após stop()"""
+        while not self._stop.is_set():
+            with self._lock:
+                now = time.time()
+                while self._scheduled and self._scheduled[0][0] <= now:
+                    _, seq, priority, kind, url = heapq.heappop(self._scheduled)
+                    heapq.heappush(self._ready, (priority, seq, kind, url))
+                
+                if self._ready:
+                    priority, _, kind, url = heapq.heappop(self._ready)
+                    self._pending.discard((kind, url))
+                    return priority, kind, url
+                
+                wait = self._scheduled[0][0] - now if self._scheduled else 1.0
+            self._stop.wait(min(wait, 1.0))
+        return None
+    
+    def _spend(self, cost=1):
+        """Espera o pool ficar ocioso e o orçamento permitir `cost` requisições"""
+        paused = False
+        while not self._stop.is_set():
+            if self.pool.ready and self.pool.stats()['in_flight'] < self.max_live:
+                return self.budget.acquire(cost, self._stop)
+            if not paused:
+                self.counters['paused'] += 1
+                paused = True
+            self._stop.wait(0.5)
+        return False
+    
+    def _fresh(self, kind, url):
+        """True se a URL está em cache e ainda longe de expirar"""
+        expires_at = self.cache.expires_at((kind, url))
+        return expires_at is not None and expires_at - time.time() > self.refresh_margin
+    
+    def _handle(self, priority, kind, url):
+        if kind == 'home':
+            if not self._spend():
+                return
+            with self.pool.lease() as scraper:
+                sections = scraper.get_home_sections()
+            self._failures.pop((kind, url), None)
+            self.counters['home'] += 1
+            self._enqueue_titles(url, sections)
+            self._push(priority, kind, url, due=time.time() + self.home_interval)
+        
+        elif kind == 'series':
+            if not self._spend():
+                return
+            with self.pool.lease() as scraper:
+                episodes = scraper.get_series_episodes(url)
+            # Uma requisição já foi reservada; as demais temporadas são descontadas depois
+            self.budget.charge(max(0, len({ep.get('season_id') for ep in episodes}) - 1))
+            if not episodes:
+                # Erros do site viram lista vazia em get_series_episodes
+                self._retry(priority, kind, url)
+                return
+            self._failures.pop((kind, url), None)
+            self.counters['series'] += 1
+            for ep in episodes[:self.max_episodes]:
+                if ep.get('player_url'):
+                    self._push(priority, 'mp4', ep['player_url'])
+        
+        else:
+            # 'player' (watch_link -> player_url) ou 'mp4' (player_url -> vídeo)
+            if self._fresh(kind, url):
+                value = self.cache.get((kind, url))
+                self.counters['cached'] += 1
+            else:
+                refreshing = self.cache.expires_at((kind, url)) is not None
+                if not self._spend():
+                    return
+                with self.pool.lease() as scraper:
+                    value = scraper.refresh_url(kind, url)
+                if not value:
+                    # Falhou (o erro vira None): a entrada antiga, se houver, continua no cache
+                    self._retry(priority, kind, url)
+                    return
+                self._failures.pop((kind, url), None)
+                self.counters['refreshed' if refreshing else 'resolved'] += 1
+            
+            expires_at = self.cache.expires_at((kind, url))
+            if expires_at:
+                self._push(priority, kind, url, due=expires_at - self.refresh_margin)
+            if kind == 'player' and value:
+                self._push(priority, 'mp4', value)
+    
+    def _enqueue_titles(self, base_url, sections):
+        """Enfileira os títulos da home por popularidade (soma de 1/(1 + posição) entre as seções)"""
+        scores = {}
+        for _, movies in sections:
+            for position, movie in enumerate(movies):
+                if movie['watch_link']:
+                    entry = scores.setdefault(urljoin(base_url, movie['watch_link']), [0.0, movie['is_series']])
+                    entry[0] += 1.0 / (1 + position)
+        
+        for url, (score, is_series) in scores.items():
+            self._push(-score, 'series' if is_series else 'player', url)
+    
+    def stats(self):
+        with self._lock:
+            next_due = self._scheduled[0][0] - time.time() if self._scheduled else None
+            queue = {'ready': len(self._ready), 'scheduled': len(self._scheduled)}
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            **queue,
+            'next_refresh_in': round(next_due, 1) if next_due is not None else None,
+            **self.counters,
+            'budget': self.budget.stats()
+        }
+
+
 def main():
     """Função de teste"""
+    from cnvsweb_logging import configure_logging
+    configure_logging()
     TOKEN = "2E9RCU0B"
     
     print("\n" + "="*70)
@@ -1049,5 +3475,59 @@ def main():
     print(f"\n✓ Resultados salvos em cnvsweb_results.json")
 
 
+def crawl_main(argv=None):
+    """
+    Crawler como processo próprio: aquece o catálogo SQLite que a API
+    recarrega ao iniciar (CATALOG_PATH)
+    
+    Uso:
+        python cnvsweb_scraper.py crawl --tokens T1,T2 [--budget 0.5] [--duration 3600]
+    """
+    import argparse
+    from cnvsweb_catalog import Catalog
+    from cnvsweb_logging import configure_logging
+    
+    parser = argparse.ArgumentParser(prog='cnvsweb_scraper.py crawl', description='Crawler do catálogo/cache de URLs')
+    parser.add_argument('--tokens', default=os.environ.get('TOKENS') or os.environ.get('TOKEN', ''),
+                        help='Tokens separados por vírgula (padrão: $TOKENS ou $TOKEN)')
+    parser.add_argument('--catalog', default=os.environ.get('CATALOG_PATH', 'cnvsweb_catalog.db'),
+                        help='Arquivo do catálogo SQLite')
+    parser.add_argument('--budget', type=float, default=0.5, help='Requisições por segundo')
+    parser.add_argument('--burst', type=int, default=5, help='Requisições acumuláveis no orçamento')
+    parser.add_argument('--max-episodes', type=int, default=3, help='Episódios por série com vídeo pré-resolvido')
+    parser.add_argument('--refresh-margin', type=int, default=120, help='Renovar URLs esse tanto de segundos antes de expirarem')
+    parser.add_argument('--home-interval', type=int, default=1800, help='Intervalo entre visitas à página principal (segundos)')
+    parser.add_argument('--duration', type=int, default=0, help='Encerra após N segundos (0 = até Ctrl+C)')
+    parser.add_argument('--base-url', default='https://cnvsweb.stream', help='Origem do site')
+    args = parser.parse_args(argv)
+    configure_logging()
+    
+    catalog = Catalog(args.catalog)
+    pool = ScraperPool(args.tokens.split(','), catalog=catalog, base_url=args.base_url)
+    warmed = catalog.warm(pool.cache, args.base_url, SEASON_CACHE_TTL)
+    logger.info("📚 Catálogo: %s títulos | %s URLs ainda válidas", catalog.stats()['titles'], warmed['urls'])
+    
+    if not pool.login_all():
+        logger.error("✗ Nenhuma sessão ativa")
+        return 1
+    
+    crawler = Crawler(pool, budget=args.budget, burst=args.burst, refresh_margin=args.refresh_margin,
+                      max_episodes=args.max_episodes, home_interval=args.home_interval).start()
+    started = time.time()
+    try:
+        while not args.duration or time.time() - started < args.duration:
+            time.sleep(min(60, args.duration - (time.time() - started)) if args.duration else 60)
+            pool.keep_alive()
+            logger.info("🕷 Crawler: %s", json.dumps(crawler.stats(), ensure_ascii=False))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        crawler.stop(timeout=5)
+        catalog.close()
+    return 0
+
+
 if __name__ == "__main__":
+    if sys.argv[1:2] == ['crawl']:
+        raise SystemExit(crawl_main(sys.argv[2:]))
     main()
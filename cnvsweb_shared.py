@@ -0,0 +1,183 @@
+"""
+Estado compartilhado entre os workers do gunicorn (mesma máquina)
+
+SharedStore é um arquivo SQLite em modo WAL (vários processos leem e
+escrevem ao mesmo tempo) com:
+  - entradas do URLCache (player/vídeo/temporadas), com expiração;
+  - os cookies das sessões logadas, publicados pelo líder;
+  - blobs JSON nomeados (ex.: o snapshot do "Mais Visto do Dia").
+
+LeaderLock elege um único worker (flock exclusivo em um arquivo) para
+login, keep-alive, snapshot e crawler; se o líder morrer, o sistema
+operacional libera o lock e outro worker assume.
+"""
+import fcntl
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from cnvsweb_records import to_json
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def _open_private(path):
+    """
+    Abre (criando, se preciso) um arquivo só do dono: modo 0600, sem seguir
+    symlink e recusando arquivo de outro usuário (caminhos previsíveis em
+    diretórios compartilhados); um arquivo antigo com permissões abertas é
+    fechado para 0600. Retorna o file descriptor.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+    try:
+        st = os.fstat(fd)
+        if st.st_uid != os.getuid():
+            raise PermissionError(f"{path} pertence a outro usuário")
+        if st.st_mode & 0o077:
+            os.fchmod(fd, 0o600)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def _encode_key(key):
+    # Chaves do URLCache são tuplas de strings: ('mp4', player_url), ('season', link, id)
+    return json.dumps(list(key) if isinstance(key, tuple) else key, separators=(',', ':'), ensure_ascii=False)
+
+
+class SharedStore:
+    """
+    Armazenamento SQLite compartilhado entre processos
+
+    Implementa a interface de store do URLCache (load/save) e guarda blobs
+    JSON versionados por updated_at (sessões, snapshot).
+    """
+
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = path
+        self._lock = threading.Lock()
+        # Guarda cookies de sessão e a chave dos handles: arquivo só do dono
+        # (o SQLite cria o -wal/-shm com as permissões do banco)
+        os.close(_open_private(path))
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.close(_open_private(path + suffix))
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def load(self, key):
+        """(valor, expires_at) de uma entrada ainda válida do cache, ou None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM cache WHERE key = ? AND expires_at > ?', (_encode_key(key), time.time())
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def save(self, key, value, expires_at):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache VALUES (?, ?, ?)',
+                (_encode_key(key), json.dumps(value, ensure_ascii=False, default=to_json), expires_at)
+            )
+
+    def purge(self):
+        """Remove as entradas expiradas do cache; retorna quantas"""
+        with self._lock:
+            return self._conn.execute('DELETE FROM cache WHERE expires_at <= ?', (time.time(),)).rowcount
+
+    def put_blob(self, name, value):
+        """Publica um valor JSON; retorna o updated_at gravado"""
+        updated_at = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO blobs VALUES (?, ?, ?)', (name, json.dumps(value, ensure_ascii=False), updated_at)
+            )
+        return updated_at
+
+    def setdefault_blob(self, name, value):
+        """Grava o blob só se ele ainda não existe; retorna o valor que ficou (o primeiro processo ganha)"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO blobs VALUES (?, ?, ?)', (name, json.dumps(value, ensure_ascii=False), time.time())
+            )
+            row = self._conn.execute('SELECT value FROM blobs WHERE name = ?', (name,)).fetchone()
+        return json.loads(row[0])
+
+    def get_blob(self, name, newer_than=0):
+        """(valor, updated_at) se o blob existe e é mais novo que `newer_than`, senão None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, updated_at FROM blobs WHERE name = ? AND updated_at > ?', (name, newer_than)
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM cache WHERE expires_at > ?', (time.time(),)).fetchone()[0]
+            blobs = dict(self._conn.execute('SELECT name, updated_at FROM blobs').fetchall())
+        return {'path': self.path, 'cache_entries': entries, 'blobs': {k: round(time.time() - v, 1) for k, v in blobs.items()}}
+
+
+class LeaderLock:
+    """
+    Eleição de líder entre processos por flock (não bloqueante)
+
+    O lock é do processo: fica com o líder até ele terminar (ou chamar
+    release()), e os demais tentam de novo periodicamente com acquire().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    @property
+    def held(self):
+        return self._fd is not None
+
+    def acquire(self):
+        """Tenta virar líder; True se este processo detém o lock"""
+        if self._fd is not None:
+            return True
+
+        fd = _open_private(self.path)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode('ascii'))
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
@@ -3,6 +3,7 @@
 Script de DEBUG - Salva HTML da página para análise
 """
 import sys
+from cnvsweb_logging import configure_logging
 from cnvsweb_scraper import CNVSWebScraper
 
 def debug_page_structure():
@@ -15,6 +16,8 @@ def debug_page_structure():
     print("DEBUG: Análise de Estrutura da Página")
     print("="*80 + "\n")
     
+    # Mostra os diagnósticos do scraper (botões, IDs, iframes)
+    configure_logging('DEBUG')
     scraper = CNVSWebScraper(TOKEN)
     
     # Login
@@ -1,67 +1,643 @@
-from flask import Flask, jsonify, request
-from cnvsweb_scraper import CNVSWebScraper
+from flask import Flask, Response, g, jsonify, request, stream_with_context
+from cnvsweb_scraper import (
+    CARD_FIELDS, SEASON_CACHE_TTL, BlockingScraper, CircuitBreaker, CircuitOpenError, CNVSWebScraper, Crawler,
+    ScraperPool, SingleFlight, URLCache, needs_enrichment, organize_items, page_slice, project_item, project_items
+)
+from cnvsweb_catalog import Catalog
+from cnvsweb_json import FastJSONProvider
+from cnvsweb_logging import configure_logging
+from cnvsweb_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, Gauge, Histogram
+from cnvsweb_shared import LeaderLock, SharedStore
+from datetime import datetime, timezone
+from urllib.parse import urljoin
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import math
 import threading
 import time
 import os
 
 app = Flask(__name__)
 
+# JSON das respostas: orjson quando instalado; JSON_ENSURE_ASCII=true volta a
+# escapar os acentos (\u00e7...) e usa o json da stdlib
+app.json = FastJSONProvider(app)
+app.json.ensure_ascii = os.environ.get('JSON_ENSURE_ASCII', 'false').lower() == 'true'
+
+# Logs em fila (LOG_LEVEL/LOG_FORMAT): os requests não esperam pelo stdout
+configure_logging()
+logger = logging.getLogger(__name__)
+
 # Token de acesso (pode vir de variável de ambiente)
 TOKEN = os.environ.get('TOKEN', 'LTN8DREM')
 
-# Inicializa o scraper globalmente
-scraper = None
-scraper_ready = False
+# Vários tokens (contas) separados por vírgula: um scraper/sessão por token
+TOKENS = [t.strip() for t in os.environ.get('TOKENS', '').split(',') if t.strip()] or [TOKEN]
+
+# Paralelismo do enriquecimento e limite de requisições por host
+SCRAPER_WORKERS = int(os.environ.get('SCRAPER_WORKERS', 4))
+SCRAPER_RATE_LIMIT = float(os.environ.get('SCRAPER_RATE_LIMIT', 5.0))
+
+# Conexões HTTP do scraper: pool keep-alive por host (vazio = automático),
+# novas tentativas com backoff em GET e timeouts de conexão/leitura (segundos)
+SCRAPER_POOL_SIZE = int(os.environ['SCRAPER_POOL_SIZE']) if os.environ.get('SCRAPER_POOL_SIZE') else None
+SCRAPER_MAX_RETRIES = int(os.environ.get('SCRAPER_MAX_RETRIES', 3))
+SCRAPER_RETRY_BACKOFF = float(os.environ.get('SCRAPER_RETRY_BACKOFF', 0.5))
+SCRAPER_CONNECT_TIMEOUT = float(os.environ.get('SCRAPER_CONNECT_TIMEOUT', 5))
+SCRAPER_READ_TIMEOUT = float(os.environ.get('SCRAPER_READ_TIMEOUT', 20))
+
+# Circuit breaker do site: falhas seguidas (429/5xx, conexão/timeout) que
+# abrem o circuito e segundos até a próxima tentativa (dobra a cada teste que
+# falha). Com o circuito aberto as rotas respondem com snapshot/catálogo/cache
+CIRCUIT_FAILURES = int(os.environ.get('CIRCUIT_FAILURES', 5))
+CIRCUIT_RESET = float(os.environ.get('CIRCUIT_RESET', 30))
+
+# Motor de I/O: sync (requests + threads) ou async (httpx + asyncio, um event
+# loop compartilhado); SCRAPER_MAX_CONCURRENCY limita as requisições simultâneas
+# de cada sessão no motor async
+SCRAPER_ENGINE = os.environ.get('SCRAPER_ENGINE', 'sync').lower()
+SCRAPER_MAX_CONCURRENCY = int(os.environ.get('SCRAPER_MAX_CONCURRENCY', 64))
+
+# Vários workers (gunicorn --workers N): arquivo SQLite compartilhado pelos
+# processos (URLs resolvidas, sessões e snapshot) + lock de eleição do líder,
+# o único que faz login, keep-alive, snapshot e crawler; os demais adotam o
+# que ele publica a cada SHARED_SYNC_INTERVAL segundos. Vazio = um processo só
+SHARED_STATE_PATH = os.environ.get('SHARED_STATE_PATH', '')
+SHARED_SYNC_INTERVAL = float(os.environ.get('SHARED_SYNC_INTERVAL', 5))
+# Quanto um request sem snapshot espera o do background (ou o publicado pelo líder) antes de responder 503
+SNAPSHOT_WAIT = float(os.environ.get('SNAPSHOT_WAIT', 2))
+shared_store = SharedStore(SHARED_STATE_PATH) if SHARED_STATE_PATH else None
+leader_lock = LeaderLock(f'{SHARED_STATE_PATH}.leader') if SHARED_STATE_PATH else None
+
+# Cache de URLs de player/vídeo (TTL padrão usado quando o token não informa a expiração)
+url_cache = URLCache(
+    max_entries=int(os.environ.get('CACHE_MAX_ENTRIES', 2048)),
+    max_bytes=int(float(os.environ.get('CACHE_MAX_MB', 8)) * 1024 * 1024),
+    default_ttl=int(os.environ.get('CACHE_TTL', 600)),
+    store=shared_store,
+    # Quanto tempo uma URL expirada ainda pode ser servida com o site fora
+    stale_ttl=int(os.environ.get('CACHE_STALE_TTL', 3600))
+)
+
+# Catálogo local (SQLite) de títulos/episódios/URLs; vazio desativa
+CATALOG_PATH = os.environ.get('CATALOG_PATH', 'cnvsweb_catalog.db')
+catalog = Catalog(CATALOG_PATH) if CATALOG_PATH else None
+
+# Snapshot do "Mais Visto do Dia": intervalo de atualização (segundos) e
+# máximo de episódios por série guardados no snapshot
+MOST_WATCHED_REFRESH = int(os.environ.get('MOST_WATCHED_REFRESH', 1800))
+SNAPSHOT_MAX_EPISODES = int(os.environ.get('SNAPSHOT_MAX_EPISODES', 5))
+# Máximo de corpos serializados guardados por snapshot (combinações de página/max_episodes/organize/fields)
+SNAPSHOT_BODY_CACHE = int(os.environ.get('SNAPSHOT_BODY_CACHE', 64))
+
+# Crawler em background (pré-aquece catálogo e URLs de vídeo): requisições por
+# segundo (0 desativa), episódios por série e antecedência da renovação das URLs
+CRAWLER_BUDGET = float(os.environ.get('CRAWLER_BUDGET', 0.5))
+CRAWLER_MAX_EPISODES = int(os.environ.get('CRAWLER_MAX_EPISODES', 3))
+CRAWLER_REFRESH_MARGIN = int(os.environ.get('CRAWLER_REFRESH_MARGIN', 120))
+
+# Cookies das sessões salvos em disco pelo líder: um reinício reaproveita as
+# sessões ainda válidas em vez de logar de novo (vazio desativa)
+SESSION_STATE_PATH = os.environ.get('SESSION_STATE_PATH', 'cnvsweb_sessions.json')
+
+# Chave dos handles de /api/resolve (defina em produção para que os handles
+# continuem válidos após reinícios e entre workers). Sem ela, a chave aleatória
+# é gerada por quem chegar primeiro ao SharedStore e lida pelos demais workers
+RESOLVE_SECRET = os.environ.get('RESOLVE_SECRET') or os.urandom(32).hex()
+if shared_store is not None and not os.environ.get('RESOLVE_SECRET'):
+    RESOLVE_SECRET = shared_store.setdefault_blob('resolve_secret', RESOLVE_SECRET)
+RESOLVE_SECRET = RESOLVE_SECRET.encode('utf-8')
+
+# Formatos aceitos no parâmetro ?stream=
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream'
+}
+
+# Pool de scrapers (um por token), compartilhando o cache de URLs
+if SCRAPER_ENGINE == 'async':
+    scraper_engine = {'scraper_factory': BlockingScraper, 'max_concurrency': SCRAPER_MAX_CONCURRENCY}
+else:
+    scraper_engine = {'scraper_factory': CNVSWebScraper}
+
+scraper_pool = ScraperPool(
+    TOKENS,
+    cache=url_cache,
+    **scraper_engine,
+    max_workers=SCRAPER_WORKERS,
+    rate_limit=SCRAPER_RATE_LIMIT,
+    pool_size=SCRAPER_POOL_SIZE,
+    max_retries=SCRAPER_MAX_RETRIES,
+    retry_backoff=SCRAPER_RETRY_BACKOFF,
+    connect_timeout=SCRAPER_CONNECT_TIMEOUT,
+    read_timeout=SCRAPER_READ_TIMEOUT,
+    circuit_breaker=CircuitBreaker(CIRCUIT_FAILURES, CIRCUIT_RESET),
+    catalog=catalog
+)
+
+# Reaquece o cache com o que o catálogo já sabe (sem acessar o site)
+if catalog is not None:
+    warmed = catalog.warm(url_cache, scraper_pool.scrapers[0].base_url, SEASON_CACHE_TTL)
+    logger.info("📚 Catálogo: %s títulos | cache aquecido com %s URLs e %s temporadas",
+                catalog.stats()['titles'], warmed['urls'], warmed['seasons'])
+
+
+class MostWatchedSnapshot:
+    """
+    Snapshot em memória do "Mais Visto do Dia"
+    
+    O snapshot é reconstruído em background e trocado de forma atômica
+    (uma única atribuição de referência); os requests apenas leem `current`.
+    """
+    
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self.current = None
+        self._refresh_lock = threading.Lock()
+    
+    def is_stale(self):
+        snapshot = self.current
+        return snapshot is None or time.time() - snapshot['created_at'] >= self.max_age
+    
+    def refresh(self, scraper):
+        """Reconstrói o snapshot; mantém o anterior se a extração falhar"""
+        if not self._refresh_lock.acquire(blocking=False):
+            # Outra thread já está atualizando - aguarda o resultado dela
+            with self._refresh_lock:
+                return self.current is not None
+        
+        try:
+            logger.info("🔄 Atualizando snapshot do 'Mais Visto do Dia'...")
+            items = scraper.get_most_watched_today(
+                get_video_urls=True,
+                max_episodes_per_series=SNAPSHOT_MAX_EPISODES,
+                organize_output=False
+            )
+            
+            if not items:
+                logger.warning("⚠ Snapshot não atualizado (nenhum item extraído)")
+                return False
+            
+            created_at = time.time()
+            digest = hashlib.sha1(
+                json.dumps(items, sort_keys=True, ensure_ascii=False).encode('utf-8')
+            ).hexdigest()[:16]
+            
+            self.adopt({'items': items, 'created_at': created_at, 'etag': digest})
+            logger.info("✓ Snapshot atualizado: %s itens (etag %s)", len(items), digest)
+            return True
+        finally:
+            self._refresh_lock.release()
+    
+    def adopt(self, state):
+        """Troca o snapshot por um já extraído (state = items, created_at e etag)"""
+        self.current = {
+            'items': state['items'],
+            'created_at': state['created_at'],
+            'last_modified': datetime.fromtimestamp(int(state['created_at']), tz=timezone.utc),
+            'etag': state['etag'],
+            # Corpos já serializados deste snapshot, por (offset, limit, max_episodes, organize, fields)
+            'bodies': {}
+        }
+
+
+most_watched_snapshot = MostWatchedSnapshot(MOST_WATCHED_REFRESH)
+
+# Extrações idênticas em andamento (mesma rota/busca/episódios) rodam uma só vez
+request_flight = SingleFlight()
+
+
+def make_resolve_handle(kind, url):
+    """
+    Handle opaco para /api/resolve: payload em base64 + HMAC
+    
+    A assinatura garante que /api/resolve só acessa URLs que saíram de uma
+    resposta desta API.
+    """
+    payload = base64.urlsafe_b64encode(
+        json.dumps([kind, url], separators=(',', ':')).encode('utf-8')
+    ).rstrip(b'=')
+    signature = hmac.new(RESOLVE_SECRET, payload, hashlib.sha256).digest()[:16]
+    return f"{payload.decode('ascii')}.{base64.urlsafe_b64encode(signature).rstrip(b'=').decode('ascii')}"
+
+
+def read_resolve_handle(handle):
+    """Retorna (tipo, url) de um handle válido, ou None"""
+    try:
+        payload, signature = handle.encode('ascii').split(b'.')
+        expected = hmac.new(RESOLVE_SECRET, payload, hashlib.sha256).digest()[:16]
+        if not hmac.compare_digest(base64.urlsafe_b64encode(expected).rstrip(b'='), signature):
+            return None
+        kind, url = json.loads(base64.urlsafe_b64decode(payload + b'=' * (-len(payload) % 4)))
+    except (ValueError, UnicodeError, TypeError):
+        return None
+    if kind not in ('movie', 'series', 'episode') or not isinstance(url, str):
+        return None
+    return kind, url
+
+
+def lazy_item(item):
+    """Cópia do item com o handle de resolução (o item compartilhado não é alterado)"""
+    kind = 'series' if item['is_series'] else 'movie'
+    item = dict(item)
+    if item['watch_link']:
+        item['resolve'] = make_resolve_handle(kind, item['watch_link'])
+    return item
+
+
+def normalize_query(query):
+    """Chave da busca: sem diferença de maiúsculas/minúsculas e espaços extras"""
+    return ' '.join(query.split()).casefold()
+
+
+def coalesced_scrape(endpoint, query='', max_episodes=5, get_video_urls=True, offset=0, limit=None):
+    """
+    Extrai uma página de itens ({items, total}) uma única vez para chamadas
+    idênticas em andamento; só os itens da página são enriquecidos. Cada
+    chamador organiza/projeta a sua resposta sem alterar a página
+    compartilhada.
+    """
+    if not get_video_urls:
+        max_episodes = 0
+    key = (endpoint, normalize_query(query), max_episodes, get_video_urls, offset, limit)
+    
+    def scrape():
+        with scraper_pool.lease() as scraper:
+            if endpoint == 'most_watched':
+                return scraper.most_watched_page(
+                    offset, limit,
+                    get_video_urls=get_video_urls,
+                    max_episodes_per_series=max_episodes
+                )
+            return scraper.search_page(
+                query, offset, limit,
+                get_video_urls=get_video_urls,
+                max_episodes_per_series=max_episodes
+            )
+    
+    return request_flight.do(key, scrape)
+
+
+def make_cursor(offset):
+    """Cursor opaco da próxima página (hoje, só a posição em base64)"""
+    return base64.urlsafe_b64encode(f'o:{offset}'.encode('ascii')).rstrip(b'=').decode('ascii')
+
+
+def read_cursor(cursor):
+    """Posição de um cursor de make_cursor(), ou None se for inválido"""
+    try:
+        prefix, offset = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii').split(':')
+        offset = int(offset)
+    except (ValueError, UnicodeError):
+        return None
+    if prefix != 'o' or offset < 0:
+        return None
+    return offset
+
+
+def page_args(extra_fields=()):
+    """
+    (offset, limit, fields) da query string
+    
+    offset vem de `cursor` (next_cursor da página anterior) ou de `offset`;
+    limit <= 0 ou ausente = até o fim; fields é uma lista separada por
+    vírgulas (None = todos os campos). Levanta ValueError com a mensagem
+    do erro 400.
+    """
+    cursor = request.args.get('cursor')
+    if cursor:
+        offset = read_cursor(cursor)
+        if offset is None:
+            raise ValueError('cursor inválido (use o next_cursor da página anterior)')
+    else:
+        offset = request.args.get('offset', default=0, type=int)
+        if offset < 0:
+            raise ValueError('offset deve ser maior ou igual a zero')
+    
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit <= 0:
+        limit = None
+    
+    fields = request.args.get('fields')
+    if not fields:
+        return offset, limit, None
+    
+    fields = tuple(dict.fromkeys(name.strip() for name in fields.split(',') if name.strip()))
+    allowed = CARD_FIELDS + tuple(extra_fields)
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValueError(f'campos desconhecidos: {", ".join(unknown)} (disponíveis: {", ".join(allowed)})')
+    return offset, limit, fields
+
+
+def pagination(offset, limit, count, total=None):
+    """Bloco "pagination" da resposta; total None = desconhecido (streaming ao vivo)"""
+    end = offset + count
+    if total is not None:
+        has_more = end < total
+    else:
+        has_more = limit is not None and count >= limit
+    return {
+        'offset': offset,
+        'limit': limit,
+        'total': total,
+        'next_cursor': make_cursor(end) if has_more else None
+    }
+
+
+def page_body(items, total, offset, limit, organize, fields=None, **extra):
+    """
+    Corpo das rotas de listagem para uma página de itens
+    
+    organize=True: {summary, movies, series}; senão {count, data}. Os itens
+    saem só com os campos pedidos e summary.total é o total de resultados,
+    não o da página.
+    """
+    body = {'success': True}
+    body.update(extra)
+    
+    if organize:
+        result = organize_items(items)
+        body['summary'] = dict(result['summary'], total=total)
+        body['movies'] = project_items(result['movies'], fields)
+        body['series'] = project_items(result['series'], fields)
+    else:
+        body['count'] = len(items)
+        body['data'] = project_items(items, fields)
+    
+    body['pagination'] = pagination(offset, limit, len(items), total)
+    return body
+
+
+def origin_rates():
+    """Taxa atual do rate limiter por host (a menor entre as sessões)"""
+    rates = {}
+    for scraper in scraper_pool.scrapers:
+        for host, stats in scraper.rate_limiter.stats().items():
+            rates[host] = min(rates.get(host, stats['rate']), stats['rate'])
+    return rates
+
+
+def origin_unavailable(e):
+    """503 com Retry-After para quando o circuito do site está aberto e não há o que servir do cache"""
+    retry_after = max(1, math.ceil(e.retry_after))
+    response = jsonify({
+        'success': False,
+        'error': 'Site de origem indisponível no momento. Tente novamente mais tarde.',
+        'retry_after': retry_after
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def is_leader():
+    """
+    True se este processo cuida do login, keep-alive, snapshot e crawler
+    
+    Sem SHARED_STATE_PATH o processo é sempre líder; com ele, tenta o lock
+    (o worker que o detém continua líder até terminar).
+    """
+    if leader_lock is not None and not leader_lock.held:
+        if not leader_lock.acquire():
+            return False
+        logger.info("👑 Worker %s eleito líder", os.getpid())
+    
+    start_crawler()
+    return True
+
+# O que o líder já publicou / o seguidor já adotou (updated_at de cada blob)
+shared_versions = {'sessions': 0, 'most_watched': 0}
+published = {}
+
+def publish_shared_state():
+    """
+    Líder: quando mudaram, grava as sessões em disco e publica sessões e
+    snapshot para os outros workers
+    """
+    sessions = scraper_pool.export_sessions()
+    if sessions != published.get('sessions'):
+        if SESSION_STATE_PATH:
+            try:
+                scraper_pool.save_sessions(SESSION_STATE_PATH)
+            except OSError as e:
+                logger.warning("⚠ Não foi possível salvar as sessões em %s: %s", SESSION_STATE_PATH, e)
+        if shared_store is not None:
+            shared_store.put_blob('sessions', sessions)
+        published['sessions'] = sessions
+    
+    if shared_store is None:
+        return
+    
+    snapshot = most_watched_snapshot.current
+    if snapshot is not None and snapshot['etag'] != published.get('most_watched'):
+        shared_store.put_blob('most_watched', {k: snapshot[k] for k in ('items', 'created_at', 'etag')})
+        published['most_watched'] = snapshot['etag']
+
+def adopt_shared_state():
+    """Seguidor: adota as sessões e o snapshot publicados pelo líder"""
+    sessions = shared_store.get_blob('sessions', newer_than=shared_versions['sessions'])
+    if sessions is not None:
+        states, shared_versions['sessions'] = sessions
+        healthy = scraper_pool.import_sessions(states)
+        logger.info("⟳ Sessões do líder adotadas: %s/%s ativas", healthy, len(scraper_pool.scrapers))
+    
+    adopt_shared_snapshot()
+
+def adopt_shared_snapshot():
+    """Seguidor: adota o snapshot publicado pelo líder, se houver um mais novo"""
+    snapshot = shared_store.get_blob('most_watched', newer_than=shared_versions['most_watched'])
+    if snapshot is not None:
+        state, shared_versions['most_watched'] = snapshot
+        most_watched_snapshot.adopt(state)
+
+def refresh_snapshot():
+    """Líder: reconstrói o snapshot do 'Mais Visto do Dia' se ele ainda não existe ou expirou"""
+    if scraper_pool.ready and most_watched_snapshot.is_stale():
+        with scraper_pool.lease() as scraper:
+            most_watched_snapshot.refresh(scraper)
+
+def wait_for_snapshot():
+    """
+    Snapshot para um request, que nunca o extrai: o líder o constrói em
+    background desde a inicialização e os seguidores adotam o publicado.
+    Enquanto ele não existe, espera até SNAPSHOT_WAIT segundos (None se
+    continuar sem snapshot).
+    """
+    deadline = time.time() + SNAPSHOT_WAIT
+    while True:
+        if most_watched_snapshot.current is None and shared_store is not None:
+            adopt_shared_snapshot()
+        if most_watched_snapshot.current is not None or time.time() >= deadline:
+            return most_watched_snapshot.current
+        time.sleep(0.2)
+
+# Fase da inicialização, exposta em /health
+startup = {'phase': 'starting', 'started_at': time.time(), 'ready_at': None}
+
+def mark_ready():
+    if scraper_pool.ready and startup['ready_at'] is None:
+        startup['ready_at'] = time.time()
+        startup['phase'] = 'ready'
+        logger.info("✓ Scraper pronto após %.1f segundos", startup['ready_at'] - startup['started_at'])
 
 def initialize_scraper():
-    """Inicializa o scraper em background"""
-    global scraper, scraper_ready
+    """
+    Inicializa o pool em background: o líder reaproveita as sessões salvas
+    em disco (conferindo as antigas) e faz login só nas que faltam; os
+    seguidores adotam as sessões do líder
+    """
     try:
-        print("🚀 Inicializando scraper...")
-        scraper = CNVSWebScraper(TOKEN)
-        if scraper.login():
-            scraper_ready = True
-            print("✓ Scraper inicializado com sucesso")
+        if not is_leader():
+            startup['phase'] = 'waiting_leader'
+            logger.info("⏳ Worker %s aguardando as sessões do líder...", os.getpid())
+            adopt_shared_state()
+            return
+        
+        if SESSION_STATE_PATH and scraper_pool.load_sessions(SESSION_STATE_PATH):
+            startup['phase'] = 'restoring'
+            # Confere as sessões salvas há mais de 3 minutos e reloga as que caíram
+            scraper_pool.keep_alive()
+            logger.info("♻ Sessões reaproveitadas do disco: %s/%s ativas",
+                        scraper_pool.stats()['healthy'], len(scraper_pool.scrapers))
+        
+        missing = [s for s in scraper_pool.scrapers if not s.logged_in]
+        if missing:
+            startup['phase'] = 'logging_in'
+            logger.info("🚀 Inicializando scrapers (%s tokens)...", len(missing))
+            scraper_pool.login_all(missing)
+        
+        if scraper_pool.ready:
+            logger.info("✓ Scrapers inicializados: %s/%s sessões ativas",
+                        scraper_pool.stats()['healthy'], len(scraper_pool.scrapers))
+            publish_shared_state()
+            mark_ready()
+            # O snapshot sai daqui (e do keep-alive), nunca de um request
+            refresh_snapshot()
+            publish_shared_state()
         else:
-            print("✗ Erro ao fazer login")
+            startup['phase'] = 'failed'
+            logger.error("✗ Erro ao fazer login (nenhuma sessão ativa)")
     except Exception as e:
-        print(f"✗ Erro ao inicializar scraper: {e}")
-        import traceback
-        traceback.print_exc()
+        startup['phase'] = 'failed'
+        logger.error("✗ Erro ao inicializar scraper: %s", e, exc_info=True)
+    finally:
+        mark_ready()
 
-# Thread para manter a sessão ativa
+# Thread para manter a sessão ativa e o snapshot atualizado
 def keep_session_alive():
-    """Mantém a sessão ativa a cada 3 minutos"""
+    """
+    Líder: mantém as sessões ativas (keep_alive só age após 3 minutos sem
+    atividade), reloga as que caíram, reconstrói o snapshot do 'Mais Visto
+    do Dia' quando ele expira e publica tudo para os outros workers.
+    Seguidor: adota o que o líder publicou e tenta assumir se ele cair.
+    Ambos indexam os títulos que os outros workers gravaram no catálogo.
+    """
     while True:
-        time.sleep(180)  # 3 minutos
+        interval = 30
         try:
-            if scraper and scraper_ready:
-                scraper.keep_alive()
+            if is_leader():
+                scraper_pool.keep_alive()
+                refresh_snapshot()
+                publish_shared_state()
+            else:
+                adopt_shared_state()
+                interval = SHARED_SYNC_INTERVAL
+            
+            mark_ready()
+            
+            if shared_store is not None:
+                if catalog is not None:
+                    catalog.sync_index()
+                shared_store.purge()
         except Exception as e:
-            print(f"Erro no keep-alive: {e}")
+            logger.error("Erro no keep-alive: %s", e)
+        time.sleep(interval)
+
+def start_crawler():
+    """Inicia o crawler (só no líder; espera o pool ficar pronto e cede a vez ao tráfego ao vivo)"""
+    global crawler
+    with crawler_lock:
+        if crawler is None and CRAWLER_BUDGET > 0:
+            crawler = Crawler(
+                scraper_pool,
+                budget=CRAWLER_BUDGET,
+                max_episodes=CRAWLER_MAX_EPISODES,
+                refresh_margin=CRAWLER_REFRESH_MARGIN
+            ).start()
+
+crawler = None
+crawler_lock = threading.Lock()
+
+background_lock = threading.Lock()
+background_threads = []
+
+def start_background():
+    """
+    Inicia (uma vez por processo) o login e o keep-alive em uma thread daemon
+    
+    Não espera o login: enquanto o pool não fica pronto, /health responde
+    'initializing' e as rotas que dependem do site respondem 503.
+    """
+    with background_lock:
+        if background_threads:
+            return
+        thread = threading.Thread(target=run_background, name='cnvs-background', daemon=True)
+        thread.start()
+        background_threads.append(thread)
+
+def run_background():
+    # O keep-alive só começa depois da inicialização (senão relogaria as mesmas contas em paralelo)
+    initialize_scraper()
+    keep_session_alive()
+
+def create_app():
+    """App factory (gunicorn 'main:create_app()'): inicia o background e retorna na hora"""
+    start_background()
+    return app
+
+# Métricas da API (as do scraper ficam em cnvsweb_metrics)
+REQUEST_SECONDS = Histogram(
+    'cnvsweb_request_seconds',
+    'Latência dos endpoints da API (até o primeiro byte, nas respostas em streaming)',
+    ['endpoint', 'method', 'status']
+)
+SESSIONS = Gauge('cnvsweb_sessions', 'Sessões do pool: total, healthy e in_flight', ['state'])
+CACHE_SIZE = Gauge('cnvsweb_cache_size', 'Tamanho do URLCache: entries e bytes', ['unit'])
+CRAWLER_QUEUE = Gauge('cnvsweb_crawler_queue', 'Tarefas do crawler: ready e scheduled', ['state'])
+SNAPSHOT_AGE = Gauge('cnvsweb_snapshot_age_seconds', 'Idade do snapshot do Mais Visto do Dia')
+ORIGIN_RATE = Gauge('cnvsweb_origin_rate', 'Taxa atual do rate limiter por host (req/s, a menor entre as sessões)', ['host'])
+CIRCUIT_OPEN = Gauge('cnvsweb_circuit_open', 'Circuito do host: 0 fechado, 0.5 em teste, 1 aberto', ['host'])
 
-# Inicia o scraper em background
-init_thread = threading.Thread(target=initialize_scraper, daemon=True)
-init_thread.start()
+@app.before_request
+def ensure_background():
+    # Quem serve `main:app` sem a factory inicia o login no primeiro request
+    start_background()
 
-# Aguarda até 15 segundos para o scraper estar pronto
-print("⏳ Aguardando scraper ficar pronto...")
-for i in range(15):
-    if scraper_ready:
-        print(f"✓ Scraper pronto após {i+1} segundos")
-        break
-    time.sleep(1)
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
 
-# Inicia thread de keep-alive
-keep_alive_thread = threading.Thread(target=keep_session_alive, daemon=True)
-keep_alive_thread.start()
+@app.after_request
+def record_request_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            endpoint=request.url_rule.rule if request.url_rule else 'unmatched',
+            method=request.method,
+            status=response.status_code
+        )
+    return response
 
 @app.route('/')
 def home():
     """Página inicial com informações da API"""
     return jsonify({
         'status': 'online',
-        'scraper_ready': scraper_ready,
+        'scraper_ready': scraper_pool.ready,
         'message': 'CNVSWeb Scraper API - Versão Organizada',
         'version': '3.0.0',
         'endpoints': {
@@ -70,9 +646,13 @@ def home():
                 'method': 'GET',
                 'description': 'Filmes/séries mais assistidos do dia (ORGANIZADO)',
                 'params': {
-                    'limit': 'Opcional - Número máximo de resultados (padrão: todos)',
+                    'limit': 'Opcional - Tamanho da página (padrão: todos)',
+                    'offset': 'Opcional - Posição do primeiro resultado (padrão: 0)',
+                    'cursor': 'Opcional - pagination.next_cursor da página anterior (no lugar de offset)',
+                    'fields': 'Opcional - Campos de cada item separados por vírgula (ex: title,watch_link,year)',
                     'max_episodes': 'Opcional - Máximo de episódios por série (padrão: 5)',
-                    'organize': 'Opcional - true/false (padrão: true)'
+                    'organize': 'Opcional - true/false (padrão: true)',
+                    'stream': 'Opcional - ndjson ou sse: envia cada item assim que fica pronto'
                 },
                 'example': '/api/most-watched?limit=10&max_episodes=3'
             },
@@ -82,20 +662,39 @@ def home():
                 'description': 'Busca filmes/séries com URLs de vídeo (ORGANIZADO)',
                 'params': {
                     'q': 'Obrigatório - Termo de busca',
-                    'limit': 'Opcional - Número máximo de resultados',
+                    'limit': 'Opcional - Tamanho da página (padrão: todos)',
+                    'offset': 'Opcional - Posição do primeiro resultado (padrão: 0)',
+                    'cursor': 'Opcional - pagination.next_cursor da página anterior (no lugar de offset)',
+                    'fields': 'Opcional - Campos de cada item separados por vírgula (ex: title,watch_link,year)',
                     'max_episodes': 'Opcional - Máximo de episódios por série (padrão: 5)',
-                    'organize': 'Opcional - true/false (padrão: true)'
+                    'organize': 'Opcional - true/false (padrão: true)',
+                    'stream': 'Opcional - ndjson ou sse: envia cada item assim que fica pronto',
+                    'lazy': 'Opcional - true: responde sem resolver vídeos; cada item traz "resolve" para /api/resolve (pode ir em fields)'
                 },
                 'example': '/api/search?q=avengers&limit=10&max_episodes=3'
             },
+            'resolve': {
+                'url': '/api/resolve?h=handle',
+                'method': 'GET',
+                'description': 'Resolve um item de /api/search?lazy=true (filme/episódio: URL do vídeo; série: episódios)',
+                'params': {
+                    'h': 'Obrigatório - Campo "resolve" do item',
+                    'max_episodes': 'Opcional - Máximo de episódios (séries, padrão: todos)'
+                },
+                'example': '/api/resolve?h=<resolve>'
+            },
             'search_fast': {
                 'url': '/api/search-fast?q=query',
                 'method': 'GET',
                 'description': 'Busca rápida sem URLs de vídeo (ORGANIZADO)',
                 'params': {
                     'q': 'Obrigatório - Termo de busca',
-                    'limit': 'Opcional - Número máximo de resultados',
-                    'organize': 'Opcional - true/false (padrão: true)'
+                    'limit': 'Opcional - Tamanho da página (padrão: todos)',
+                    'offset': 'Opcional - Posição do primeiro resultado (padrão: 0)',
+                    'cursor': 'Opcional - pagination.next_cursor da página anterior (no lugar de offset)',
+                    'fields': 'Opcional - Campos de cada item separados por vírgula (ex: title,watch_link,year)',
+                    'organize': 'Opcional - true/false (padrão: true)',
+                    'source': 'Opcional - catalog (padrão: catálogo local, com busca no site se nada casar), local (índice em memória, aceita erros de digitação) ou live'
                 },
                 'example': '/api/search-fast?q=batman&limit=5'
             }
@@ -104,9 +703,18 @@ def home():
             'NOVA VERSÃO: Dados organizados em {movies: [], series: []}',
             'Campo "type" indica se é "movie" ou "series"',
             'Parâmetro max_episodes limita episódios por série',
+            'limit é o tamanho da página (filmes + séries, na ordem do site) e só os itens da página são enriquecidos; continue com cursor=pagination.next_cursor',
+            'fields sem player_url, video_url e episodes dispensa o acesso às páginas dos títulos',
             'organize=false retorna formato antigo (lista simples)',
             'URLs de vídeo são válidas por tempo limitado',
-            'A sessão é mantida automaticamente a cada 3 minutos'
+            'O ritmo de acesso ao site se ajusta sozinho (429/5xx/lentidão reduzem a taxa); com o site fora, as rotas respondem pelo snapshot/catálogo (campo "stale") ou 503 com Retry-After',
+            'stream=ndjson|sse envia um registro por item e um registro final {"type": "summary"}',
+            '/api/most-watched é servido de um snapshot atualizado em background (campo "age" em segundos)',
+            'A sessão é mantida automaticamente a cada 3 minutos',
+            'Com TOKENS=a,b,c as requisições são distribuídas entre as sessões (a menos ocupada primeiro)',
+            'Um crawler em background (CRAWLER_BUDGET req/s) pré-resolve os títulos da página principal e renova as URLs antes de expirarem',
+            'O login roda em background: /health informa a fase (startup.phase) e as sessões salvas em SESSION_STATE_PATH são reaproveitadas após reinícios',
+            'Com SHARED_STATE_PATH, vários workers (gunicorn "main:create_app()" --workers N) compartilham cache, sessões e snapshot; só o líder faz login'
         ]
     })
 
@@ -114,88 +722,251 @@ def home():
 def health():
     """Health check endpoint"""
     return jsonify({
-        'status': 'healthy' if scraper_ready else 'initializing',
-        'scraper_ready': scraper_ready,
+        'status': 'healthy' if scraper_pool.ready else 'initializing',
+        'scraper_ready': scraper_pool.ready,
+        'startup': {
+            'phase': startup['phase'],
+            'uptime': round(time.time() - startup['started_at'], 1),
+            'ready_after': round(startup['ready_at'] - startup['started_at'], 1) if startup['ready_at'] else None
+        },
+        'sessions': scraper_pool.stats(),
+        'coalescing': {
+            'requests': request_flight.stats(),
+            'urls': scraper_pool.single_flight.stats()
+        },
+        'engine': SCRAPER_ENGINE,
+        'origin': {
+            'circuit': scraper_pool.circuit_breaker.stats(),
+            'rate': origin_rates()
+        },
+        'catalog': catalog.stats() if catalog is not None else None,
+        'crawler': crawler.stats() if crawler is not None else None,
+        'worker': {
+            'pid': os.getpid(),
+            'role': 'leader' if leader_lock is None or leader_lock.held else 'follower',
+            'shared': shared_store.stats() if shared_store is not None else None
+        },
         'timestamp': time.time()
     })
 
+@app.route('/metrics')
+def metrics():
+    """Métricas no formato do Prometheus (latência por etapa/endpoint, cache, sessões)"""
+    for state, value in scraper_pool.stats().items():
+        SESSIONS.set(value, state={'sessions': 'total'}.get(state, state))
+    cache_stats = url_cache.stats()
+    CACHE_SIZE.set(cache_stats['entries'], unit='entries')
+    CACHE_SIZE.set(cache_stats['bytes'], unit='bytes')
+    if crawler is not None:
+        crawler_stats = crawler.stats()
+        CRAWLER_QUEUE.set(crawler_stats['ready'], state='ready')
+        CRAWLER_QUEUE.set(crawler_stats['scheduled'], state='scheduled')
+    snapshot = most_watched_snapshot.current
+    if snapshot is not None:
+        SNAPSHOT_AGE.set(round(time.time() - snapshot['created_at'], 1))
+    for host, rate in origin_rates().items():
+        ORIGIN_RATE.set(rate, host=host)
+    for host, circuit in scraper_pool.circuit_breaker.stats().items():
+        CIRCUIT_OPEN.set({'closed': 0, 'half_open': 0.5}.get(circuit['state'], 1), host=host)
+    
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
+
 @app.route('/api/most-watched')
 def most_watched():
     """Retorna os filmes/séries mais assistidos do dia COM URLs de vídeo - ORGANIZADO"""
-    if not scraper_ready:
+    if not scraper_pool.ready:
         return jsonify({
             'success': False,
             'error': 'Scraper ainda está inicializando. Tente novamente em alguns segundos.'
         }), 503
     
+    stream = request.args.get('stream', '').lower()
+    if stream and stream not in STREAM_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f'stream deve ser um de: {", ".join(STREAM_FORMATS)}'
+        }), 400
+    
+    try:
+        offset, limit, fields = page_args()
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
     try:
-        limit = request.args.get('limit', type=int)
         max_episodes = request.args.get('max_episodes', default=5, type=int)
         organize = request.args.get('organize', default='true', type=str).lower() == 'true'
+        get_video_urls = needs_enrichment(fields)
         
-        print("\n" + "="*50)
-        print("Extraindo filmes mais assistidos do dia...")
-        print("="*50 + "\n")
+        # Serve do snapshot em memória quando ele cobre o número de episódios pedido
+        if 0 < max_episodes <= SNAPSHOT_MAX_EPISODES:
+            snapshot = wait_for_snapshot()
+            if snapshot is None:
+                # Ainda sendo extraído em background (pelo líder)
+                response = jsonify({
+                    'success': False,
+                    'error': 'O snapshot do "Mais Visto do Dia" ainda está sendo gerado. Tente novamente em alguns segundos.'
+                })
+                response.status_code = 503
+                response.headers['Retry-After'] = str(max(1, math.ceil(SHARED_SYNC_INTERVAL)))
+                return response
+            if stream:
+                items = snapshot_items(page_slice(snapshot['items'], offset, limit), max_episodes)
+                return stream_items(
+                    iter(items), stream, fields, {'age': int(time.time() - snapshot['created_at'])},
+                    page=(offset, limit, len(snapshot['items']))
+                )
+            return most_watched_from_snapshot(snapshot, offset, limit, max_episodes, organize, fields)
         
-        result = scraper.get_most_watched_today(
-            get_video_urls=True,
-            max_episodes_per_series=max_episodes,
-            organize_output=organize
-        )
+        if stream:
+            # Os cards vêm agora (erros viram 503/500 normais); só o enriquecimento é transmitido
+            page = scraper_pool.stream_leased(
+                lambda scraper: scraper.iter_most_watched_today(
+                    get_video_urls=get_video_urls, max_episodes_per_series=max_episodes, offset=offset, limit=limit
+                )
+            )
+            return stream_items(page['items'], stream, fields, page=(offset, limit, page['total']))
         
-        # Se retornou dados organizados
-        if isinstance(result, dict) and 'movies' in result:
-            movies = result['movies']
-            series = result['series']
-            
-            # Aplica limite se especificado
-            if limit and limit > 0:
-                movies = movies[:limit]
-                series = series[:limit]
-            
-            return jsonify({
-                'success': True,
-                'summary': {
-                    'total': result['summary']['total'],
-                    'movies': len(movies),
-                    'series': len(series)
-                },
-                'movies': movies,
-                'series': series
-            })
-        else:
-            # Formato antigo (lista simples)
-            if limit and limit > 0:
-                result = result[:limit]
-            
-            return jsonify({
-                'success': True,
-                'count': len(result),
-                'data': result
-            })
+        logger.info("Extraindo filmes mais assistidos do dia...")
+        
+        page = coalesced_scrape(
+            'most_watched', max_episodes=max_episodes, get_video_urls=get_video_urls, offset=offset, limit=limit
+        )
+        return jsonify(page_body(page['items'], page['total'], offset, limit, organize, fields))
+    except CircuitOpenError as e:
+        # Site fora: o snapshot (mesmo antigo, com menos episódios) é melhor que um erro
+        snapshot = most_watched_snapshot.current
+        if snapshot is None:
+            return origin_unavailable(e)
+        logger.warning("⚡ %s - respondendo /api/most-watched pelo snapshot", e)
+        return most_watched_from_snapshot(snapshot, offset, limit, SNAPSHOT_MAX_EPISODES, organize, fields)
     except Exception as e:
-        print(f"Erro em /api/most-watched: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error("Erro em /api/most-watched: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+def snapshot_items(items, max_episodes):
+    """Itens (uma página do snapshot) com os episódios limitados a max_episodes"""
+    if max_episodes < SNAPSHOT_MAX_EPISODES:
+        items = [
+            dict(item, episodes=item['episodes'][:max_episodes]) if item['episodes'] else item
+            for item in items
+        ]
+    return items
+
+def most_watched_from_snapshot(snapshot, offset, limit, max_episodes, organize, fields):
+    """
+    Responde /api/most-watched a partir do snapshot (com ETag/Last-Modified)
+    
+    O corpo de cada combinação de parâmetros é serializado uma vez por
+    snapshot; a cada request só o campo "age" é colocado na frente dos bytes
+    guardados.
+    """
+    key = (offset, limit, max_episodes, organize, fields)
+    payload = snapshot['bodies'].get(key)
+    if payload is None:
+        items = snapshot_items(page_slice(snapshot['items'], offset, limit), max_episodes)
+        body = page_body(items, len(snapshot['items']), offset, limit, organize, fields)
+        body['updated_at'] = snapshot['created_at']
+        payload = app.json.dumps_bytes(body)
+        if len(snapshot['bodies']) < SNAPSHOT_BODY_CACHE:
+            snapshot['bodies'][key] = payload
+    
+    # "age" é a primeira chave em ordem alfabética: o resultado é o mesmo de serializar tudo
+    age = int(time.time() - snapshot['created_at'])
+    response = app.response_class(b'{"age":%d,%s\n' % (age, payload[1:]), mimetype=app.json.mimetype)
+    variant = f"{offset}-{limit or 0}-{max_episodes}-{int(organize)}"
+    if fields:
+        variant += '-' + '.'.join(fields)
+    response.set_etag(f"{snapshot['etag']}-{variant}", weak=True)
+    response.last_modified = snapshot['last_modified']
+    response.headers['Age'] = str(age)
+    response.headers['Cache-Control'] = f'public, max-age={max(0, MOST_WATCHED_REFRESH - age)}'
+    return response.make_conditional(request)
+
+def stream_items(items, fmt, fields=None, extra=None, page=None):
+    """
+    Resposta em streaming (NDJSON ou SSE)
+    
+    Emite um registro por filme/série assim que ele fica pronto (o campo
+    "type" diz se é "movie" ou "series") e, no fim, um registro
+    {"type": "summary", ...}. No SSE o tipo do registro vai em "event:".
+    `items` já é a página pedida; page = (offset, limit, total) vira o
+    bloco "pagination" do registro final.
+    """
+    def encode(event, data):
+        payload = app.json.dumps_bytes(data)
+        if fmt == 'sse':
+            return b"event: %s\ndata: %s\n\n" % (event.encode('ascii'), payload)
+        return payload + b"\n"
+    
+    def generate():
+        counts = {'movie': 0, 'series': 0}
+        count = 0
+        try:
+            for item in items:
+                count += 1
+                kind = item['type']
+                counts[kind] = counts.get(kind, 0) + 1
+                record = project_item(item, fields)
+                if fields is not None and 'type' not in fields:
+                    # No NDJSON é o "type" que diz se o registro é filme ou série
+                    record['type'] = kind
+                yield encode(kind, record)
+            
+            offset, limit, total = page or (0, None, None)
+            summary = dict(extra or {})
+            summary.update({
+                'type': 'summary',
+                'success': True,
+                'summary': {
+                    'total': count if total is None else total,
+                    'movies': counts['movie'],
+                    'series': counts['series']
+                },
+                'pagination': pagination(offset, limit, count, total)
+            })
+            yield encode('summary', summary)
+        except Exception as e:
+            logger.error("Erro durante o streaming: %s", e)
+            yield encode('error', {'type': 'error', 'success': False, 'error': str(e)})
+        finally:
+            # Cancela o enriquecimento pendente se o cliente desconectar
+            if hasattr(items, 'close'):
+                items.close()
+    
+    response = Response(
+        stream_with_context(generate()),
+        mimetype=STREAM_FORMATS[fmt],
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    if hasattr(items, 'close'):
+        # Libera a sessão reservada mesmo se o corpo nunca chegar a ser iterado
+        response.call_on_close(items.close)
+    return response
+
 @app.route('/api/search')
 def search():
     """Busca filmes/séries por query COM URLs de vídeo - ORGANIZADO"""
-    if not scraper_ready:
+    if not scraper_pool.ready:
         return jsonify({
             'success': False,
             'error': 'Scraper ainda está inicializando. Tente novamente em alguns segundos.'
         }), 503
     
     query = request.args.get('q', '')
-    limit = request.args.get('limit', type=int)
     max_episodes = request.args.get('max_episodes', default=5, type=int)
     organize = request.args.get('organize', default='true', type=str).lower() == 'true'
     
+    stream = request.args.get('stream', '').lower()
+    # lazy é opt-in: sem ele a resposta continua trazendo player_url/video_url,
+    # que é o que os clientes atuais leem da busca
+    lazy = request.args.get('lazy', default='false', type=str).lower() == 'true'
+    
     if not query:
         return jsonify({
             'success': False,
@@ -203,71 +974,160 @@ def search():
             'example': '/api/search?q=avengers'
         }), 400
     
+    if stream and stream not in STREAM_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f'stream deve ser um de: {", ".join(STREAM_FORMATS)}'
+        }), 400
+    
     try:
-        print("\n" + "="*50)
-        print(f"Buscando: {query}")
-        print("="*50 + "\n")
-        
-        result = scraper.search_movies(
-            query,
-            get_video_urls=True,
-            max_episodes_per_series=max_episodes,
-            organize_output=organize
-        )
-        
-        # Se retornou dados organizados
-        if isinstance(result, dict) and 'movies' in result:
-            movies = result['movies']
-            series = result['series']
-            
-            # Aplica limite se especificado
-            if limit and limit > 0:
-                movies = movies[:limit]
-                series = series[:limit]
-            
-            return jsonify({
-                'success': True,
-                'query': query,
-                'summary': {
-                    'total': result['summary']['total'],
-                    'movies': len(movies),
-                    'series': len(series)
-                },
-                'movies': movies,
-                'series': series
-            })
+        offset, limit, fields = page_args(extra_fields=('resolve',) if lazy else ())
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    try:
+        # lazy=true: só os cards (como /api/search-fast) + handle para /api/resolve
+        if lazy:
+            page = coalesced_scrape('search', query, get_video_urls=False, offset=offset, limit=limit)
+            items = [lazy_item(item) for item in page['items']]
+            if stream:
+                return stream_items(iter(items), stream, fields, {'query': query}, page=(offset, limit, page['total']))
+        elif stream:
+            page = scraper_pool.stream_leased(
+                lambda scraper: scraper.iter_search_movies(
+                    query, get_video_urls=needs_enrichment(fields), max_episodes_per_series=max_episodes,
+                    offset=offset, limit=limit
+                )
+            )
+            return stream_items(page['items'], stream, fields, {'query': query}, page=(offset, limit, page['total']))
         else:
-            # Formato antigo (lista simples)
-            if limit and limit > 0:
-                result = result[:limit]
+            logger.info("Buscando: %s", query)
             
-            return jsonify({
-                'success': True,
-                'query': query,
-                'count': len(result),
-                'data': result
-            })
+            page = coalesced_scrape(
+                'search', query, max_episodes, get_video_urls=needs_enrichment(fields), offset=offset, limit=limit
+            )
+            items = page['items']
+        
+        return jsonify(page_body(items, page['total'], offset, limit, organize, fields, query=query))
+    except CircuitOpenError as e:
+        return stale_search(e, query, lazy, offset, limit, organize, fields)
     except Exception as e:
-        print(f"Erro em /api/search: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error("Erro em /api/search: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
-@app.route('/api/search-fast')
-def search_fast():
-    """Busca filmes/séries por query SEM URLs de vídeo (mais rápido) - ORGANIZADO"""
-    if not scraper_ready:
+def stale_search(e, query, lazy, offset, limit, organize, fields):
+    """/api/search com o site fora: os cards que o catálogo conhece (sem vídeos), ou 503"""
+    items = catalog.search(query) if catalog is not None else []
+    if not items:
+        return origin_unavailable(e)
+    
+    logger.warning("⚡ %s - respondendo /api/search pelo catálogo", e)
+    page = page_slice(items, offset, limit)
+    if lazy:
+        page = [lazy_item(item) for item in page]
+    return jsonify(page_body(page, len(items), offset, limit, organize, fields, query=query, source='catalog', stale=True))
+
+@app.route('/api/resolve')
+def resolve():
+    """
+    Resolve sob demanda um item de /api/search?lazy=true
+    
+    filme -> player_url + video_url; episódio -> video_url; série -> episódios
+    (cada um com o seu handle). Usa o cache de URLs, então resolver de novo
+    o mesmo item não acessa o site até o token do vídeo expirar.
+    """
+    if not scraper_pool.ready:
         return jsonify({
             'success': False,
             'error': 'Scraper ainda está inicializando. Tente novamente em alguns segundos.'
         }), 503
     
+    handle = read_resolve_handle(request.args.get('h', ''))
+    if handle is None:
+        return jsonify({
+            'success': False,
+            'error': 'Parâmetro "h" ausente ou inválido (use o campo "resolve" de /api/search?lazy=true)'
+        }), 400
+    
+    kind, url = handle
+    max_episodes = request.args.get('max_episodes', default=0, type=int)
+    
+    try:
+        result = request_flight.do(('resolve', kind, url), resolve_handle, kind, url)
+        
+        if kind == 'series':
+            episodes = result['episodes']
+            if max_episodes > 0:
+                episodes = episodes[:max_episodes]
+            result = dict(result, episodes=episodes, count=len(episodes))
+        
+        return jsonify(result)
+    except CircuitOpenError as e:
+        return origin_unavailable(e)
+    except Exception as e:
+        logger.error("Erro em /api/resolve: %s", e, exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def resolve_handle(kind, url):
+    """
+    Executa a resolução de um handle (uma vez por handle em andamento)
+    
+    Se nada foi resolvido (nem pelo cache/catálogo) com o circuito do site
+    aberto, levanta CircuitOpenError em vez de responder vazio.
+    """
+    with scraper_pool.lease() as scraper:
+        origin = urljoin(scraper.base_url, url)
+        if kind == 'series':
+            episodes = []
+            for ep in scraper.get_series_episodes(url):
+                ep = dict(ep)
+                if ep.get('player_url'):
+                    ep['resolve'] = make_resolve_handle('episode', ep['player_url'])
+                episodes.append(ep)
+            if not episodes:
+                scraper_pool.circuit_breaker.check(origin)
+            return {'success': True, 'type': 'series', 'watch_link': url, 'episodes': episodes}
+        
+        if kind == 'episode':
+            player_url = url
+        else:
+            player_url = scraper.get_player_url(url)
+        
+        video_url = scraper.get_video_mp4_url(player_url) if player_url else None
+        if not video_url:
+            scraper_pool.circuit_breaker.check(origin)
+    
+    expires_at = url_cache.expires_at(('mp4', player_url)) if video_url else None
+    return {
+        'success': bool(video_url),
+        'type': kind,
+        'player_url': player_url,
+        'video_url': video_url,
+        'expires_in': int(expires_at - time.time()) if expires_at else None
+    }
+
+@app.route('/api/search-fast')
+def search_fast():
+    """
+    Busca filmes/séries por query SEM URLs de vídeo (mais rápido) - ORGANIZADO
+    
+    Responde pelo catálogo local quando ele conhece algum título que casa
+    com a busca; senão (ou com source=live) busca no site. source=local usa
+    o índice em memória do catálogo (palavras + trigramas, ordenado por
+    IMDb/ano), sem tocar no SQLite.
+    """
     query = request.args.get('q', '')
-    limit = request.args.get('limit', type=int)
     organize = request.args.get('organize', default='true', type=str).lower() == 'true'
+    source = request.args.get('source', default='catalog', type=str).lower()
     
     if not query:
         return jsonify({
@@ -276,51 +1136,49 @@ def search_fast():
             'example': '/api/search-fast?q=batman'
         }), 400
     
+    if source not in ('catalog', 'local', 'live'):
+        return jsonify({
+            'success': False,
+            'error': 'source deve ser catalog, local ou live'
+        }), 400
+    
     try:
-        print(f"\nBusca rápida: {query}")
-        result = scraper.search_movies(
-            query,
-            get_video_urls=False,
-            max_episodes_per_series=0,
-            organize_output=organize
-        )
-        
-        # Se retornou dados organizados
-        if isinstance(result, dict) and 'movies' in result:
-            movies = result['movies']
-            series = result['series']
-            
-            # Aplica limite se especificado
-            if limit and limit > 0:
-                movies = movies[:limit]
-                series = series[:limit]
-            
-            return jsonify({
-                'success': True,
-                'query': query,
-                'summary': {
-                    'total': result['summary']['total'],
-                    'movies': len(movies),
-                    'series': len(series)
-                },
-                'movies': movies,
-                'series': series
-            })
+        offset, limit, fields = page_args()
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    try:
+        if catalog is None or source == 'live':
+            items = []
+        elif source == 'local':
+            items = catalog.index.search(query)
         else:
-            # Formato antigo (lista simples)
-            if limit and limit > 0:
-                result = result[:limit]
+            items = catalog.search(query)
+        
+        # O catálogo devolve todos os resultados de uma vez; a página é recortada aqui
+        total = len(items)
+        items = page_slice(items, offset, limit)
+        
+        if not total:
+            if not scraper_pool.ready:
+                return jsonify({
+                    'success': False,
+                    'error': 'Scraper ainda está inicializando. Tente novamente em alguns segundos.'
+                }), 503
             
-            return jsonify({
-                'success': True,
-                'query': query,
-                'count': len(result),
-                'data': result
-            })
+            logger.info("Busca rápida: %s", query)
+            page = coalesced_scrape('search', query, get_video_urls=False, offset=offset, limit=limit)
+            items, total = page['items'], page['total']
+            source = 'live'
+        
+        return jsonify(page_body(items, total, offset, limit, organize, fields, query=query, source=source))
+    except CircuitOpenError as e:
+        return origin_unavailable(e)
     except Exception as e:
-        print(f"Erro em /api/search-fast: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error("Erro em /api/search-fast: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -335,6 +1193,7 @@ def not_found(e):
         'available_endpoints': [
             '/',
             '/health',
+            '/metrics',
             '/api/most-watched',
             '/api/search?q=query',
             '/api/search-fast?q=query'
@@ -344,4 +1203,4 @@ def not_found(e):
 if __name__ == '__main__':
     # Porta configurável para deploy
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=False)
+    create_app().run(host='0.0.0.0', port=port, debug=False)
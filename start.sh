@@ -1,2 +1,9 @@
 #!/bin/bash
-gunicorn api_server:app --bind 0.0.0.0:$PORT --workers 1 --timeout 120
+# Um worker por núcleo (WEB_CONCURRENCY sobrescreve). Os workers compartilham
+# cache de URLs, sessões e snapshot pelo SHARED_STATE_PATH; só o líder eleito
+# faz login/keep-alive. Sem --preload: cada worker abre as próprias conexões.
+# O estado guarda cookies de sessão: fica em um diretório só do usuário.
+STATE_DIR="${STATE_DIR:-${XDG_RUNTIME_DIR:-$HOME/.cache}/cnvsweb}"
+mkdir -p "$STATE_DIR" && chmod 700 "$STATE_DIR"
+export SHARED_STATE_PATH="${SHARED_STATE_PATH:-$STATE_DIR/shared.db}"
+gunicorn "main:create_app()" --bind 0.0.0.0:$PORT --workers ${WEB_CONCURRENCY:-$(nproc)} --threads ${GUNICORN_THREADS:-4} --timeout 120
@@ -0,0 +1,125 @@
+"""
+Configuração dos testes
+
+Os testes rodam contra o servidor local de fixtures do bench_scraper.py e
+nunca acessam o site real. O ambiente abaixo é definido antes de qualquer
+import do main.py, que cria pool, catálogo e arquivos na importação.
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('CATALOG_PATH', '')
+os.environ.setdefault('SESSION_STATE_PATH', '')
+os.environ.setdefault('SHARED_STATE_PATH', '')
+os.environ.setdefault('CRAWLER_BUDGET', '0')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+import pytest
+
+import cnvsweb_scraper
+from bench_scraper import FixtureServer
+
+
+def pytest_configure(config):
+    # Aviso interno do bs4 com lxml recente, sem relação com o código do scraper
+    config.addinivalue_line('filterwarnings', "ignore:The 'strip_cdata' option:DeprecationWarning")
+
+
+@pytest.fixture(scope='session')
+def fixture_server():
+    with FixtureServer() as server:
+        yield server
+
+
+@pytest.fixture
+def make_scraper(fixture_server):
+    """Fábrica de CNVSWebScraper apontado para o servidor de fixtures (sessão já "logada")"""
+    scrapers = []
+
+    def make(**kwargs):
+        kwargs.setdefault('rate_limit', 0)
+        kwargs.setdefault('cache', cnvsweb_scraper.URLCache())
+        scraper = cnvsweb_scraper.CNVSWebScraper('test', base_url=fixture_server.base_url, **kwargs)
+        scraper.logged_in = True
+        scraper.last_activity = time.time()
+        scrapers.append(scraper)
+        return scraper
+
+    yield make
+    for scraper in scrapers:
+        scraper.session.close()
+
+
+class FakeClock:
+    """
+    Substituto do módulo time no cnvsweb_scraper: time(), monotonic() e
+    sleep() são controlados pelo teste, o resto vem do módulo de verdade
+    """
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+        self.sleeps = []
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cnvsweb_scraper, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def make_pool(fixture_server):
+    """Fábrica de ScraperPool apontado para o servidor de fixtures, com as sessões em rotação"""
+    pools = []
+
+    def make(tokens=('test',), **kwargs):
+        kwargs.setdefault('rate_limit', 0)
+        kwargs.setdefault('cache', cnvsweb_scraper.URLCache())
+        pool = cnvsweb_scraper.ScraperPool(list(tokens), base_url=fixture_server.base_url, **kwargs)
+        for scraper in pool.scrapers:
+            scraper.logged_in = True
+            scraper.last_activity = time.time()
+            pool._set_health(scraper, True)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        for scraper in pool.scrapers:
+            if isinstance(scraper, cnvsweb_scraper.BlockingScraper):
+                scraper.close()
+            else:
+                scraper.session.close()
+
+
+@pytest.fixture
+def api(make_pool, monkeypatch):
+    """Cliente de teste do main.app com o pool trocado por um do servidor de fixtures"""
+    import main
+
+    pool = make_pool()
+    monkeypatch.setattr(main, 'scraper_pool', pool)
+    # Sem login/keep-alive/snapshot em background: cada teste acessa o site só pelas rotas
+    monkeypatch.setattr(main, 'start_background', lambda: None)
+    return main.app.test_client()
@@ -0,0 +1,137 @@
+"""Motor assíncrono: mesmo resultado do síncrono, limites e o que roda fora do event loop"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+import cnvsweb_scraper
+from cnvsweb_scraper import BlockingScraper
+
+SERIES = '/watch/the-last-of-us'
+LOOP_THREAD = 'cnvs-asyncio'
+
+
+@pytest.fixture
+def make_blocking(fixture_server):
+    """Fábrica de BlockingScraper apontado para o servidor de fixtures (sessão já "logada")"""
+    scrapers = []
+
+    def make(**kwargs):
+        kwargs.setdefault('rate_limit', 0)
+        kwargs.setdefault('cache', cnvsweb_scraper.URLCache())
+        scraper = BlockingScraper('test', base_url=fixture_server.base_url, **kwargs)
+        scraper.scraper.logged_in = True
+        scraper.scraper.last_activity = time.time()
+        scrapers.append(scraper)
+        return scraper
+
+    yield make
+    for scraper in scrapers:
+        scraper.close()
+
+
+class RecordingCatalog:
+    """Catálogo falso que guarda em qual thread cada gravação aconteceu"""
+
+    def __init__(self):
+        self.threads = []
+
+    def __getattr__(self, method):
+        def record(*args):
+            self.threads.append(threading.current_thread().name)
+        return record
+
+
+@pytest.mark.parametrize('listing', ['most_watched', 'search'])
+def test_same_result_as_sync_engine(make_scraper, make_blocking, listing):
+    def run(scraper):
+        if listing == 'most_watched':
+            return scraper.get_most_watched_today(max_episodes_per_series=2, organize_output=False)
+        return scraper.search_movies('batman', max_episodes_per_series=2, organize_output=False)
+
+    assert run(make_blocking()) == run(make_scraper())
+
+
+def test_streamed_items_are_a_plain_generator(make_scraper, make_blocking):
+    reference = make_scraper().search_movies('batman', max_episodes_per_series=1, organize_output=False)
+
+    page = make_blocking().iter_search_movies('batman', max_episodes_per_series=1)
+    items = list(page['items'])
+
+    assert page['total'] == len(reference)
+    assert sorted(items, key=lambda i: i['title']) == sorted(reference, key=lambda i: i['title'])
+
+
+@pytest.mark.parametrize('max_season_workers', [1, 3])
+def test_season_fetches_respect_max_season_workers(make_blocking, monkeypatch, max_season_workers):
+    blocking = make_blocking(max_season_workers=max_season_workers)
+    scraper = blocking.scraper
+    fetch = scraper._fetch_season_episodes
+    running, peak = 0, 0
+
+    async def counting_fetch(*args):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            await asyncio.sleep(0.01)
+            return await fetch(*args)
+        finally:
+            running -= 1
+
+    monkeypatch.setattr(scraper, '_fetch_season_episodes', counting_fetch)
+    episodes = blocking.get_series_episodes(SERIES)
+
+    assert len({ep['season_id'] for ep in episodes}) == 3
+    # Duas temporadas faltam na página da série
+    assert peak == min(2, max_season_workers)
+
+
+def test_parsing_and_catalog_writes_run_off_the_loop(make_blocking, monkeypatch):
+    catalog = RecordingCatalog()
+    blocking = make_blocking(catalog=catalog)
+    scraper = blocking.scraper
+    parse = scraper._parse_series_page
+    parse_threads = []
+
+    def recording_parse(markup):
+        parse_threads.append(threading.current_thread().name)
+        return parse(markup)
+
+    monkeypatch.setattr(scraper, '_parse_series_page', recording_parse)
+    blocking.get_series_episodes(SERIES)
+    blocking.search_movies('batman', get_video_urls=False)
+
+    assert parse_threads and LOOP_THREAD not in parse_threads
+    assert catalog.threads and LOOP_THREAD not in catalog.threads
+
+
+def test_memory_cache_stays_on_the_loop(make_blocking):
+    # Sem catálogo nem SharedStore não vale a pena trocar de thread
+    scraper = make_blocking().scraper
+    calls = []
+
+    async def storage():
+        await scraper._storage(lambda: calls.append(threading.current_thread().name))
+
+    cnvsweb_scraper._EventLoopThread.get().run(storage())
+    assert calls == [LOOP_THREAD]
+
+
+def test_player_extraction_keeps_the_session_alive(make_blocking, monkeypatch):
+    blocking = make_blocking()
+    scraper = blocking.scraper
+    movie = next(
+        item for item in blocking.search_movies('batman', get_video_urls=False, organize_output=False)
+        if not item['is_series']
+    )
+    calls = []
+
+    async def keep_alive():
+        calls.append(True)
+        return True
+
+    monkeypatch.setattr(scraper, 'keep_alive', keep_alive)
+    assert blocking.get_player_url(movie['watch_link'])
+    assert calls
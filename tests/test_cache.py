@@ -0,0 +1,126 @@
+"""URLCache: TTL por entrada, retenção de entradas expiradas (stale) e limites"""
+import base64
+import json
+
+import pytest
+
+from cnvsweb_scraper import TOKEN_EXPIRY_MARGIN, CNVSWebScraper, URLCache, parse_token_expiry
+
+
+def test_get_respects_ttl(clock):
+    cache = URLCache(default_ttl=60)
+    cache.set(('mp4', 'a'), 'video-a')
+    cache.set(('mp4', 'b'), 'video-b', ttl=10)
+
+    clock.advance(9)
+    assert cache.get(('mp4', 'a')) == 'video-a'
+    assert cache.get(('mp4', 'b')) == 'video-b'
+
+    clock.advance(2)
+    assert cache.get(('mp4', 'b')) is None
+    assert cache.get(('mp4', 'a')) == 'video-a'
+
+    clock.advance(50)
+    assert cache.get(('mp4', 'a')) is None
+
+
+def test_non_positive_ttl_is_not_stored():
+    cache = URLCache()
+    cache.set(('mp4', 'a'), 'video-a', ttl=0)
+    assert cache.get(('mp4', 'a')) is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_expires_at_only_for_valid_entries(clock):
+    cache = URLCache()
+    cache.set(('player', 'a'), 'player-a', ttl=30)
+    assert cache.expires_at(('player', 'a')) == clock.now + 30
+
+    clock.advance(31)
+    assert cache.expires_at(('player', 'a')) is None
+    assert cache.expires_at(('player', 'missing')) is None
+
+
+def test_stale_entry_served_until_stale_ttl(clock):
+    cache = URLCache(stale_ttl=100)
+    cache.set(('player', 'a'), 'player-a', ttl=10)
+
+    # Ainda válida: get_stale também devolve
+    assert cache.get_stale(('player', 'a')) == 'player-a'
+
+    clock.advance(50)
+    assert cache.get(('player', 'a')) is None
+    assert cache.get_stale(('player', 'a')) == 'player-a'
+    # max_stale menor que a idade da expiração (40s) recusa
+    assert cache.get_stale(('player', 'a'), max_stale=30) is None
+
+    clock.advance(70)
+    assert cache.get_stale(('player', 'a')) is None
+
+
+def test_get_drops_entries_past_stale_ttl(clock):
+    cache = URLCache(stale_ttl=5)
+    cache.set(('player', 'a'), 'player-a', ttl=10)
+
+    clock.advance(12)
+    assert cache.get(('player', 'a')) is None
+    assert cache.stats()['entries'] == 1
+
+    clock.advance(5)
+    assert cache.get(('player', 'a')) is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_lru_eviction_by_entries():
+    cache = URLCache(max_entries=2)
+    cache.set(('mp4', 'a'), 'a')
+    cache.set(('mp4', 'b'), 'b')
+    cache.get(('mp4', 'a'))
+    cache.set(('mp4', 'c'), 'c')
+
+    assert cache.get(('mp4', 'b')) is None
+    assert cache.get(('mp4', 'a')) == 'a'
+    assert cache.get(('mp4', 'c')) == 'c'
+
+
+def test_lru_eviction_by_bytes():
+    value = 'x' * 1000
+    size = URLCache._sizeof(('mp4', 'a'), value)
+    cache = URLCache(max_bytes=size * 2)
+    for key in 'abc':
+        cache.set(('mp4', key), value)
+
+    assert cache.get(('mp4', 'a')) is None
+    assert cache.stats()['bytes'] <= size * 2
+    # Um valor maior que o limite inteiro não entra
+    cache.set(('mp4', 'big'), 'x' * (size * 3))
+    assert cache.get(('mp4', 'big')) is None
+
+
+NOW = 1_700_000_000
+
+
+@pytest.mark.parametrize('url, expected', [
+    (f'https://cdn.example/v.mp4?expires={NOW + 600}', NOW + 600),
+    (f'https://cdn.example/v.mp4?e={NOW + 60}&x=1', NOW + 60),
+    (f'https://cdn.example/v.mp4?cnvs_token=abcdef-{NOW + 300}', NOW + 300),
+    ('https://cdn.example/v.mp4?cnvs_token='
+     + base64.urlsafe_b64encode(json.dumps({'exp': NOW + 900}).encode()).decode().rstrip('='), NOW + 900),
+    # Fora da janela plausível (passado ou mais de 30 dias à frente)
+    (f'https://cdn.example/v.mp4?expires={NOW - 3600}', None),
+    (f'https://cdn.example/v.mp4?expires={NOW + 40 * 86400}', None),
+    ('https://cdn.example/v.mp4', None),
+    (None, None),
+])
+def test_parse_token_expiry(url, expected):
+    assert parse_token_expiry(url, now=NOW) == expected
+
+
+def test_remembered_url_uses_token_expiry(clock):
+    scraper = CNVSWebScraper('test', cache=URLCache(default_ttl=600), rate_limit=0)
+    video_url = f'https://cdn.example/v.mp4?expires={int(clock.now) + 300}'
+    scraper._remember('mp4', 'https://site/player/1', video_url)
+
+    # Expira TOKEN_EXPIRY_MARGIN antes do token, não no TTL padrão
+    assert scraper.cache.expires_at(('mp4', 'https://site/player/1')) == clock.now + 300 - TOKEN_EXPIRY_MARGIN
+    scraper.session.close()
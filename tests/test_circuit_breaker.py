@@ -0,0 +1,78 @@
+"""CircuitBreaker: closed -> open -> half_open -> closed/open por host"""
+import pytest
+
+from cnvsweb_scraper import CircuitBreaker, CircuitOpenError
+
+URL = 'https://cnvsweb.stream/watch/x'
+OTHER = 'https://outro.example/watch/x'
+
+
+def fail(breaker, times, url=URL):
+    for _ in range(times):
+        breaker.before(url)
+        breaker.record(url, False)
+
+
+def test_opens_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    fail(breaker, 2)
+    breaker.record(URL, True)
+    fail(breaker, 2)
+    assert breaker.healthy(URL)
+
+    fail(breaker, 1)
+    assert not breaker.healthy(URL)
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before(URL)
+    assert info.value.retry_after == pytest.approx(30)
+
+    # Outro host não é afetado
+    breaker.before(OTHER)
+    assert breaker.healthy(OTHER)
+
+
+def test_half_open_allows_one_probe_and_closes_on_success(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    fail(breaker, 1)
+
+    clock.advance(30)
+    breaker.before(URL)
+    assert breaker.stats()['cnvsweb.stream']['state'] == 'half_open'
+    # Só a requisição de teste passa
+    with pytest.raises(CircuitOpenError):
+        breaker.before(URL)
+
+    breaker.record(URL, True)
+    assert breaker.healthy(URL)
+    assert breaker.stats()['cnvsweb.stream'] == {'state': 'closed', 'failures': 0, 'retry_in': None}
+
+
+def test_failed_probe_reopens_with_doubled_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, max_reset_timeout=100)
+    fail(breaker, 1)
+
+    for expected in (60, 100, 100):
+        clock.advance(breaker.stats()['cnvsweb.stream']['retry_in'])
+        breaker.before(URL)
+        breaker.record(URL, False)
+        assert breaker.stats()['cnvsweb.stream']['state'] == 'open'
+        assert breaker.stats()['cnvsweb.stream']['retry_in'] == expected
+
+    # Depois de fechar, o prazo volta ao inicial
+    clock.advance(100)
+    breaker.before(URL)
+    breaker.record(URL, True)
+    fail(breaker, 1)
+    assert breaker.stats()['cnvsweb.stream']['retry_in'] == 30
+
+
+def test_check_does_not_take_the_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.check(URL)
+    fail(breaker, 1)
+
+    clock.advance(30)
+    with pytest.raises(CircuitOpenError):
+        breaker.check(URL)
+    # A requisição de teste continua disponível
+    breaker.before(URL)
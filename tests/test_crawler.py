@@ -0,0 +1,129 @@
+"""Crawler: orçamento de requisições, backoff das falhas e fila por popularidade"""
+import threading
+
+import pytest
+
+from cnvsweb_scraper import Crawler, RequestBudget
+
+SERIES = '/watch/the-last-of-us'
+
+
+@pytest.fixture
+def crawler(make_pool, clock):
+    pool = make_pool()
+    return Crawler(pool, budget=1000, burst=1000, retry_backoff=60, max_retry_backoff=200)
+
+
+def scheduled(crawler, kind, url):
+    """Horário agendado (relativo ao relógio do teste) da tarefa, ou None"""
+    for due, _, _, task_kind, task_url in crawler._scheduled:
+        if (task_kind, task_url) == (kind, url):
+            return due
+    return None
+
+
+def test_budget_waits_for_tokens(clock):
+    budget = RequestBudget(2, burst=2)
+    assert budget.acquire() and budget.acquire()
+    assert clock.sleeps == []
+
+    # Sem fichas: espera 1/rate por requisição
+    assert budget.acquire()
+    assert clock.sleeps == [0.5]
+
+    # charge() deixa o saldo negativo, pago antes da próxima reserva
+    budget.charge(3)
+    clock.sleeps.clear()
+    assert budget.acquire()
+    assert sum(clock.sleeps) == pytest.approx(2.0)
+    assert budget.stats()['spent'] == 7
+
+
+def test_budget_acquire_stops_early():
+    budget = RequestBudget(0.01, burst=1)
+    budget.acquire()
+    stop = threading.Event()
+    stop.set()
+    assert budget.acquire(stop=stop) is False
+
+
+def test_failed_task_backs_off_until_the_cap(crawler, clock, monkeypatch, fixture_server):
+    scraper = crawler.pool.scrapers[0]
+    url = fixture_server.base_url + '/watch/velozes-e-furiosos'
+    refresh_url = scraper.refresh_url
+    monkeypatch.setattr(scraper, 'refresh_url', lambda kind, u: None)
+
+    delays = []
+    for _ in range(4):
+        crawler._handle(0, 'player', url)
+        delays.append(scheduled(crawler, 'player', url) - clock.now)
+        crawler._scheduled.clear()
+        crawler._pending.clear()
+
+    assert delays == [60, 120, 200, 200]
+    assert crawler.counters['errors'] == 4
+
+    # Um sucesso zera as falhas e agenda a renovação antes de a URL expirar
+    monkeypatch.setattr(scraper, 'refresh_url', refresh_url)
+    crawler._handle(0, 'player', url)
+    assert ('player', url) not in crawler._failures
+    assert crawler.counters['resolved'] == 1
+    expires_at = crawler.cache.expires_at(('player', url))
+    assert scheduled(crawler, 'player', url) == expires_at - crawler.refresh_margin
+    assert any(kind == 'mp4' for _, _, kind, _ in crawler._ready)
+
+
+def test_series_without_episodes_is_retried(crawler, clock, monkeypatch, fixture_server):
+    scraper = crawler.pool.scrapers[0]
+    url = fixture_server.base_url + SERIES
+    monkeypatch.setattr(scraper, 'get_series_episodes', lambda u: [])
+
+    crawler._handle(0, 'series', url)
+    assert crawler._failures[('series', url)] == 1
+    assert scheduled(crawler, 'series', url) == clock.now + 60
+    assert crawler.counters['series'] == 0
+
+
+def test_series_charges_every_season_fetched(crawler, clock, fixture_server):
+    crawler.max_episodes = 2
+    crawler._handle(0, 'series', fixture_server.base_url + SERIES)
+
+    # Página da série (reservada antes) + as duas temporadas descontadas depois
+    assert crawler.budget.stats()['spent'] == 3
+    assert crawler.counters['series'] == 1
+    assert sum(1 for _, _, kind, _ in crawler._ready if kind == 'mp4') == 2
+
+
+def test_home_titles_queued_by_popularity(crawler):
+    base = 'https://cnvsweb.stream'
+
+    def item(slug, is_series=False):
+        return {'watch_link': f'/watch/{slug}', 'is_series': is_series}
+
+    sections = [
+        ('Mais Visto do Dia', [item('a'), item('b'), item('c', True)]),
+        ('Lançamentos', [item('c', True), item('d')]),
+    ]
+    crawler._enqueue_titles(base, sections)
+
+    order = []
+    while crawler._ready:
+        _, kind, url = crawler._next()
+        order.append((kind, url.rsplit('/', 1)[1]))
+    # c: 1/3 + 1 > a: 1 > b: 1/2 = d: 1/2 (ordem de chegada)
+    assert order == [('series', 'c'), ('player', 'a'), ('player', 'b'), ('player', 'd')]
+
+
+def test_spend_pauses_while_live_requests_run(make_pool):
+    crawler = Crawler(make_pool(), budget=1000, burst=1000)
+    scraper = crawler.pool.acquire()
+    result = []
+    thread = threading.Thread(target=lambda: result.append(crawler._spend()))
+    thread.start()
+
+    thread.join(0.2)
+    assert thread.is_alive() and crawler.counters['paused'] == 1
+
+    crawler.pool.release(scraper)
+    thread.join(5)
+    assert result == [True]
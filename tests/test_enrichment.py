@@ -0,0 +1,25 @@
+"""Enriquecimento concorrente dos itens (player/vídeo/episódios)"""
+import pytest
+
+
+@pytest.mark.parametrize('listing', ['most_watched', 'search'])
+def test_parallel_enrichment_matches_serial(make_scraper, listing):
+    def run(scraper):
+        if listing == 'most_watched':
+            return scraper.get_most_watched_today(max_episodes_per_series=2, organize_output=False)
+        return scraper.search_movies('batman', max_episodes_per_series=2, organize_output=False)
+
+    serial = run(make_scraper(max_workers=1))
+    parallel = run(make_scraper(max_workers=4))
+
+    assert parallel == serial
+    assert any(item.get('video_url') for item in parallel)
+    assert all(len(item['episodes']) <= 2 for item in parallel if item['is_series'])
+
+
+def test_organized_output(make_scraper):
+    result = make_scraper().get_most_watched_today(max_episodes_per_series=1)
+    summary = result['summary']
+    assert summary['total'] == summary['movies'] + summary['series']
+    assert all(not item['is_series'] for item in result['movies'])
+    assert all(item['is_series'] for item in result['series'])
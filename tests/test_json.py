@@ -0,0 +1,78 @@
+"""FastJSONProvider: mesma saída do json da stdlib, com ou sem orjson"""
+import json
+from datetime import datetime, timezone
+
+import pytest
+from flask import Flask
+
+import cnvsweb_json
+from cnvsweb_json import FastJSONProvider
+from cnvsweb_records import Episode
+
+EPISODE = Episode('9001', '1ª Temporada', '5001', 'Episódio 1', player_url='https://cnvsweb.stream/player/9001')
+PAYLOAD = {
+    'success': True,
+    'title': 'Coração Valente',
+    'count': 2,
+    'imdb': 8.3,
+    'items': [{'b': None, 'a': [1, 2.5]}, EPISODE],
+    'updated_at': datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+}
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def app(request, monkeypatch):
+    if request.param == 'stdlib':
+        monkeypatch.setattr(cnvsweb_json, 'orjson', None)
+    elif cnvsweb_json.orjson is None:
+        pytest.skip('orjson não instalado')
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+
+def reference(obj, **kwargs):
+    """Saída do provider padrão do Flask (json da stdlib)"""
+    app = Flask(__name__)
+    return app.json.dumps(obj, default=lambda o: o.to_dict() if isinstance(o, Episode) else app.json.default(o),
+                          ensure_ascii=False, **kwargs)
+
+
+def test_compact_bytes_match_stdlib(app):
+    provider = app.json
+    assert provider.fast == (cnvsweb_json.orjson is not None)
+    assert provider.dumps_bytes(PAYLOAD) == reference(PAYLOAD, separators=(',', ':')).encode('utf-8')
+
+
+def test_indent_matches_stdlib(app):
+    provider = app.json
+    assert provider.dumps_bytes(PAYLOAD, indent=True) == reference(PAYLOAD, indent=2).encode('utf-8')
+
+
+def test_dumps_and_loads(app):
+    provider = app.json
+    text = provider.dumps(PAYLOAD)
+    assert isinstance(text, str) and 'Coração' in text
+    loaded = provider.loads(text)
+    assert loaded['items'][1] == EPISODE.to_dict()
+    assert loaded['updated_at'] == 'Wed, 01 May 2024 12:30:00 GMT'
+
+
+def test_ensure_ascii_uses_stdlib(app):
+    provider = app.json
+    provider.ensure_ascii = True
+    assert not provider.fast
+    assert '\\u00e7' in provider.dumps({'t': 'ç'})
+
+
+def test_integers_beyond_64_bits(app):
+    provider = app.json
+    assert json.loads(provider.dumps_bytes({'n': 2 ** 70})) == {'n': 2 ** 70}
+
+
+def test_response(app):
+    provider = app.json
+    with app.app_context():
+        response = provider.response(success=True, title='Coração')
+    assert response.mimetype == 'application/json'
+    assert response.get_data() == '{"success":true,"title":"Coração"}\n'.encode('utf-8')
@@ -0,0 +1,30 @@
+"""O token de acesso nunca aparece inteiro nos logs"""
+import logging
+
+import pytest
+
+import cnvsweb_scraper
+from cnvsweb_scraper import BlockingScraper, CNVSWebScraper, _mask_token
+
+TOKEN = '2E9RCU0B'
+
+
+@pytest.mark.parametrize('token, masked', [(TOKEN, '****CU0B'), ('abcd', '****'), ('', '****'), (None, '****')])
+def test_mask_token(token, masked):
+    assert _mask_token(token) == masked
+
+
+@pytest.mark.parametrize('engine', [CNVSWebScraper, BlockingScraper])
+def test_login_logs_only_the_token_suffix(fixture_server, caplog, engine):
+    scraper = engine(TOKEN, base_url=fixture_server.base_url, rate_limit=0, cache=cnvsweb_scraper.URLCache())
+    try:
+        with caplog.at_level(logging.DEBUG, logger='cnvsweb_scraper'):
+            scraper.login()
+    finally:
+        if engine is BlockingScraper:
+            scraper.close()
+        else:
+            scraper.session.close()
+
+    assert '****CU0B' in caplog.text
+    assert TOKEN not in caplog.text
@@ -0,0 +1,83 @@
+"""Métricas no formato de texto do Prometheus e o endpoint /metrics"""
+import asyncio
+
+import pytest
+
+from cnvsweb_metrics import Counter, Gauge, Histogram, Registry, timed
+
+
+def test_counter_and_gauge_rendering():
+    registry = Registry()
+    hits = Counter('app_hits_total', 'Acessos "por" página', ['page'], registry=registry)
+    size = Gauge('app_cache_size', 'Tamanho', registry=registry)
+
+    hits.inc(page='home')
+    hits.inc(2, page='watch')
+    hits.inc(page='home')
+    size.set(12.0)
+
+    assert registry.render() == (
+        '# HELP app_hits_total Acessos \\"por\\" página\n'
+        '# TYPE app_hits_total counter\n'
+        'app_hits_total{page="home"} 2\n'
+        'app_hits_total{page="watch"} 2\n'
+        '# HELP app_cache_size Tamanho\n'
+        '# TYPE app_cache_size gauge\n'
+        'app_cache_size 12\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = Histogram('app_seconds', 'Latência', ['stage'], buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, stage='fetch')
+
+    lines = registry.render().splitlines()[2:]
+    assert lines == [
+        'app_seconds_bucket{stage="fetch",le="0.1"} 2',
+        'app_seconds_bucket{stage="fetch",le="1"} 3',
+        'app_seconds_bucket{stage="fetch",le="+Inf"} 4',
+        'app_seconds_sum{stage="fetch"} 3.65',
+        'app_seconds_count{stage="fetch"} 4',
+    ]
+
+
+def test_labels_and_names_are_checked():
+    registry = Registry()
+    hits = Counter('app_hits_total', 'Acessos', ['page'], registry=registry)
+    with pytest.raises(ValueError):
+        hits.inc(status=200)
+    with pytest.raises(ValueError):
+        Counter('app_hits_total', 'De novo', registry=registry)
+
+
+def test_timed_measures_sync_and_async_calls_and_errors():
+    latency = Histogram('app_call_seconds', 'Chamadas', ['target'], registry=None)
+
+    @timed(latency, target='sync')
+    def fail():
+        raise RuntimeError('x')
+
+    @timed(latency, target='async')
+    async def work():
+        return 'ok'
+
+    with pytest.raises(RuntimeError):
+        fail()
+    assert asyncio.run(work()) == 'ok'
+    counts = {labels: value for name, labels, value in latency.samples() if name.endswith('_count')}
+    assert counts == {'{target="async"}': 1, '{target="sync"}': 1}
+
+
+def test_metrics_endpoint(api):
+    api.get('/api/search?q=batman&lazy=true')
+    response = api.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    body = response.get_data(as_text=True)
+    assert '# TYPE cnvsweb_stage_seconds histogram' in body
+    assert 'cnvsweb_http_responses_total{page="search.php",status="200"}' in body
+    assert 'cnvsweb_sessions{state="healthy"} 1' in body
+    assert 'cnvsweb_request_seconds_count{endpoint="/api/search",method="GET",status="200"}' in body
@@ -0,0 +1,50 @@
+"""
+scan_mp4_url() contra a busca antiga (bench_extract.legacy_scan)
+
+A busca antiga é a referência: a mesma URL (e o mesmo padrão) tem que sair
+para qualquer HTML, inclusive os casos em que a primeira ocorrência de um
+padrão é inválida e a busca passa para o padrão seguinte.
+"""
+import random
+
+import pytest
+
+import bench_extract
+from cnvsweb_scraper import scan_mp4_url
+
+
+@pytest.mark.parametrize('name', sorted(bench_extract.build_pages()))
+def test_fixture_pages_match_legacy(name):
+    html = bench_extract.build_pages()[name]
+    assert bench_extract.current_scan(html) == bench_extract.legacy_scan(html)
+
+
+@pytest.mark.parametrize('html, expected', [
+    ('<a href="https://server-1.x/v.mp4?t=1">', ('https://server-1.x/v.mp4?t=1', 0)),
+    ('"file": "https://cdn.x/a.mp4" <video src="https://cdn.x/b.mp4">', ('https://cdn.x/b.mp4', 2)),
+    # src= sem .mp4 antes da URL: a ocorrência de src= vai até o .mp4 seguinte
+    # e é inválida, então vale a URL (sem o ">" do fim)
+    ('<img src=x.png><a href=https://cdn.x/a.mp4>', ('https://cdn.x/a.mp4', 5)),
+    ("src='https://cdn.x/a.mp4'", ('https://cdn.x/a.mp4', 2)),
+    ('"file" : "https://cdn.x/a.MP4?x=.mp4"', ('https://cdn.x/a.MP4?x=.mp4', 3)),
+    ('https://cdn.x/a.MP4', (None, None)),
+    ('<p>sem vídeo</p>', (None, None)),
+])
+def test_scan_cases(html, expected):
+    assert scan_mp4_url(html) == expected
+    assert bench_extract.current_scan(html) == bench_extract.legacy_scan(html)
+
+
+PIECES = [
+    'src=', 'src="', "src='", ' src = ', '"file": "', '"src":"', '"file" : \'',
+    'https://', 'http://', 'server', 'playmycnvs', 'cdn.x', '/a', '.mp4', '.MP4',
+    '.png', '"', "'", ' ', '\n', '<', '>', '\\', '=', ':', '?t=1', 'x', 'play',
+    'cnvs', '<video ', '</a>',
+]
+
+
+def test_random_html_matches_legacy():
+    rnd = random.Random(8)
+    for _ in range(20000):
+        html = ''.join(rnd.choice(PIECES) for _ in range(rnd.randint(1, 25)))
+        assert bench_extract.current_scan(html) == bench_extract.legacy_scan(html), html
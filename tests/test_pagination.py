@@ -0,0 +1,75 @@
+"""Cursores, page_args() e bloco de paginação do main.py"""
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize('offset', [0, 1, 20, 12345])
+def test_cursor_round_trip(offset):
+    assert main.read_cursor(main.make_cursor(offset)) == offset
+
+
+@pytest.mark.parametrize('cursor', ['', 'xyz', 'bzotMQ', 'cDox', 'bzph', '%%%'])
+def test_invalid_cursor(cursor):
+    # 'bzotMQ' = "o:-1", 'cDox' = "p:1", 'bzph' = "o:a"
+    assert main.read_cursor(cursor) is None
+
+
+def test_page_args_reads_cursor_and_fields():
+    query = f'/api/search?cursor={main.make_cursor(40)}&offset=5&limit=20&fields=title,video_url'
+    with main.app.test_request_context(query):
+        offset, limit, fields = main.page_args()
+    # O cursor tem precedência sobre offset
+    assert (offset, limit) == (40, 20)
+    assert fields == ('title', 'video_url')
+
+
+def test_page_args_defaults():
+    with main.app.test_request_context('/api/search?limit=0'):
+        assert main.page_args() == (0, None, None)
+
+
+@pytest.mark.parametrize('query', ['cursor=xyz', 'offset=-1', 'fields=title,senha'])
+def test_page_args_rejects_bad_arguments(query):
+    with main.app.test_request_context(f'/api/search?{query}'):
+        with pytest.raises(ValueError):
+            main.page_args()
+
+
+def test_pagination_next_cursor():
+    page = main.pagination(0, 20, 20, 45)
+    assert page['total'] == 45
+    assert main.read_cursor(page['next_cursor']) == 20
+    assert main.pagination(40, 20, 5, 45)['next_cursor'] is None
+
+
+def test_pagination_unknown_total():
+    # Streaming ao vivo: há próxima página enquanto a página vier cheia
+    assert main.read_cursor(main.pagination(0, 3, 3)['next_cursor']) == 3
+    assert main.pagination(3, 3, 2)['next_cursor'] is None
+    assert main.pagination(0, None, 10)['next_cursor'] is None
+
+
+def test_search_pages_follow_next_cursor(api):
+    full = api.get('/api/search?q=batman&organize=false&max_episodes=0').get_json()
+    expected = [item['title'] for item in full['data']]
+    assert len(expected) > 2
+
+    titles, query = [], '/api/search?q=batman&organize=false&max_episodes=0&limit=2'
+    while True:
+        response = api.get(query)
+        assert response.status_code == 200
+        body = response.get_json()
+        titles += [item['title'] for item in body['data']]
+        assert body['pagination']['total'] == len(expected)
+        cursor = body['pagination']['next_cursor']
+        if cursor is None:
+            break
+        query = f'/api/search?q=batman&organize=false&max_episodes=0&limit=2&cursor={cursor}'
+    assert titles == expected
+
+
+def test_search_rejects_bad_cursor(api):
+    response = api.get('/api/search?q=batman&cursor=xyz')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
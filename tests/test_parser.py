@@ -0,0 +1,50 @@
+"""Backends de parser (lxml/html.parser) e parse restrito por SoupStrainer"""
+import pytest
+
+import cnvsweb_scraper
+from bench_scraper import load_fixture
+
+MOVIE_URL = 'https://cnvsweb.stream/watch/velozes-e-furiosos'
+
+
+def extract_all(scraper):
+    """Saída de todos os extratores sobre as fixtures"""
+    return {
+        'most_watched': scraper._parse_most_watched_items(load_fixture('home.html')),
+        'sections': scraper._parse_home_sections(load_fixture('home.html')),
+        'search': scraper._parse_search_items(load_fixture('search.html')),
+        'details': scraper._parse_movie_details(load_fixture('watch_movie.html'), MOVIE_URL),
+        'player': scraper._parse_player_url(load_fixture('watch_movie.html'), MOVIE_URL),
+        'series': scraper._parse_series_page(load_fixture('series.html')),
+    }
+
+
+@pytest.fixture
+def scraper():
+    scraper = cnvsweb_scraper.CNVSWebScraper('test', rate_limit=0)
+    yield scraper
+    scraper.session.close()
+
+
+def test_backends_extract_the_same(scraper, monkeypatch):
+    pytest.importorskip('lxml')
+    monkeypatch.setattr(cnvsweb_scraper, 'HTML_PARSER', 'html.parser')
+    reference = extract_all(scraper)
+    monkeypatch.setattr(cnvsweb_scraper, 'HTML_PARSER', 'lxml')
+    assert extract_all(scraper) == reference
+
+    assert reference['most_watched']
+    assert reference['search']
+    assert reference['player']
+    assert reference['series']['episodes']
+
+
+def test_strained_parse_matches_full_document(scraper):
+    markup = load_fixture('search.html')
+    strained = cnvsweb_scraper.make_soup(markup, cnvsweb_scraper.SEARCH_STRAINER)
+    full = cnvsweb_scraper.make_soup(markup)
+
+    cards = full.find_all('div', class_='item poster')
+    assert [str(card) for card in strained.find_all('div', class_='item poster')] == [str(card) for card in cards]
+    # O documento restrito tem só os cards
+    assert len(str(strained)) < len(str(full))
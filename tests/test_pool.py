@@ -0,0 +1,97 @@
+"""ScraperPool: seleção do menos ocupado, saúde das sessões e sessões salvas"""
+import os
+import stat
+
+import pytest
+
+from cnvsweb_scraper import ScraperPool
+
+
+def test_tokens_are_deduplicated():
+    pool = ScraperPool(['a', ' a ', 'b', ''], rate_limit=0)
+    assert [s.token for s in pool.scrapers] == ['a', 'b']
+
+    with pytest.raises(ValueError):
+        ScraperPool(['', '  '])
+
+
+def test_sessions_share_cache_single_flight_and_breaker(make_pool):
+    pool = make_pool(tokens=('a', 'b'))
+    first, second = pool.scrapers
+    assert first.cache is second.cache is pool.cache
+    assert first.inflight is second.inflight is pool.single_flight
+    assert first.circuit_breaker is second.circuit_breaker is pool.circuit_breaker
+
+
+def test_acquire_picks_the_least_loaded_session(make_pool):
+    pool = make_pool(tokens=('a', 'b', 'c'))
+
+    leased = [pool.acquire() for _ in range(3)]
+    assert sorted(s.token for s in leased) == ['a', 'b', 'c']
+
+    pool.release(leased[1])
+    assert pool.acquire() is leased[1]
+    assert pool.stats() == {'sessions': 3, 'healthy': 3, 'in_flight': 3}
+
+
+def test_unhealthy_sessions_leave_the_rotation(make_pool):
+    pool = make_pool(tokens=('a', 'b'))
+    first, second = pool.scrapers
+    pool._set_health(first, False)
+
+    assert {pool.acquire().token for _ in range(3)} == {'b'}
+
+    pool._set_health(second, False)
+    assert not pool.ready
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+
+def test_lease_releases_on_error(make_pool):
+    pool = make_pool()
+    with pytest.raises(KeyError):
+        with pool.lease():
+            raise KeyError('x')
+    assert pool.stats()['in_flight'] == 0
+
+
+def test_keep_alive_drops_dead_sessions_and_relogs(make_pool, monkeypatch):
+    pool = make_pool(tokens=('a', 'b'))
+    first, second = pool.scrapers
+    monkeypatch.setattr(first, 'keep_alive', lambda: False)
+    monkeypatch.setattr(second, 'keep_alive', lambda: True)
+    logins = []
+
+    def login(scraper, ok):
+        logins.append(scraper.token)
+        return ok
+
+    monkeypatch.setattr(first, 'login', lambda: login(first, False))
+    pool.keep_alive()
+    assert logins == ['a']
+    assert pool.stats()['healthy'] == 1
+
+    # Fora da rotação a sessão não passa pelo keep_alive, só pelo login
+    monkeypatch.setattr(first, 'login', lambda: login(first, True))
+    pool.keep_alive()
+    assert logins == ['a', 'a']
+    assert pool.stats()['healthy'] == 2
+
+
+def test_saved_sessions_round_trip(make_pool, tmp_path):
+    pool = make_pool(tokens=('a', 'b'))
+    pool.scrapers[0].session.cookies.set('PHPSESSID', 'abc', domain='127.0.0.1')
+    pool._set_health(pool.scrapers[1], False)
+    pool.scrapers[1].logged_in = False
+    path = str(tmp_path / 'sessions.json')
+
+    pool.save_sessions(path)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+    other = make_pool(tokens=('a', 'b'))
+    for scraper in other.scrapers:
+        other._set_health(scraper, False)
+        scraper.logged_in = False
+    assert other.load_sessions(path) == 1
+    assert other.scrapers[0].session.cookies.get('PHPSESSID') == 'abc'
+    assert other.load_sessions(str(tmp_path / 'nada.json')) == 0
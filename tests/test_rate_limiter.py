@@ -0,0 +1,91 @@
+"""HostRateLimiter: token bucket por host com AIMD e pausa por Retry-After"""
+import pytest
+
+from cnvsweb_scraper import HostRateLimiter
+
+URL = 'https://cnvsweb.stream/watch/x'
+OTHER = 'https://outro.example/watch/x'
+HOST = 'cnvsweb.stream'
+
+
+def rate(limiter, host=HOST):
+    return limiter.stats()[host]['rate']
+
+
+def test_reserve_queues_concurrent_callers(clock):
+    limiter = HostRateLimiter(requests_per_second=4)
+    # A primeira ficha está disponível; as seguintes fazem fila a 1/rate
+    assert limiter.reserve(URL) == 0
+    assert limiter.reserve(URL) == pytest.approx(0.25)
+    assert limiter.reserve(URL) == pytest.approx(0.5)
+    # Hosts diferentes têm buckets separados
+    assert limiter.reserve(OTHER) == 0
+
+    clock.advance(1)
+    assert limiter.reserve(URL) == 0
+
+
+def test_wait_sleeps_the_reserved_delay(clock):
+    limiter = HostRateLimiter(requests_per_second=2)
+    limiter.wait(URL)
+    limiter.wait(URL)
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_disabled_limiter_never_waits(clock):
+    limiter = HostRateLimiter(requests_per_second=0)
+    assert [limiter.reserve(URL) for _ in range(5)] == [0] * 5
+    limiter.observe(URL, 429, retry_after='30')
+    assert limiter.stats() == {}
+
+
+@pytest.mark.parametrize('status, elapsed', [(429, 0.1), (503, 0.1), (None, None), (200, 6.0)])
+def test_overload_halves_the_rate(clock, status, elapsed):
+    limiter = HostRateLimiter(requests_per_second=4, slow_after=5.0)
+    limiter.observe(URL, 200, elapsed=0.1)
+    assert rate(limiter) == 4
+
+    limiter.observe(URL, status, elapsed=elapsed)
+    assert rate(limiter) == 2
+    # Com a taxa menor, a fila anda mais devagar
+    limiter.reserve(URL)
+    assert limiter.reserve(URL) == pytest.approx(0.5)
+
+
+def test_rate_never_drops_below_min_rate(clock):
+    limiter = HostRateLimiter(requests_per_second=4, min_rate=0.5)
+    for _ in range(10):
+        limiter.observe(URL, 503)
+    assert rate(limiter) == 0.5
+
+
+def test_good_responses_recover_up_to_the_limit(clock):
+    limiter = HostRateLimiter(requests_per_second=2, min_rate=0.5, recovery=0.25)
+    limiter.observe(URL, 429)
+    limiter.observe(URL, 429)
+    assert rate(limiter) == 0.5
+
+    for expected in (0.75, 1.0, 1.25, 1.5, 1.75, 2.0, 2.0):
+        limiter.observe(URL, 200, elapsed=0.1)
+        assert rate(limiter) == expected
+    # Outro host não foi afetado pelos 429
+    limiter.observe(OTHER, 200)
+    assert rate(limiter, 'outro.example') == 2
+
+
+def test_retry_after_pauses_the_host(clock):
+    limiter = HostRateLimiter(requests_per_second=4)
+    limiter.observe(URL, 429, retry_after='30')
+    assert limiter.stats()[HOST]['paused_for'] == 30
+    assert limiter.reserve(URL) == pytest.approx(30)
+    assert limiter.reserve(OTHER) == 0
+
+    clock.advance(31)
+    assert limiter.stats()[HOST]['paused_for'] == 0
+    assert limiter.reserve(URL) == 0
+
+
+def test_retry_after_http_date_is_not_a_pause(clock):
+    limiter = HostRateLimiter(requests_per_second=4)
+    limiter.observe(URL, 503, retry_after='Wed, 21 Oct 2026 07:28:00 GMT')
+    assert limiter.stats()[HOST] == {'rate': 2, 'paused_for': 0}
@@ -0,0 +1,61 @@
+"""Title/Episode: ida e volta para o formato da API e uso no cache e no store"""
+import json
+import sys
+
+import pytest
+
+from cnvsweb_records import Episode, Title, to_json
+from cnvsweb_scraper import URLCache
+from cnvsweb_shared import SharedStore
+
+EPISODE = {
+    'episode_id': '9001', 'season': '1ª Temporada', 'season_id': '5001', 'title': 'Episódio 1',
+    'duration': '45min', 'published_date': '2023-01-15', 'player_url': 'https://cnvsweb.stream/player/9001',
+    'video_url': None,
+}
+CARD = {
+    'title': 'The Last of Us', 'type': 'series', 'watch_link': '/watch/the-last-of-us',
+    'duration_or_seasons': '3 Temporadas', 'year': '2023', 'imdb': '8.7', 'image_url': 'https://img/x.jpg',
+    'player_url': None, 'video_url': None, 'is_series': True, 'episodes': [EPISODE],
+}
+
+
+def test_round_trip_keeps_the_api_format():
+    assert Episode.from_dict(EPISODE).to_dict() == EPISODE
+    assert Title.from_dict(CARD).to_dict() == CARD
+    # Cada to_dict() é um dict novo
+    title = Title.from_dict(CARD)
+    title.to_dict()['episodes'].clear()
+    assert title.to_dict()['episodes'] == [EPISODE]
+
+
+def test_defaults_for_missing_fields():
+    title = Title.from_dict({'title': 'Filme', 'type': 'movie', 'watch_link': '/watch/filme'})
+    assert not title.is_series
+    assert title.to_dict()['episodes'] == []
+    assert title.to_dict()['year'] == ''
+
+
+def test_equality_and_slots():
+    assert Title.from_dict(CARD) == Title.from_dict(CARD)
+    assert Episode.from_dict(EPISODE) != Episode.from_dict(dict(EPISODE, title='Episódio 2'))
+    with pytest.raises(AttributeError):
+        Episode.from_dict(EPISODE).extra = 1
+    # Menor que o dict equivalente
+    assert sys.getsizeof(Episode.from_dict(EPISODE)) < sys.getsizeof(dict(EPISODE))
+
+
+def test_json_default():
+    assert json.loads(json.dumps([Episode.from_dict(EPISODE)], default=to_json)) == [EPISODE]
+    with pytest.raises(TypeError):
+        json.dumps(object(), default=to_json)
+
+
+def test_seasons_round_trip_through_the_shared_store(tmp_path):
+    store = SharedStore(str(tmp_path / 'state.db'))
+    season = tuple(Episode.from_dict(dict(EPISODE, episode_id=str(i))) for i in range(3))
+    key = ('season', '/watch/the-last-of-us', '5001')
+    URLCache(store=store).set(key, season)
+
+    # Outro processo: a memória está vazia e a temporada vem do store como Episode
+    assert URLCache(store=store).get(key) == season
@@ -0,0 +1,86 @@
+"""Busca lazy: handles assinados (HMAC) e resolução sob demanda em /api/resolve"""
+import base64
+
+import pytest
+
+import main
+
+
+def test_resolve_handle_round_trip():
+    for kind in ('movie', 'series', 'episode'):
+        handle = main.make_resolve_handle(kind, '/watch/velozes-e-furiosos')
+        assert main.read_resolve_handle(handle) == (kind, '/watch/velozes-e-furiosos')
+
+
+def test_resolve_handle_rejects_tampering():
+    handle = main.make_resolve_handle('movie', '/watch/velozes-e-furiosos')
+    payload, signature = handle.split('.')
+
+    # Payload trocado com a assinatura original
+    forged = base64.urlsafe_b64encode(b'["movie","https://evil.example/"]').rstrip(b'=').decode('ascii')
+    assert main.read_resolve_handle(f'{forged}.{signature}') is None
+    # Assinatura alterada
+    flipped = ('A' if signature[0] != 'A' else 'B') + signature[1:]
+    assert main.read_resolve_handle(f'{payload}.{flipped}') is None
+
+
+def test_resolve_handle_signed_with_other_secret(monkeypatch):
+    handle = main.make_resolve_handle('movie', '/watch/x')
+    monkeypatch.setattr(main, 'RESOLVE_SECRET', b'outra-chave')
+    assert main.read_resolve_handle(handle) is None
+
+
+@pytest.mark.parametrize('handle', ['', 'abc', 'a.b.c', '!!!.???', 'é.é'])
+def test_resolve_handle_garbage(handle):
+    assert main.read_resolve_handle(handle) is None
+
+
+def test_resolve_handle_unknown_kind():
+    # Assinado corretamente, mas com um tipo que /api/resolve não conhece
+    assert main.read_resolve_handle(main.make_resolve_handle('player', '/watch/x')) is None
+
+
+def lazy_search(api, query='batman'):
+    response = api.get(f'/api/search?q={query}&lazy=true&organize=false')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_lazy_search_returns_handles_without_videos(api, fixture_server):
+    before = fixture_server.requests
+    body = lazy_search(api)
+
+    # Só a página de busca
+    assert fixture_server.requests - before == 1
+    items = body['data']
+    assert items and all(item['resolve'] for item in items)
+    assert not any(item.get('video_url') for item in items)
+
+
+def test_search_without_lazy_still_resolves_videos(api):
+    body = api.get('/api/search?q=batman&organize=false&max_episodes=1').get_json()
+    assert any(item.get('video_url') for item in body['data'])
+    assert not any('resolve' in item for item in body['data'])
+
+
+def test_resolve_movie_and_series(api):
+    items = lazy_search(api)['data']
+    movie = next(item for item in items if not item['is_series'])
+    series = next(item for item in items if item['is_series'])
+
+    body = api.get(f"/api/resolve?h={movie['resolve']}").get_json()
+    assert body['success'] and body['type'] == 'movie'
+    assert body['video_url'].endswith('.mp4') or '.mp4?' in body['video_url']
+
+    body = api.get(f"/api/resolve?h={series['resolve']}&max_episodes=2").get_json()
+    assert body['type'] == 'series' and body['count'] == 2
+    episode = body['episodes'][0]
+
+    body = api.get(f"/api/resolve?h={episode['resolve']}").get_json()
+    assert body['type'] == 'episode' and body['player_url'] == episode['player_url']
+
+
+def test_resolve_rejects_invalid_handle(api):
+    response = api.get('/api/resolve?h=abc.def')
+    assert response.status_code == 400
+    assert not response.get_json()['success']
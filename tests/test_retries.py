@@ -0,0 +1,101 @@
+"""_send: novas tentativas em 429/5xx, Retry-After e o que chega ao limiter/breaker"""
+import pytest
+import requests
+
+from cnvsweb_scraper import MAX_RETRY_AFTER, CircuitBreaker
+
+URL = 'https://cnvsweb.stream/watch/x'
+
+
+class FakeResponse:
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {'Retry-After': retry_after} if retry_after is not None else {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSend:
+    """Devolve as respostas na ordem e guarda as URLs pedidas"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def __call__(self, url, **kwargs):
+        self.calls.append(url)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def test_retries_5xx_with_exponential_backoff(make_scraper, clock):
+    scraper = make_scraper(retry_backoff=0.5)
+    first, second, ok = FakeResponse(503), FakeResponse(502), FakeResponse(200)
+    send = FakeSend(first, second, ok)
+
+    assert scraper._send(send, URL, 3) is ok
+    assert len(send.calls) == 3
+    assert clock.sleeps == [0.5, 1.0]
+    # As respostas descartadas liberam a conexão
+    assert first.closed and second.closed and not ok.closed
+
+
+def test_retry_after_extends_the_wait(make_scraper, clock):
+    scraper = make_scraper(retry_backoff=0.5)
+    send = FakeSend(FakeResponse(429, retry_after='3'), FakeResponse(200))
+
+    assert scraper._send(send, URL, 3).status_code == 200
+    assert clock.sleeps == [3]
+
+
+def test_long_retry_after_returns_the_response(make_scraper, clock):
+    scraper = make_scraper()
+    send = FakeSend(FakeResponse(429, retry_after=str(MAX_RETRY_AFTER + 1)))
+
+    assert scraper._send(send, URL, 3).status_code == 429
+    assert clock.sleeps == []
+
+
+def test_gives_up_after_the_last_attempt(make_scraper, clock):
+    scraper = make_scraper(retry_backoff=1)
+    send = FakeSend(*(FakeResponse(500) for _ in range(3)))
+
+    assert scraper._send(send, URL, 2).status_code == 500
+    assert len(send.calls) == 3
+    assert clock.sleeps == [1, 2]
+
+
+def test_post_is_never_retried(make_scraper, clock, monkeypatch):
+    scraper = make_scraper()
+    send = FakeSend(FakeResponse(503), FakeResponse(200))
+    monkeypatch.setattr(scraper.session, 'post', send)
+
+    assert scraper._post(URL).status_code == 503
+    assert len(send.calls) == 1
+
+
+def test_every_attempt_reaches_limiter_and_breaker(make_scraper, clock):
+    scraper = make_scraper(rate_limit=4, circuit_breaker=CircuitBreaker(failure_threshold=10))
+    send = FakeSend(FakeResponse(503), FakeResponse(503), FakeResponse(200))
+
+    scraper._send(send, URL, 3)
+    # Duas quedas (4 -> 2 -> 1) e uma recuperação (+0.25)
+    assert scraper.rate_limiter.stats()['cnvsweb.stream']['rate'] == 1.25
+    assert scraper.circuit_breaker.stats()['cnvsweb.stream']['failures'] == 0
+
+    send = FakeSend(FakeResponse(503), FakeResponse(503))
+    scraper._send(send, URL, 1)
+    assert scraper.circuit_breaker.stats()['cnvsweb.stream']['failures'] == 2
+
+
+def test_connection_errors_are_recorded_and_raised(make_scraper, clock):
+    scraper = make_scraper(circuit_breaker=CircuitBreaker(failure_threshold=1))
+    send = FakeSend(requests.ConnectionError('recusada'))
+
+    with pytest.raises(requests.ConnectionError):
+        scraper._send(send, URL, 3)
+    assert not scraper.circuit_breaker.healthy(URL)
@@ -0,0 +1,106 @@
+"""Episódios de séries: junção das temporadas na ordem do select e cache por temporada"""
+import pytest
+
+SERIES = '/watch/the-last-of-us'
+SEASONS = ['5001', '5002', '5003']
+
+
+def season_order(episodes):
+    """Temporadas na ordem em que aparecem na lista"""
+    return list(dict.fromkeys(ep['season_id'] for ep in episodes))
+
+
+def test_all_seasons_merged_in_select_order(make_scraper, fixture_server):
+    scraper = make_scraper()
+    before = fixture_server.requests
+    episodes = scraper.get_series_episodes(SERIES)
+
+    assert season_order(episodes) == SEASONS
+    assert len({(ep['season_id'], ep['episode_id']) for ep in episodes}) == len(episodes)
+    # A página da série + as duas temporadas que não vieram nela
+    assert fixture_server.requests - before == 3
+
+
+@pytest.mark.parametrize('max_season_workers', [1, 3])
+def test_parallel_and_serial_fetch_agree(make_scraper, max_season_workers):
+    reference = make_scraper().get_series_episodes(SERIES)
+    assert make_scraper(max_season_workers=max_season_workers).get_series_episodes(SERIES) == reference
+
+
+def test_page_without_selected_option_uses_first_season(make_scraper, fixture_server, monkeypatch):
+    reference = make_scraper().get_series_episodes(SERIES)
+
+    markup = fixture_server.page('series.html')
+    assert b' selected' in markup
+    monkeypatch.setitem(fixture_server._pages, 'series.html', markup.replace(b' selected', b''))
+
+    episodes = make_scraper().get_series_episodes(SERIES)
+    assert episodes == reference
+    assert season_order(episodes) == SEASONS
+
+
+def test_cached_seasons_are_not_fetched_again(make_scraper, fixture_server):
+    scraper = make_scraper()
+    first = scraper.get_series_episodes(SERIES)
+
+    before = fixture_server.requests
+    assert scraper.get_series_episodes(SERIES) == first
+    # Só a página da série: as outras temporadas vêm do cache
+    assert fixture_server.requests - before == 1
+
+
+def spy_urls(scraper, monkeypatch):
+    """Lista das URLs pedidas pelo scraper (sem a query string)"""
+    urls = []
+    get = scraper._get
+
+    def recording_get(url, **kwargs):
+        urls.append(url)
+        return get(url, **kwargs)
+
+    monkeypatch.setattr(scraper, '_get', recording_get)
+    return urls
+
+
+def serve_series_page(fixture_server, monkeypatch, old, new):
+    markup = fixture_server.page('series.html')
+    assert old in markup
+    monkeypatch.setitem(fixture_server._pages, 'series.html', markup.replace(old, new))
+
+
+def test_without_declared_endpoint_uses_season_ajax_path(make_scraper, fixture_server, monkeypatch):
+    scraper = make_scraper()
+    urls = spy_urls(scraper, monkeypatch)
+    scraper.get_series_episodes(SERIES)
+    assert urls[1:] == [fixture_server.base_url + scraper.season_ajax_path] * 2
+
+
+@pytest.mark.parametrize('declaration', [
+    (b'data-serie="321"', b'data-serie="321" data-url="/ajax/episodes.php?v=2"'),
+    (b'</body>', b'<script>$("#seasons-view").change(function(){ $.get("/ajax/episodes.php?v=2", {season: this.value}); });</script></body>'),
+])
+def test_endpoint_declared_by_the_page(make_scraper, fixture_server, monkeypatch, declaration):
+    serve_series_page(fixture_server, monkeypatch, *declaration)
+    scraper = make_scraper()
+    urls = spy_urls(scraper, monkeypatch)
+    episodes = scraper.get_series_episodes(SERIES)
+
+    assert urls[1:] == [fixture_server.base_url + '/ajax/episodes.php?v=2'] * 2
+    assert season_order(episodes) == SEASONS
+
+
+def test_failed_seasons_are_not_cached_or_catalogued(make_scraper, fixture_server, monkeypatch, caplog):
+    # Endpoint que o servidor não conhece: as duas temporadas buscadas dão 404
+    serve_series_page(fixture_server, monkeypatch, b'data-serie="321"', b'data-serie="321" data-url="/ajax/outro.php"')
+    scraper = make_scraper()
+    catalogued = []
+    monkeypatch.setattr(scraper, '_to_catalog', lambda *args: catalogued.append(args))
+
+    with caplog.at_level('WARNING', logger='cnvsweb_scraper'):
+        episodes = scraper.get_series_episodes(SERIES)
+
+    # Só a temporada que veio na página
+    assert season_order(episodes) == SEASONS[:1]
+    assert 'temporadas não vieram' in caplog.text
+    assert scraper.cache.stats()['entries'] == 0
+    assert not [args for args in catalogued if args[0] == 'add_episodes']
@@ -0,0 +1,98 @@
+"""LeaderLock e SharedStore (estado compartilhado entre workers)"""
+import os
+import stat
+import subprocess
+import sys
+
+import pytest
+
+import cnvsweb_shared
+from cnvsweb_shared import LeaderLock, SharedStore
+
+ROOT = os.path.dirname(os.path.abspath(cnvsweb_shared.__file__))
+
+
+def test_leader_lock_is_exclusive(tmp_path):
+    path = str(tmp_path / 'state.db.leader')
+    leader = LeaderLock(path)
+    follower = LeaderLock(path)
+
+    assert leader.acquire()
+    assert leader.held
+    # Chamar de novo no líder não perde o lock
+    assert leader.acquire()
+    assert not follower.acquire()
+    assert not follower.held
+
+    leader.release()
+    assert not leader.held
+    assert follower.acquire()
+    follower.release()
+
+
+def test_leader_lock_across_processes(tmp_path):
+    path = str(tmp_path / 'state.db.leader')
+    leader = LeaderLock(path)
+    assert leader.acquire()
+
+    code = 'import sys; from cnvsweb_shared import LeaderLock; sys.exit(0 if LeaderLock(sys.argv[1]).acquire() else 1)'
+    other = subprocess.run([sys.executable, '-c', code, path], cwd=ROOT)
+    assert other.returncode == 1
+
+    leader.release()
+    other = subprocess.run([sys.executable, '-c', code, path], cwd=ROOT)
+    assert other.returncode == 0
+
+
+def test_setdefault_blob_keeps_first_value(tmp_path):
+    path = str(tmp_path / 'state.db')
+    first = SharedStore(path)
+    second = SharedStore(path)
+
+    assert first.setdefault_blob('resolve_secret', 'a') == 'a'
+    assert second.setdefault_blob('resolve_secret', 'b') == 'a'
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_store_files_are_private(tmp_path):
+    old_umask = os.umask(0o022)
+    try:
+        path = str(tmp_path / 'state.db')
+        store = SharedStore(path)
+        store.put_blob('sessions', {'token': {'cookies': []}})
+        lock = LeaderLock(f'{path}.leader')
+        assert lock.acquire()
+        lock.release()
+    finally:
+        os.umask(old_umask)
+
+    for name in ('state.db', 'state.db-wal', 'state.db-shm', 'state.db.leader'):
+        assert mode(tmp_path / name) == 0o600, name
+
+
+def test_open_permissions_are_tightened(tmp_path):
+    path = tmp_path / 'state.db'
+    for name in ('state.db', 'state.db-wal', 'state.db.leader'):
+        (tmp_path / name).touch(mode=0o644)
+        os.chmod(tmp_path / name, 0o644)
+
+    store = SharedStore(str(path))
+    lock = LeaderLock(f'{path}.leader')
+    assert lock.acquire()
+    # Com o store aberto (o último close() apaga o -wal)
+    for name in ('state.db', 'state.db-wal', 'state.db.leader'):
+        assert mode(tmp_path / name) == 0o600, name
+    lock.release()
+    store.close()
+
+
+def test_symlinks_are_refused(tmp_path):
+    target = tmp_path / 'outro'
+    target.touch()
+    (tmp_path / 'state.db.leader').symlink_to(target)
+
+    with pytest.raises(OSError):
+        LeaderLock(str(tmp_path / 'state.db.leader')).acquire()
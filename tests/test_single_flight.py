@@ -0,0 +1,96 @@
+"""SingleFlight/AsyncSingleFlight: chamadas iguais em andamento viram uma execução"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cnvsweb_scraper import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        release.wait(5)
+        return {'url': value}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flight.do, 'k', slow, 'a')]
+        while flight.stats()['in_flight'] == 0:
+            time.sleep(0.001)
+        futures += [executor.submit(flight.do, 'k', slow, 'b') for _ in range(3)]
+        while flight.stats()['coalesced'] < 3:
+            time.sleep(0.001)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert calls == ['a']
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {'in_flight': 0, 'executed': 1, 'coalesced': 3}
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise ValueError('site fora')
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(flight.do, 'k', failing)
+        while flight.stats()['in_flight'] == 0:
+            time.sleep(0.001)
+        second = executor.submit(flight.do, 'k', failing)
+        while flight.stats()['coalesced'] < 1:
+            time.sleep(0.001)
+        release.set()
+        for future in (first, second):
+            with pytest.raises(ValueError):
+                future.result()
+
+    # Terminada a execução, a próxima chamada roda de novo
+    assert flight.do('k', lambda: 'ok') == 'ok'
+    assert flight.stats()['executed'] == 2
+
+
+def test_async_calls_share_one_task():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def slow(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(*(flight.do('k', slow, v) for v in 'abc'), flight.do('j', slow, 'd'))
+        return calls, results, flight.stats()
+
+    calls, results, stats = asyncio.run(scenario())
+    assert calls == ['a', 'd']
+    assert results == ['a', 'a', 'a', 'd']
+    assert stats == {'in_flight': 0, 'executed': 2, 'coalesced': 2}
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    async def scenario():
+        flight = AsyncSingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.02)
+            return 'pronto'
+
+        leader = asyncio.ensure_future(flight.do('k', slow))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.do('k', slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(scenario()) == 'pronto'
@@ -0,0 +1,52 @@
+"""Snapshot do "Mais Visto do Dia": construído em background, só lido pela rota"""
+import pytest
+
+import main
+
+
+@pytest.fixture
+def snapshot_api(api, monkeypatch):
+    monkeypatch.setattr(main.most_watched_snapshot, 'current', None)
+    monkeypatch.setattr(main, 'SNAPSHOT_WAIT', 0)
+    monkeypatch.setattr(main, 'startup', {'phase': 'starting', 'started_at': 0, 'ready_at': None})
+    return api
+
+
+def test_route_never_builds_the_snapshot(snapshot_api, fixture_server):
+    before = fixture_server.requests
+    response = snapshot_api.get('/api/most-watched')
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
+    assert fixture_server.requests == before
+    assert main.most_watched_snapshot.current is None
+
+
+def test_startup_builds_the_snapshot_for_the_route(snapshot_api, fixture_server):
+    main.initialize_scraper()
+    snapshot = main.most_watched_snapshot.current
+    assert snapshot is not None and snapshot['items']
+
+    before = fixture_server.requests
+    body = snapshot_api.get('/api/most-watched?organize=false&limit=2').get_json()
+    assert fixture_server.requests == before
+    assert body['count'] == 2
+    assert body['pagination']['total'] == len(snapshot['items'])
+    assert body['updated_at'] == snapshot['created_at']
+
+
+def test_fresh_snapshot_is_not_rebuilt(snapshot_api, fixture_server):
+    main.refresh_snapshot()
+    created_at = main.most_watched_snapshot.current['created_at']
+
+    before = fixture_server.requests
+    main.refresh_snapshot()
+    assert fixture_server.requests == before
+    assert main.most_watched_snapshot.current['created_at'] == created_at
+
+
+def test_episodes_beyond_the_snapshot_are_scraped_live(snapshot_api):
+    max_episodes = main.SNAPSHOT_MAX_EPISODES + 1
+    response = snapshot_api.get(f'/api/most-watched?organize=false&limit=1&max_episodes={max_episodes}')
+    assert response.status_code == 200
+    assert main.most_watched_snapshot.current is None
@@ -0,0 +1,96 @@
+"""Modo streaming (NDJSON/SSE) de /api/search e /api/most-watched"""
+import json
+
+import pytest
+
+import main
+from cnvsweb_scraper import LeasedIterator
+
+
+def ndjson_records(response):
+    return [json.loads(line) for line in response.data.decode('utf-8').splitlines() if line.strip()]
+
+
+def sse_events(response):
+    events = []
+    for block in response.data.decode('utf-8').strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines())
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def test_ndjson_most_watched(api):
+    # max_episodes acima do snapshot: caminho ao vivo
+    response = api.get('/api/most-watched?stream=ndjson&max_episodes=9&limit=3')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+
+    records = ndjson_records(response)
+    items, summary = records[:-1], records[-1]
+    assert len(items) == 3
+    assert {item['type'] for item in items} <= {'movie', 'series'}
+    assert summary['type'] == 'summary'
+    assert summary['summary']['movies'] + summary['summary']['series'] == 3
+    # O total é o da listagem, não o da página
+    assert summary['summary']['total'] == summary['pagination']['total'] > 3
+    assert main.read_cursor(summary['pagination']['next_cursor']) == 3
+
+
+def test_sse_search_with_fields(api):
+    response = api.get('/api/search?q=batman&stream=sse&limit=2&fields=title,video_url')
+    assert response.mimetype == 'text/event-stream'
+
+    events = sse_events(response)
+    assert [event for event, _ in events[:-1]] == [data['type'] for _, data in events[:-1]]
+    assert all(set(data) == {'type', 'title', 'video_url'} for _, data in events[:-1])
+    assert events[-1][0] == 'summary'
+    assert events[-1][1]['query'] == 'batman'
+
+
+def test_stream_releases_the_lease(api):
+    api.get('/api/search?q=batman&stream=ndjson&limit=2').data
+    assert main.scraper_pool.stats()['in_flight'] == 0
+
+
+def test_unread_stream_releases_the_lease(api):
+    with main.app.test_request_context('/api/search?q=batman&stream=ndjson&limit=2'):
+        response = main.search()
+        # Os cards já foram buscados e a sessão está reservada para o enriquecimento
+        assert main.scraper_pool.stats()['in_flight'] == 1
+        response.close()
+    assert main.scraper_pool.stats()['in_flight'] == 0
+
+
+def test_open_circuit_answers_503_before_streaming(api):
+    breaker = main.scraper_pool.circuit_breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record(main.scraper_pool.scrapers[0].base_url, False)
+
+    response = api.get('/api/search?q=batman&stream=ndjson')
+    assert response.status_code == 503
+    assert response.mimetype == 'application/json'
+    assert int(response.headers['Retry-After']) > 0
+    assert main.scraper_pool.stats()['in_flight'] == 0
+
+
+def test_invalid_stream_format(api):
+    assert api.get('/api/search?q=batman&stream=xml').status_code == 400
+
+
+class FakePool:
+    def __init__(self):
+        self.released = 0
+
+    def release(self, scraper):
+        self.released += 1
+
+
+@pytest.mark.parametrize('consume', [True, False])
+def test_leased_iterator_releases_once(consume):
+    pool = FakePool()
+    items = LeasedIterator(pool, object(), iter([1, 2]))
+    if consume:
+        assert list(items) == [1, 2]
+    items.close()
+    items.close()
+    assert pool.released == 1
@@ -0,0 +1,73 @@
+"""TitleIndex: busca por prefixo sem acentos, correção de digitação e ordenação"""
+import pytest
+
+from cnvsweb_catalog import TitleIndex, title_tokens
+
+
+def card(title, slug, year='2020', imdb='7.0', type='movie'):
+    return {'title': title, 'type': type, 'watch_link': f'/watch/{slug}', 'year': year, 'imdb': imdb}
+
+
+@pytest.fixture
+def index():
+    index = TitleIndex()
+    index.add([
+        card('Homem-Aranha: Sem Volta Para Casa', 'homem-aranha-3', '2021', '8.2'),
+        card('Homem-Aranha', 'homem-aranha', '2002', '7.4'),
+        card('O Homem de Aço', 'homem-de-aco', '2013', '7.1'),
+        card('Coração Valente', 'coracao-valente', '1995', '8.3'),
+        card('Velozes e Furiosos', 'velozes', '2001', '6.8'),
+        card('The Last of Us', 'the-last-of-us', '2023', '8.7', type='series'),
+    ])
+    return index
+
+
+def titles(results):
+    return [item['title'] for item in results]
+
+
+def test_tokens_ignore_accents_and_punctuation():
+    assert title_tokens('Homem-Aranha: Sem Volta') == ['homem', 'aranha', 'sem', 'volta']
+    assert title_tokens('  CORAÇÃO  valente ') == ['coracao', 'valente']
+
+
+def test_prefix_search_without_accents(index):
+    assert titles(index.search('coracao')) == ['Coração Valente']
+    assert titles(index.search('VELOZ fur')) == ['Velozes e Furiosos']
+    # Todas as palavras precisam casar
+    assert index.search('velozes aranha') == []
+
+
+def test_exact_title_comes_first_then_imdb(index):
+    assert titles(index.search('homem aranha')) == [
+        'Homem-Aranha', 'Homem-Aranha: Sem Volta Para Casa',
+    ]
+    assert titles(index.search('homem')) == [
+        'Homem-Aranha: Sem Volta Para Casa', 'Homem-Aranha', 'O Homem de Aço',
+    ]
+
+
+def test_typos_are_corrected_by_trigrams(index):
+    assert titles(index.search('furiozos')) == ['Velozes e Furiosos']
+    assert titles(index.search('valemte coracao')) == ['Coração Valente']
+    # Nada parecido: nenhum resultado
+    assert index.search('xyzwq') == []
+
+
+def test_results_are_cards(index):
+    (item,) = index.search('last of us')
+    assert item['is_series'] and item['watch_link'] == '/watch/the-last-of-us'
+    # Dict novo a cada busca
+    item['title'] = 'alterado'
+    assert titles(index.search('last of us')) == ['The Last of Us']
+
+
+def test_update_and_limit(index):
+    # Mesmo watch_link: o título é substituído
+    index.add([card('Velozes 2', 'velozes', '2003', '5.9')])
+    assert len(index) == 6
+    assert titles(index.search('velozes')) == ['Velozes 2']
+    # A palavra que só o título antigo tinha sai do vocabulário
+    assert index.search('furiosos') == []
+    assert len(index.search('homem', limit=2)) == 2
+    assert index.search('') == []